@@ -1,6 +1,9 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
 from app.models.responses import HealthResponse
 from app.config import get_settings
+from app.core.metrics import get_metrics
+from app.services.circuit_breakers import breaker_stats
 from datetime import datetime
 
 router = APIRouter(prefix="/health", tags=["health"])
@@ -27,15 +30,56 @@ async def readiness_check():
     """
     Readiness check endpoint for deployment orchestration.
 
+    Reports the circuit breaker of every upstream. Open breakers make the
+    status "degraded" but not unready: requests are still answered from
+    caches and local fallbacks, and another instance would see the same
+    upstream failures.
+
     Returns:
-        Simple ready status
+        Ready or degraded status with per-upstream breaker state
     """
+    breakers = breaker_stats()
+    degraded = any(stats["open"] for stats in breakers.values())
     return {
-        "status": "ready",
-        "timestamp": datetime.now().isoformat()
+        "status": "degraded" if degraded else "ready",
+        "timestamp": datetime.now().isoformat(),
+        "circuit_breakers": {
+            upstream: {
+                "state": stats["state"],
+                "retry_after": stats["retry_after"],
+                "failure_rate": stats["failure_rate"],
+                "slow_rate": stats["slow_rate"]
+            }
+            for upstream, stats in breakers.items()
+        }
     }
 
 
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Metrics endpoint in the Prometheus text exposition format.
+
+    Exposes per-stage latency histograms (extraction, cache, upstream,
+    parse, summary, send), end-to-end pipeline latencies, counters, and
+    gauges read from the browser pool, HTTP clients, message queue and
+    other components.
+
+    Returns:
+        Exposition text
+
+    Raises:
+        HTTPException: 404 if METRICS_ENABLED is off
+    """
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+
+    return PlainTextResponse(
+        get_metrics().render(),
+        media_type="text/plain; version=0.0.4"
+    )
+
+
 @router.get("/live")
 async def liveness_check():
     """
@@ -1,15 +1,26 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Dict, Tuple
 from app.models.requests import SearchRequest
 from app.models.responses import SearchResponse, ErrorResponse, ProductResult
-from app.services.openai_service import OpenAIService
-from app.scrapers.mercadolibre_api import get_api_client
+from app.services.openai_service import get_openai_service
+from app.services.search_backends import get_search_chain
+from app.services.rate_limiter import get_user_rate_limiter, search_user_key
 from app.core.logger import get_logger
 from app.core.errors import handle_scraper_error, handle_openai_error, ScraperException, OpenAIException
+from app.core.metrics import PIPELINE_SECONDS
+from app.core.tracing import get_tracer
+from app.core.rate_limit import RateLimitDependency
 import time
+import json
 import os
 
 router = APIRouter(prefix="/search", tags=["search"])
 logger = get_logger(__name__)
+tracer = get_tracer()
+
+# Per-user limit on top of the per-IP middleware; 429 with Retry-After
+limit_per_user = Depends(RateLimitDependency(get_user_rate_limiter, search_user_key))
 
 
 def get_demo_products(product_name: str, num_results: int = 5) -> list[ProductResult]:
@@ -35,14 +46,14 @@ def get_demo_products(product_name: str, num_results: int = 5) -> list[ProductRe
     return demo_products
 
 
-@router.post("/", response_model=SearchResponse)
+@router.post("/", response_model=SearchResponse, dependencies=[limit_per_user])
 async def search_products(request: SearchRequest):
     """
     Search for products on Mercado Libre Colombia.
 
     This endpoint orchestrates the complete search pipeline:
     1. Uses OpenAI to extract structured data from natural language query
-    2. Scrapes Mercado Libre with the structured parameters
+    2. Searches Mercado Libre through the backend chain (API, HTML, browser)
     3. Returns formatted results with product details
 
     Args:
@@ -52,16 +63,18 @@ async def search_products(request: SearchRequest):
         SearchResponse with structured data and product results
 
     Raises:
-        HTTPException: If search fails (500 for general errors, 503 for scraper issues)
+        HTTPException: If search fails (500 for general errors, 503 for scraper issues),
+            or 429 when the user is over the rate limit
     """
     start_time = time.time()
+    outcome = "error"
 
     try:
         logger.info(f"Processing search request: {request.query[:100]}")
+        tracer.current_span().set_attribute("query", request.query[:100])
 
         # Step 1: Extract structured request using OpenAI
-        openai_service = OpenAIService()
-        structured_request = await openai_service.extract_product_request(request.query)
+        structured_request = await get_openai_service().extract_product_request(request.query)
 
         logger.info(
             f"Extracted structured request: "
@@ -71,14 +84,13 @@ async def search_products(request: SearchRequest):
             f"num_results={structured_request.num_results}"
         )
 
-        # Step 2: Search using Mercado Libre official API
-        api_client = await get_api_client()
-        results = await api_client.search_products(structured_request)
+        # Step 2: Search through the backend chain, cheapest backend first
+        results = await get_search_chain().search(structured_request)
 
         # Fallback to demo data if no results
         use_demo = os.getenv("USE_DEMO_DATA", "false").lower() == "true"
         if len(results) == 0 and use_demo:
-            logger.warning("No products found from API, using demo data")
+            logger.warning("No products found from any backend, using demo data")
             results = get_demo_products(
                 structured_request.product_name,
                 structured_request.num_results
@@ -91,6 +103,7 @@ async def search_products(request: SearchRequest):
             f"in {execution_time:.2f}ms"
         )
 
+        outcome = "ok"
         return SearchResponse(
             success=True,
             query=request.query,
@@ -120,6 +133,128 @@ async def search_products(request: SearchRequest):
             ).model_dump()
         )
 
+    finally:
+        PIPELINE_SECONDS.observe(time.time() - start_time, pipeline="search", outcome=outcome)
+
+
+async def stream_search_events(query: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Run the search pipeline and yield events as each stage produces output.
+
+    Events, in order:
+    - request: the structured request extracted from the query
+    - timing: elapsed milliseconds after extraction, at the first product and
+      after the search
+    - product: one per result, as soon as the backend has parsed it
+    - done: totals; or error, if the pipeline failed
+
+    Args:
+        query: User's natural language query
+
+    Yields:
+        (event name, JSON-serializable data) pairs
+    """
+    start_time = time.perf_counter()
+
+    def elapsed_ms() -> float:
+        return round((time.perf_counter() - start_time) * 1000, 2)
+
+    try:
+        logger.info(f"Processing streaming search request: {query[:100]}")
+        tracer.current_span().set_attribute("query", query[:100])
+
+        structured_request = await get_openai_service().extract_product_request(query)
+        yield "request", {"query": query, "structured_request": structured_request.model_dump()}
+        yield "timing", {"stage": "extraction", "elapsed_ms": elapsed_ms()}
+
+        total = 0
+        source = None
+        async for source, product in get_search_chain().stream(structured_request):
+            if total == 0:
+                yield "timing", {"stage": "first_result", "elapsed_ms": elapsed_ms()}
+            yield "product", {"index": total, "product": product.model_dump(mode="json")}
+            total += 1
+
+        # Fallback to demo data if no results
+        use_demo = os.getenv("USE_DEMO_DATA", "false").lower() == "true"
+        if total == 0 and use_demo:
+            logger.warning("No products found from any backend, using demo data")
+            source = "demo"
+            for product in get_demo_products(
+                structured_request.product_name,
+                structured_request.num_results
+            ):
+                yield "product", {"index": total, "product": product.model_dump(mode="json")}
+                total += 1
+
+        yield "timing", {"stage": "search", "elapsed_ms": elapsed_ms()}
+        logger.info(f"Streaming search completed: {total} products in {elapsed_ms():.2f}ms")
+        PIPELINE_SECONDS.observe(elapsed_ms() / 1000, pipeline="search_stream", outcome="ok")
+        yield "done", {
+            "success": True,
+            "total_found": total,
+            "source": source,
+            "execution_time_ms": elapsed_ms()
+        }
+
+    except Exception as e:
+        if isinstance(e, OpenAIException):
+            error, error_code = "AI service error", "OPENAI_ERROR"
+        elif isinstance(e, ScraperException):
+            error, error_code = "Scraping service unavailable", "SCRAPER_ERROR"
+        else:
+            error, error_code = "Search failed", "SEARCH_ERROR"
+        logger.error(f"Streaming search failed: {e}", exc_info=not isinstance(e, ScraperException))
+        PIPELINE_SECONDS.observe(elapsed_ms() / 1000, pipeline="search_stream", outcome="error")
+        yield "error", ErrorResponse(
+            error=error,
+            error_code=error_code,
+            detail=str(e)
+        ).model_dump(mode="json")
+
+
+def format_ndjson(event: str, data: Dict[str, Any]) -> str:
+    """Encode an event as one newline-delimited JSON line."""
+    return json.dumps({"event": event, "data": data}, ensure_ascii=False) + "\n"
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Encode an event as a Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/stream", dependencies=[limit_per_user])
+async def search_products_stream(request: SearchRequest, http_request: Request):
+    """
+    Search for products, streaming results as soon as they are parsed.
+
+    Runs the same pipeline as ``POST /search`` but sends the structured
+    request first and then every product as its own event, followed by
+    timing and completion events. Responds with Server-Sent Events when the
+    client accepts ``text/event-stream``, otherwise with NDJSON (one
+    ``{"event": ..., "data": ...}`` object per line). Failures after the
+    stream has started are reported as an ``error`` event.
+
+    Args:
+        request: SearchRequest with user's natural language query
+        http_request: Raw request, used for content negotiation
+
+    Returns:
+        StreamingResponse of search events
+    """
+    use_sse = "text/event-stream" in http_request.headers.get("accept", "")
+    encode = format_sse if use_sse else format_ndjson
+
+    async def body() -> AsyncIterator[str]:
+        async for event, data in stream_search_events(request.query):
+            yield encode(event, data)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream" if use_sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 
 @router.get("/health")
 async def search_health():
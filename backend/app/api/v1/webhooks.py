@@ -1,13 +1,24 @@
-from fastapi import APIRouter, BackgroundTasks, HTTPException, Request, Query
-from typing import Dict, Any
-from app.models.responses import WhatsAppResponse
+from fastapi import APIRouter, HTTPException, Request, Query
+from typing import Dict, Any, Iterator, List
+from app.models.responses import WhatsAppResponse, WhatsAppBatchResponse
 from app.services.whatsapp_service import WhatsAppService
+from app.services.message_queue import get_message_queue, mark_job_committed
+from app.services.message_dedup import get_message_deduplicator
+from app.services.coalescer import get_message_coalescer
+from app.services.rate_limiter import get_rate_limiter
 from app.core.logger import get_logger
+from app.core.errors import QueueFullException
+from app.core.metrics import PIPELINE_SECONDS, timed
+from app.core.tracing import get_tracer
 from app.config import get_settings
 
 router = APIRouter(prefix="/webhooks", tags=["webhooks"])
 logger = get_logger(__name__)
 settings = get_settings()
+tracer = get_tracer()
+
+# Queue job kind for incoming WhatsApp text messages
+WHATSAPP_MESSAGE_JOB = "whatsapp_message"
 
 
 @router.get("/whatsapp")
@@ -43,99 +54,212 @@ async def verify_webhook(
     raise HTTPException(status_code=403, detail="Verification failed")
 
 
-@router.post("/whatsapp")
-async def whatsapp_webhook(
-    request: Request,
-    background_tasks: BackgroundTasks
-):
+def iter_change_values(payload: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
     """
-    WhatsApp webhook receiver for incoming messages.
-
-    This endpoint receives webhook notifications from Meta WhatsApp Cloud API
-    and processes messages asynchronously in the background.
+    Yield the ``value`` object of every change in every entry of a webhook.
 
     Args:
-        request: FastAPI request with webhook payload
-        background_tasks: FastAPI background tasks manager
+        payload: Meta webhook payload
 
-    Returns:
-        WhatsAppResponse indicating message was accepted
-
-    Raises:
-        HTTPException: If payload processing fails
+    Yields:
+        Change value dicts holding ``messages`` and/or ``statuses``
     """
-    try:
-        payload = await request.json()
-        logger.info(f"Received WhatsApp webhook: {payload}")
+    for entry in payload.get("entry") or []:
+        if not isinstance(entry, dict):
+            continue
+        for change in entry.get("changes") or []:
+            if isinstance(change, dict) and isinstance(change.get("value"), dict):
+                yield change["value"]
 
-        # Extract message data from Meta webhook format
-        if "entry" not in payload or not payload["entry"]:
-            logger.warning("Invalid webhook payload: missing 'entry'")
-            return {"status": "ignored"}
 
-        entry = payload["entry"][0]
-        if "changes" not in entry or not entry["changes"]:
-            logger.warning("Invalid webhook payload: missing 'changes'")
-            return {"status": "ignored"}
+def log_status_event(status: Dict[str, Any]) -> None:
+    """
+    Log a delivery status event (sent, delivered, read, failed).
 
-        changes = entry["changes"][0]
-        if "value" not in changes:
-            logger.warning("Invalid webhook payload: missing 'value'")
-            return {"status": "ignored"}
+    Args:
+        status: Status object from the webhook payload
+    """
+    state = status.get("status", "unknown")
+    if state == "failed":
+        logger.warning(
+            f"WhatsApp message {status.get('id', '')} to {status.get('recipient_id', '')} "
+            f"failed: {status.get('errors')}"
+        )
+    else:
+        logger.debug(f"WhatsApp message {status.get('id', '')} is {state}")
 
-        value = changes["value"]
 
-        # Check if it's a message event
-        if "messages" not in value or not value["messages"]:
-            logger.info("Webhook is not a message event, ignoring")
-            return {"status": "ignored"}
+@router.post("/whatsapp", response_model=WhatsAppBatchResponse)
+async def whatsapp_webhook(request: Request):
+    """
+    WhatsApp webhook receiver for incoming messages.
 
-        message_data = value["messages"][0]
+    This endpoint receives webhook notifications from Meta WhatsApp Cloud API.
+    A single delivery may batch several entries, changes, messages and status
+    events; every text message is validated, deduplicated, checked against
+    the sender's rate limit and then stored in the durable message queue in
+    one transaction, where a worker pool processes it. Limited messages are
+    acknowledged and dropped: an error status would make Meta redeliver the
+    whole batch, including the messages that were accepted.
 
-        # Extract message details
-        from_number = message_data.get("from", "")
-        message_id = message_data.get("id", "")
-        message_type = message_data.get("type", "")
+    Args:
+        request: FastAPI request with webhook payload
 
-        # Only process text messages
-        if message_type != "text":
-            logger.info(f"Ignoring non-text message type: {message_type}")
-            return {"status": "ignored"}
+    Returns:
+        WhatsAppBatchResponse with per-message results
 
-        message_body = message_data.get("text", {}).get("body", "")
+    Raises:
+        HTTPException: If payload processing fails, or 503 if the queue is
+            full so that Meta redelivers the webhook later
+    """
+    claimed: List[str] = []
+    dedup = get_message_deduplicator()
+    phone_limiter = get_rate_limiter("phone")
 
-        if not message_body:
-            logger.warning("Empty message body, ignoring")
-            return {"status": "ignored"}
+    try:
+        payload = await request.json()
+        logger.info(f"Received WhatsApp webhook: {payload}")
 
-        logger.info(f"Processing message from {from_number}: {message_body[:50]}...")
+        response = WhatsAppBatchResponse(status="ignored")
+        jobs: List[Dict[str, Any]] = []
+
+        for value in iter_change_values(payload):
+            for status in value.get("statuses") or []:
+                response.statuses += 1
+                log_status_event(status)
+
+            for message_data in value.get("messages") or []:
+                # Extract message details
+                from_number = message_data.get("from", "")
+                message_id = message_data.get("id", "")
+                message_type = message_data.get("type", "")
+                message_body = (message_data.get("text") or {}).get("body", "")
+
+                # Only process text messages
+                if message_type != "text" or not message_body:
+                    detail = (
+                        f"Unsupported message type: {message_type}"
+                        if message_type != "text" else "Empty message body"
+                    )
+                    logger.info(f"Ignoring message {message_id}: {detail}")
+                    response.ignored += 1
+                    response.results.append(WhatsAppResponse(
+                        status="ignored", message_id=message_id, processing=False, detail=detail
+                    ))
+                    continue
+
+                # Meta redelivers webhooks; only the first delivery of a message is queued
+                if dedup and message_id:
+                    if not await dedup.claim(message_id):
+                        response.duplicates += 1
+                        response.results.append(WhatsAppResponse(
+                            status="duplicate", message_id=message_id, processing=False
+                        ))
+                        continue
+                    claimed.append(message_id)
+
+                # Claim stays taken, so a redelivery of a dropped message is not queued either
+                if phone_limiter and from_number:
+                    limit = await phone_limiter.check(f"phone:{from_number}")
+                    if not limit.allowed:
+                        logger.info(f"Rate limiting message {message_id} from {from_number}")
+                        response.rate_limited += 1
+                        response.results.append(WhatsAppResponse(
+                            status="rate_limited", message_id=message_id, processing=False
+                        ))
+                        continue
+
+                logger.info(f"Processing message from {from_number}: {message_body[:50]}...")
+                jobs.append({
+                    "from_number": from_number,
+                    "message": message_body,
+                    "msg_id": message_id
+                })
+                response.results.append(WhatsAppResponse(status="accepted", message_id=message_id))
+
+        if not jobs and not response.results:
+            logger.info("Webhook has no message events, ignoring")
+
+        span = tracer.current_span()
+        span.set_attribute("webhook.messages", len(jobs))
+        span.set_attribute("webhook.duplicates", response.duplicates)
+        span.set_attribute("webhook.rate_limited", response.rate_limited)
+
+        # Persist the whole batch for the worker pool to respond quickly to webhook;
+        # each job carries this request's trace context
+        await get_message_queue().enqueue_many(WHATSAPP_MESSAGE_JOB, jobs)
+
+        response.accepted = len(jobs)
+        if jobs:
+            response.status = "accepted"
+        return response
 
-        # Process message in background to respond quickly to webhook
-        background_tasks.add_task(
-            process_whatsapp_message,
-            from_number,
-            message_body,
-            message_id
-        )
+    except Exception as e:
+        # Nothing was queued, so let the redelivery through
+        if dedup:
+            for message_id in claimed:
+                await dedup.release(message_id)
 
-        return {
-            "status": "accepted",
-            "message_id": message_id
-        }
+        if isinstance(e, QueueFullException):
+            logger.warning(f"Rejecting webhook: {e}")
+            raise HTTPException(status_code=503, detail=str(e))
 
-    except Exception as e:
         logger.error(f"Error processing webhook: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 async def process_whatsapp_message(from_number: str, message: str, msg_id: str):
     """
-    Background task to process WhatsApp message.
+    Queue job handler to process WhatsApp message.
+
+    With coalescing enabled, messages the sender sends in quick succession are
+    answered together and the job completes once that shared answer is sent.
+    Errors are raised so that the queue retries the job with backoff, until
+    replying starts; after that a failure is not retried.
 
     Args:
         from_number: Sender's phone number
         message: Message text
         msg_id: Message ID
     """
+    with timed(PIPELINE_SECONDS, pipeline="whatsapp"), tracer.span(
+        "process_whatsapp_message",
+        **{"message.id": msg_id, "message.coalesced": settings.MESSAGE_COALESCE_ENABLED}
+    ):
+        if settings.MESSAGE_COALESCE_ENABLED:
+            await get_message_coalescer().submit(from_number, message, msg_id)
+            return
+
+        service = WhatsAppService()
+        structured_request, results = await service.search_for_message(message)
+        # Only the search is retried; a retry must not resend messages
+        await mark_job_committed()
+        await service.send_search_response(from_number, message, structured_request, results)
+
+
+async def notify_whatsapp_failure(from_number: str, message: str, msg_id: str):
+    """
+    Queue failure handler, called once a message has used up its retries.
+
+    Args:
+        from_number: Sender's phone number
+        message: Message text
+        msg_id: Message ID
+    """
+    logger.error(f"Giving up on WhatsApp message {msg_id} from {from_number}")
     service = WhatsAppService()
-    await service.process_and_respond(from_number, message, msg_id)
+    await service.send_error_message(from_number)
+
+
+def register_whatsapp_jobs(queue) -> None:
+    """
+    Register the WhatsApp message handlers on a message queue.
+
+    Args:
+        queue: MessageQueue that will process webhook messages
+    """
+    queue.register(
+        WHATSAPP_MESSAGE_JOB,
+        process_whatsapp_message,
+        on_failure=notify_whatsapp_failure
+    )
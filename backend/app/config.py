@@ -14,11 +14,24 @@ class Settings(BaseSettings):
     # OpenAI Configuration
     OPENAI_API_KEY: str
     OPENAI_MODEL: str = "gpt-4"
+    OPENAI_TIMEOUT: float = 30.0
+    OPENAI_MAX_CONNECTIONS: int = 20
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    OPENAI_KEEPALIVE_EXPIRY: float = 60.0
+    OPENAI_HTTP2: bool = True
 
     # WhatsApp Configuration (Meta Business API or Twilio)
     WHATSAPP_VERIFY_TOKEN: str = "default-verify-token"
     WHATSAPP_API_KEY: str = ""
     WHATSAPP_PHONE_NUMBER: str = ""
+    WHATSAPP_API_URL: str = "https://graph.facebook.com/v18.0"
+    WHATSAPP_TIMEOUT: float = 10.0
+    WHATSAPP_MAX_CONNECTIONS: int = 20
+    WHATSAPP_MAX_CONCURRENT_SENDS: int = 10
+    WHATSAPP_KEEPALIVE_EXPIRY: float = 60.0
+    WHATSAPP_HTTP2: bool = True
+    WHATSAPP_REPLY_ORDER: str = "summary_first"  # "summary_first" or "as_ready"
+    WHATSAPP_SUMMARY_WAIT_MS: int = 1500
 
     # CORS Configuration
     ALLOWED_ORIGINS: str = "http://localhost:3000"
@@ -28,13 +41,154 @@ class Settings(BaseSettings):
     SUPABASE_KEY: str = ""
 
     # Rate Limiting
-    RATE_LIMIT_PER_MINUTE: int = 20
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_PER_MINUTE: int = 20  # Per client IP and per X-User-Id
+    RATE_LIMIT_BURST: int = 5
+    RATE_LIMIT_PHONE_PER_MINUTE: int = 10  # Per WhatsApp sender
+    RATE_LIMIT_PHONE_BURST: int = 5
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" or "redis" (shared across workers)
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    RATE_LIMIT_TRUST_FORWARDED: bool = False  # Key by X-Forwarded-For behind a proxy
+
+    # Scraper Browser Pool
+    BROWSER_POOL_SIZE: int = 4
+    BROWSER_POOL_MAX_USES: int = 50
+    BROWSER_POOL_ACQUIRE_TIMEOUT: float = 30.0
+
+    # Scraper Behaviour
+    SCRAPER_ENGINE: str = "html"  # "html" (browser-free, falls back to Playwright) or "playwright"
+    SCRAPER_READY_TIMEOUT_MS: int = 10000
+    # How long a generic card selector waits for a specific one to match too
+    SCRAPER_GENERIC_GRACE_MS: int = 300
+    SCRAPER_BULK_EXTRACTION: bool = True
+    SCRAPER_BLOCK_RESOURCES: bool = True
+    SCRAPER_BLOCKED_RESOURCE_TYPES: str = "image,media,font"
+    SCRAPER_BLOCKED_URL_PATTERNS: str = (
+        "google-analytics.com,googletagmanager.com,doubleclick.net,"
+        "googlesyndication.com,facebook.net,hotjar.com,melidata,/tracks"
+    )
+
+    # Search Backends (cheapest first)
+    SEARCH_BACKEND_CHAIN: str = "api,html,playwright"
+    SEARCH_BACKEND_DEMOTE_AFTER: int = 3
+    SEARCH_BACKEND_DEMOTE_SECONDS: float = 60.0
+    # Result pages fetched concurrently when a search asks for more than one page
+    SEARCH_PAGE_FANOUT: int = 3
+
+    # Search Result Cache ("memory" or "redis"; redis needs the optional redis package)
+    SEARCH_CACHE_ENABLED: bool = True
+    SEARCH_CACHE_BACKEND: str = "memory"
+    SEARCH_CACHE_TTL_SECONDS: float = 300.0
+    SEARCH_CACHE_MAX_ENTRIES: int = 1000
+    # Expired results are kept this long to answer while every backend is down
+    SEARCH_CACHE_STALE_SECONDS: float = 3600.0
+    REDIS_URL: str = ""
+
+    # Query Extraction Cache (similarity threshold 0 disables near-duplicate hits)
+    EXTRACTION_CACHE_ENABLED: bool = True
+    EXTRACTION_CACHE_MAX_ENTRIES: int = 5000
+    EXTRACTION_CACHE_TTL_SECONDS: float = 86400.0
+    EXTRACTION_CACHE_SIMILARITY_THRESHOLD: float = 0.85
+
+    # Local Rule-Based Query Parser (model is only called below this confidence)
+    QUERY_PARSER_ENABLED: bool = True
+    QUERY_PARSER_MIN_CONFIDENCE: float = 0.8
+
+    # Reply Summaries (templates by default; True asks gpt-3.5-turbo to write them)
+    SUMMARY_USE_LLM: bool = False
+
+    # WhatsApp Message Queue (SQLite-backed; set RUN_WORKERS=False to only enqueue
+    # from the web process and run app.worker separately)
+    MESSAGE_QUEUE_PATH: str = "message_queue.db"
+    MESSAGE_QUEUE_RUN_WORKERS: bool = True
+    MESSAGE_QUEUE_WORKERS: int = 4
+    MESSAGE_QUEUE_MAX_PENDING: int = 1000
+    MESSAGE_QUEUE_MAX_ATTEMPTS: int = 3
+    MESSAGE_QUEUE_BACKOFF_BASE: float = 2.0
+    MESSAGE_QUEUE_BACKOFF_MAX: float = 60.0
+    MESSAGE_QUEUE_POLL_INTERVAL: float = 1.0
+    MESSAGE_QUEUE_JOB_TIMEOUT: float = 120.0
+    MESSAGE_QUEUE_LEASE_SECONDS: float = 30.0
+
+    # Webhook Message Dedup ("memory" or "redis"; Meta retries deliveries for days)
+    MESSAGE_DEDUP_ENABLED: bool = True
+    MESSAGE_DEDUP_BACKEND: str = "memory"
+    MESSAGE_DEDUP_TTL_SECONDS: float = 604800.0
+    MESSAGE_DEDUP_MAX_ENTRIES: int = 100000
+
+    # Per-Sender Message Coalescing (merge messages sent within the window)
+    MESSAGE_COALESCE_ENABLED: bool = True
+    MESSAGE_COALESCE_WINDOW_MS: int = 1200
+    MESSAGE_COALESCE_MAX_WAIT_MS: int = 5000
+
+    # Outbound Governor (per upstream: paced QPS, AIMD concurrency between 1 and
+    # MAX_CONCURRENCY, backoff on 429/503 or responses slower than LATENCY_MS,
+    # and Retry-After pauses). Calls that would wait longer than MAX_WAIT fail fast
+    GOVERNOR_ENABLED: bool = True
+    GOVERNOR_MAX_WAIT: float = 20.0
+    GOVERNOR_MERCADOLIBRE_API_QPS: float = 10.0
+    GOVERNOR_MERCADOLIBRE_API_MAX_CONCURRENCY: int = 8
+    GOVERNOR_MERCADOLIBRE_API_LATENCY_MS: float = 3000.0
+    # Listing pages, shared by the HTML client and the Playwright scraper
+    GOVERNOR_MERCADOLIBRE_WEB_QPS: float = 2.0
+    GOVERNOR_MERCADOLIBRE_WEB_MAX_CONCURRENCY: int = 4
+    GOVERNOR_MERCADOLIBRE_WEB_LATENCY_MS: float = 8000.0
+    GOVERNOR_OPENAI_QPS: float = 5.0
+    GOVERNOR_OPENAI_MAX_CONCURRENCY: int = 10
+    GOVERNOR_OPENAI_LATENCY_MS: float = 15000.0
+    GOVERNOR_WHATSAPP_QPS: float = 20.0
+    GOVERNOR_WHATSAPP_LATENCY_MS: float = 3000.0
+
+    # Circuit Breakers (per upstream: open when FAILURE_RATE or SLOW_RATE of the
+    # last WINDOW calls fail or exceed <UPSTREAM>_SLOW_MS, fail fast for
+    # OPEN_SECONDS, then let HALF_OPEN_CALLS trial calls decide)
+    CIRCUIT_BREAKER_ENABLED: bool = True
+    CIRCUIT_BREAKER_WINDOW: int = 20
+    CIRCUIT_BREAKER_MIN_CALLS: int = 5
+    CIRCUIT_BREAKER_FAILURE_RATE: float = 0.5
+    CIRCUIT_BREAKER_SLOW_RATE: float = 0.5
+    CIRCUIT_BREAKER_OPEN_SECONDS: float = 30.0
+    CIRCUIT_BREAKER_HALF_OPEN_CALLS: int = 1
+    CIRCUIT_BREAKER_MERCADOLIBRE_API_SLOW_MS: float = 5000.0
+    CIRCUIT_BREAKER_MERCADOLIBRE_HTML_SLOW_MS: float = 8000.0
+    CIRCUIT_BREAKER_MERCADOLIBRE_BROWSER_SLOW_MS: float = 20000.0
+    CIRCUIT_BREAKER_OPENAI_SLOW_MS: float = 15000.0
+    CIRCUIT_BREAKER_WHATSAPP_SLOW_MS: float = 5000.0
+
+    # Metrics (Prometheus text format on /metrics and /api/health/metrics)
+    METRICS_ENABLED: bool = True
+
+    # Tracing ("jsonl" file or "otlp" collector over HTTP). Sampled traces are
+    # kept, and so are traces slower than TRACING_SLOW_MS or that failed
+    TRACING_ENABLED: bool = False
+    TRACING_EXPORTER: str = "jsonl"
+    TRACING_JSONL_PATH: str = "traces.jsonl"
+    TRACING_OTLP_ENDPOINT: str = "http://localhost:4318"
+    TRACING_SERVICE_NAME: str = "halcon-backend"
+    TRACING_SAMPLE_RATE: float = 0.1
+    TRACING_SLOW_MS: float = 3000.0
+    TRACING_FLUSH_INTERVAL: float = 5.0
 
     @property
     def allowed_origins_list(self) -> List[str]:
         """Convert comma-separated origins string to list."""
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
 
+    @property
+    def search_backend_chain_list(self) -> List[str]:
+        """Convert comma-separated search backend chain to list."""
+        return [b.strip().lower() for b in self.SEARCH_BACKEND_CHAIN.split(",") if b.strip()]
+
+    @property
+    def blocked_resource_types_list(self) -> List[str]:
+        """Convert comma-separated blocked resource types to list."""
+        return [t.strip() for t in self.SCRAPER_BLOCKED_RESOURCE_TYPES.split(",") if t.strip()]
+
+    @property
+    def blocked_url_patterns_list(self) -> List[str]:
+        """Convert comma-separated blocked URL patterns to list."""
+        return [p.strip() for p in self.SCRAPER_BLOCKED_URL_PATTERNS.split(",") if p.strip()]
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -0,0 +1,166 @@
+"""Key-value cache backends with TTL: in-process LRU or a Redis-compatible store."""
+from typing import Any, Optional
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import time
+
+
+class CacheBackend(ABC):
+    """Minimal async string key-value store with per-key TTL."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        """Return the value for a key, or None if missing or expired."""
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        """Store a value that expires after ``ttl`` seconds."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Remove a key if present."""
+
+    @abstractmethod
+    async def add(self, key: str, value: str, ttl: float) -> bool:
+        """Atomically store a value only if the key is absent; True if stored."""
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """
+    Process-local cache with TTL expiry and an LRU size bound.
+
+    Expired entries are dropped lazily when read and when the least recently
+    used entries are evicted to stay under ``max_entries``.
+    """
+
+    def __init__(self, max_entries: int = 1000):
+        """
+        Initialize in-memory backend.
+
+        Args:
+            max_entries: Maximum number of keys kept before LRU eviction
+        """
+        self.max_entries = max(1, max_entries)
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    async def get(self, key: str) -> Optional[str]:
+        return self.get_nowait(key)
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        self.set_nowait(key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        self.delete_nowait(key)
+
+    async def add(self, key: str, value: str, ttl: float) -> bool:
+        return self.add_nowait(key, value, ttl)
+
+    def get_nowait(self, key: str) -> Optional[str]:
+        """Synchronous ``get`` for callers outside the event loop."""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set_nowait(self, key: str, value: str, ttl: float) -> None:
+        """Synchronous ``set`` for callers outside the event loop."""
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete_nowait(self, key: str) -> None:
+        """Synchronous ``delete`` for callers outside the event loop."""
+        self._data.pop(key, None)
+
+    def add_nowait(self, key: str, value: str, ttl: float) -> bool:
+        """Synchronous ``add`` for callers outside the event loop."""
+        if self.get_nowait(key) is not None:
+            return False
+        self.set_nowait(key, value, ttl)
+        return True
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Cache stored in Redis or anything speaking the same async client API.
+
+    Any object with async ``get``, ``set(key, value, ex=..., nx=...)`` and
+    ``delete`` works, so a local fake can stand in for a real server.
+    """
+
+    def __init__(self, client: Any, prefix: str = "halcon:"):
+        """
+        Initialize Redis backend.
+
+        Args:
+            client: Async Redis-compatible client
+            prefix: Namespace prepended to every key
+        """
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = "halcon:") -> "RedisCacheBackend":
+        """
+        Create a backend connected to a Redis URL.
+
+        Args:
+            url: Redis connection URL
+            prefix: Namespace prepended to every key
+
+        Returns:
+            RedisCacheBackend instance
+
+        Raises:
+            RuntimeError: If the optional ``redis`` package is not installed
+        """
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError:
+            raise RuntimeError("Redis cache backend requires the 'redis' package")
+        return cls(redis_asyncio.from_url(url, decode_responses=True), prefix)
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self.client.get(self.prefix + key)
+        if isinstance(value, bytes):
+            value = value.decode("utf-8")
+        return value
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        await self.client.set(self.prefix + key, value, ex=max(1, int(ttl)))
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(self.prefix + key)
+
+    async def add(self, key: str, value: str, ttl: float) -> bool:
+        return bool(await self.client.set(self.prefix + key, value, ex=max(1, int(ttl)), nx=True))
+
+
+def build_cache_backend(kind: str, max_entries: int, redis_url: str = "") -> CacheBackend:
+    """
+    Create a cache backend from configuration values.
+
+    Args:
+        kind: "memory" or "redis"
+        max_entries: LRU bound for the in-memory backend
+        redis_url: Connection URL for the Redis backend
+
+    Returns:
+        CacheBackend instance
+    """
+    if kind == "redis":
+        if not redis_url:
+            raise RuntimeError("Redis cache backend requires REDIS_URL")
+        return RedisCacheBackend.from_url(redis_url)
+    return InMemoryCacheBackend(max_entries)
@@ -0,0 +1,265 @@
+"""Circuit breakers that fail fast while an upstream is erroring or slow."""
+from typing import Callable, Deque, Optional, Tuple
+from collections import deque
+from contextlib import asynccontextmanager
+from app.core.errors import CircuitOpenException, UpstreamThrottledException
+from app.core.logger import get_logger
+import time
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Raised before any request leaves the process, so they say nothing about the upstream
+LOCAL_REFUSALS = (UpstreamThrottledException, CircuitOpenException)
+
+
+def counts_as_failure(error: BaseException) -> bool:
+    """
+    Whether an exception says something about the upstream's health.
+
+    Client errors (4xx other than 408 and 429) are the caller's fault and
+    local refusals (governor or breaker) never reached the upstream, so
+    they do not count; everything else, including timeouts and connection
+    errors, does.
+
+    Args:
+        error: Exception raised by the guarded call
+
+    Returns:
+        True if the call should count as a failure
+    """
+    if isinstance(error, LOCAL_REFUSALS):
+        return False
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int) and 400 <= status < 500 and status not in (408, 429):
+        return False
+    return True
+
+
+class BreakerCall:
+    """Timing of one call made through ``CircuitBreaker.guard``."""
+
+    def __init__(self):
+        self.start = time.monotonic()
+
+    def begin(self) -> None:
+        """Start timing here, e.g. once a rate governor has admitted the request."""
+        self.start = time.monotonic()
+
+    def elapsed(self) -> float:
+        """Seconds since the call began."""
+        return time.monotonic() - self.start
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open breaker over a rolling window of calls.
+
+    While closed, the last ``window`` outcomes are kept with running counts,
+    so each call is O(1). Once at least ``min_calls`` are in the window and
+    the share of failures reaches ``failure_rate``, or the share of calls
+    slower than ``slow_ms`` reaches ``slow_rate``, the breaker opens: calls
+    fail immediately with CircuitOpenException for ``open_seconds``. Then it
+    lets ``half_open_calls`` trial calls through; if they succeed quickly it
+    closes, otherwise it opens again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        slow_ms: float = 0.0,
+        slow_rate: float = 0.5,
+        open_seconds: float = 30.0,
+        half_open_calls: int = 1,
+        enabled: bool = True
+    ):
+        """
+        Initialize breaker.
+
+        Args:
+            name: Upstream name, used in logs and errors
+            window: Number of recent calls considered
+            min_calls: Calls needed in the window before it can open
+            failure_rate: Share of failed calls that opens the breaker
+            slow_ms: Latency above which a call counts as slow; 0 disables
+            slow_rate: Share of slow calls that opens the breaker
+            open_seconds: How long the breaker stays open before a trial
+            half_open_calls: Trial calls allowed at once while half-open
+            enabled: If False, outcomes are tracked but calls are never refused
+        """
+        self.name = name
+        self.window = max(1, window)
+        self.min_calls = max(1, min(min_calls, self.window))
+        self.failure_rate = failure_rate
+        self.slow_threshold = slow_ms / 1000
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = max(1, half_open_calls)
+        self.enabled = enabled
+
+        self._state = CLOSED
+        self._open_until = 0.0
+        self._trials = 0
+        self._outcomes: Deque[Tuple[bool, bool]] = deque()
+        self._failures = 0
+        self._slow = 0
+
+        # Counters
+        self.calls = 0
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half-open once the wait is over."""
+        if self._state == OPEN and time.monotonic() >= self._open_until:
+            self._state = HALF_OPEN
+            self._trials = 0
+        return self._state
+
+    def retry_after(self) -> float:
+        """Seconds until an open breaker lets a trial call through."""
+        return max(0.0, self._open_until - time.monotonic())
+
+    def allow(self) -> bool:
+        """
+        Ask to make a call.
+
+        Every allowed call must be followed by ``record`` or ``release``.
+
+        Returns:
+            True if the call may go ahead
+        """
+        state = self.state
+        if not self.enabled or state == CLOSED:
+            return True
+        if state == HALF_OPEN and self._trials < self.half_open_calls:
+            self._trials += 1
+            return True
+        self.rejected += 1
+        return False
+
+    def record(self, latency: float, failed: bool) -> None:
+        """
+        Record the outcome of an allowed call.
+
+        Args:
+            latency: Call duration in seconds
+            failed: Whether the call failed
+        """
+        self.calls += 1
+        slow = bool(self.slow_threshold) and latency > self.slow_threshold
+
+        if self._state == HALF_OPEN:
+            self._trials = max(0, self._trials - 1)
+            if failed or slow:
+                self._open("trial call failed" if failed else "trial call was slow")
+            else:
+                self._close()
+            return
+
+        if self._state == OPEN:
+            # Started before the breaker opened; the window was already judged
+            return
+
+        self._outcomes.append((failed, slow))
+        self._failures += failed
+        self._slow += slow
+        if len(self._outcomes) > self.window:
+            old_failed, old_slow = self._outcomes.popleft()
+            self._failures -= old_failed
+            self._slow -= old_slow
+
+        calls = len(self._outcomes)
+        if calls < self.min_calls:
+            return
+        if self._failures / calls >= self.failure_rate:
+            self._open(f"{self._failures}/{calls} recent calls failed")
+        elif self.slow_threshold and self._slow / calls >= self.slow_rate:
+            self._open(f"{self._slow}/{calls} recent calls took over {self.slow_threshold * 1000:.0f}ms")
+
+    def release(self) -> None:
+        """Give back an allowed call that ended without an outcome (cancelled)."""
+        if self._state == HALF_OPEN:
+            self._trials = max(0, self._trials - 1)
+
+    def _open(self, reason: str) -> None:
+        """Start refusing calls for ``open_seconds``."""
+        self._reset_window()
+        self.opened += 1
+        if not self.enabled:
+            return
+        self._state = OPEN
+        self._open_until = time.monotonic() + self.open_seconds
+        logger.warning(f"Circuit for {self.name} opened for {self.open_seconds}s: {reason}")
+
+    def _close(self) -> None:
+        """Resume normal operation after a successful trial."""
+        self._state = CLOSED
+        self._reset_window()
+        logger.info(f"Circuit for {self.name} closed")
+
+    def _reset_window(self) -> None:
+        self._outcomes.clear()
+        self._failures = 0
+        self._slow = 0
+
+    @asynccontextmanager
+    async def guard(self, is_failure: Callable[[BaseException], bool] = counts_as_failure):
+        """
+        Run a block as one call through the breaker.
+
+        Exceptions the ``is_failure`` predicate rejects are recorded as
+        successes; cancellation and local refusals (the call never reached
+        the upstream) record nothing. Latency is measured from
+        the start of the block, or from ``BreakerCall.begin`` if the block
+        calls it.
+
+        Args:
+            is_failure: Decides whether an exception counts against the upstream
+
+        Yields:
+            BreakerCall for the call
+
+        Raises:
+            CircuitOpenException: If the breaker refuses the call
+        """
+        if not self.allow():
+            raise CircuitOpenException(self.name, self.retry_after())
+
+        call = BreakerCall()
+        try:
+            yield call
+        except LOCAL_REFUSALS:
+            self.release()
+            raise
+        except Exception as e:
+            self.record(call.elapsed(), failed=is_failure(e))
+            raise
+        except BaseException:
+            self.release()
+            raise
+        else:
+            self.record(call.elapsed(), failed=False)
+
+    def stats(self) -> dict:
+        """Return state and counters."""
+        calls = len(self._outcomes)
+        return {
+            "state": self.state,
+            "open": self.state == OPEN,
+            "retry_after": round(self.retry_after(), 3),
+            "failure_rate": round(self._failures / calls, 4) if calls else 0.0,
+            "slow_rate": round(self._slow / calls, 4) if calls else 0.0,
+            "calls": self.calls,
+            "rejected": self.rejected,
+            "opened": self.opened
+        }
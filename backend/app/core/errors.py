@@ -1,5 +1,6 @@
 from fastapi import HTTPException
 from typing import Optional, Dict, Any
+import math
 
 
 class ScraperException(Exception):
@@ -7,6 +8,11 @@ class ScraperException(Exception):
     pass
 
 
+class BotChallengeException(ScraperException):
+    """Mercado Libre answered with an anti-bot challenge instead of a listing."""
+    pass
+
+
 class OpenAIException(Exception):
     """Base exception for OpenAI API errors."""
     pass
@@ -17,13 +23,40 @@ class WhatsAppException(Exception):
     pass
 
 
+class QueueFullException(Exception):
+    """Message queue backlog is at capacity."""
+    pass
+
+
+class UpstreamThrottledException(Exception):
+    """An outbound request would wait too long for the upstream's rate governor."""
+
+    def __init__(self, upstream: str, wait: float):
+        self.upstream = upstream
+        self.wait = wait
+        super().__init__(f"{upstream} is throttled, admission would take {wait:.1f}s")
+
+
+class CircuitOpenException(Exception):
+    """An upstream's circuit breaker is open, so the call was not attempted."""
+
+    def __init__(self, upstream: str, retry_after: float):
+        self.upstream = upstream
+        self.retry_after = retry_after
+        super().__init__(f"{upstream} circuit is open, retry in {retry_after:.1f}s")
+
+
 class RateLimitException(HTTPException):
     """Rate limit exceeded exception."""
 
-    def __init__(self):
+    def __init__(self, retry_after: Optional[float] = None):
+        headers = None
+        if retry_after is not None:
+            headers = {"Retry-After": str(max(1, math.ceil(retry_after)))}
         super().__init__(
             status_code=429,
-            detail="Rate limit exceeded. Please try again later."
+            detail="Rate limit exceeded. Please try again later.",
+            headers=headers
         )
 
 
@@ -0,0 +1,304 @@
+"""Outbound request governor: QPS pacing, adaptive concurrency and Retry-After."""
+from typing import Deque, Mapping, Optional
+from collections import deque
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from app.core.errors import UpstreamThrottledException
+from app.core.logger import get_logger
+import asyncio
+import math
+import time
+
+logger = get_logger(__name__)
+
+# Statuses an upstream uses to say "slow down"
+THROTTLE_STATUSES = frozenset({429, 503})
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header value.
+
+    Args:
+        value: Delay in seconds or an HTTP date
+
+    Returns:
+        Seconds to wait from now, or None if absent or unparseable
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+class Permit:
+    """One admitted request; callers report what the upstream answered."""
+
+    def __init__(self):
+        self.throttle_after: Optional[float] = None
+        self.throttled = False
+
+    def record(self, status_code: int, headers: Optional[Mapping[str, str]] = None) -> None:
+        """
+        Report the upstream response status.
+
+        Args:
+            status_code: HTTP status of the response
+            headers: Response headers, read for Retry-After
+        """
+        if status_code in THROTTLE_STATUSES:
+            retry_after = headers.get("retry-after") if headers is not None else None
+            self.throttle(parse_retry_after(retry_after))
+
+    def throttle(self, retry_after: Optional[float] = None) -> None:
+        """
+        Report that the upstream pushed back (429, bot challenge, quota error).
+
+        Args:
+            retry_after: Seconds the upstream asked us to wait, if it said
+        """
+        self.throttled = True
+        self.throttle_after = retry_after
+
+
+class OutboundGovernor:
+    """
+    Paces and bounds the requests sent to one upstream.
+
+    Three controls apply to every request:
+
+    * QPS pacing: a token bucket of ``burst`` tokens refilled at ``qps``;
+      requests are delayed until a token is free instead of being rejected.
+    * Adaptive concurrency (AIMD): the in-flight limit grows by about one per
+      window of fast successes, and is cut by ``backoff`` on a throttling
+      response or a response slower than ``latency_target_ms``, at most once
+      per ``cooldown`` seconds so one burst of failures counts once.
+    * Retry-After: a throttling response pauses every request to the
+      upstream for as long as it asked (``default_retry_after`` if it did
+      not say), capped at ``max_retry_after``.
+
+    A request that would wait longer than ``max_wait`` fails fast with
+    UpstreamThrottledException, so callers can fall back instead of
+    hanging. State is per process and only touched from the event loop, so
+    no locks are needed.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        qps: float = 0.0,
+        burst: int = 1,
+        max_concurrency: int = 10,
+        min_concurrency: int = 1,
+        latency_target_ms: float = 0.0,
+        adaptive: bool = True,
+        backoff: float = 0.5,
+        cooldown: float = 1.0,
+        max_wait: float = 30.0,
+        default_retry_after: float = 1.0,
+        max_retry_after: float = 300.0
+    ):
+        """
+        Initialize governor.
+
+        Args:
+            name: Upstream name, used in logs and errors
+            qps: Sustained requests per second; 0 disables pacing
+            burst: Requests allowed back to back before pacing applies
+            max_concurrency: Upper bound of the in-flight limit
+            min_concurrency: Lower bound of the in-flight limit
+            latency_target_ms: Latency above which a response counts as a
+                congestion signal; 0 disables the latency signal
+            adaptive: Adjust the in-flight limit; if False it stays at
+                ``max_concurrency``
+            backoff: Multiplier applied to the limit on congestion
+            cooldown: Minimum seconds between two decreases
+            max_wait: Longest a request may wait for admission
+            default_retry_after: Pause after a throttling response without Retry-After
+            max_retry_after: Upper bound on any pause
+        """
+        self.name = name
+        self.interval = 1.0 / qps if qps > 0 else 0.0
+        self.burst = max(1, burst)
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.latency_target = latency_target_ms / 1000
+        self.adaptive = adaptive
+        self.backoff = backoff
+        self.cooldown = cooldown
+        self.max_wait = max_wait
+        self.default_retry_after = default_retry_after
+        self.max_retry_after = max_retry_after
+
+        self.limit = float(self.max_concurrency)
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._tat = 0.0
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+
+        # Counters
+        self.requests = 0
+        self.throttled = 0
+        self.slow = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+
+    @asynccontextmanager
+    async def request(self):
+        """
+        Admit one request to the upstream.
+
+        Waits for a concurrency slot, then for a pacing token and any
+        Retry-After pause. The block should report the response through the
+        yielded Permit; its latency is measured on exit.
+
+        Yields:
+            Permit for the admitted request
+
+        Raises:
+            UpstreamThrottledException: If admission would take longer than ``max_wait``
+        """
+        start = time.monotonic()
+        await self._acquire_slot(start)
+        try:
+            await self._pace(start)
+            self.wait_seconds += time.monotonic() - start
+            self.requests += 1
+
+            permit = Permit()
+            sent = time.monotonic()
+            try:
+                yield permit
+            finally:
+                self._observe(permit, time.monotonic() - sent)
+        finally:
+            self._release_slot()
+
+    def _reject(self, wait: float) -> None:
+        """Fail a request whose admission would exceed ``max_wait``."""
+        self.rejected += 1
+        raise UpstreamThrottledException(self.name, wait)
+
+    async def _acquire_slot(self, start: float) -> None:
+        """Take an in-flight slot, queueing FIFO behind earlier requests."""
+        if self._in_flight < int(self.limit) and not self._waiters:
+            self._in_flight += 1
+            return
+
+        timeout = None
+        if not math.isinf(self.max_wait):
+            timeout = max(0.0, self.max_wait - (time.monotonic() - start))
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            done, _ = await asyncio.wait({waiter}, timeout=timeout)
+        except BaseException:
+            self._abandon(waiter)
+            raise
+        if not done:
+            self._abandon(waiter)
+            self._reject(self.max_wait)
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        """Give up a queued wait, passing on a slot that was already handed over."""
+        if waiter.done() and not waiter.cancelled():
+            self._release_slot()
+            return
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _release_slot(self) -> None:
+        """Return a slot and hand free slots to queued requests."""
+        self._in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        """Admit queued requests while the in-flight limit allows."""
+        while self._waiters and self._in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(None)
+
+    async def _pace(self, start: float) -> None:
+        """Reserve the next pacing token and sleep until it and any pause are due."""
+        now = time.monotonic()
+        send_at = max(now, self._blocked_until)
+        if self.interval:
+            send_at = max(send_at, self._tat - (self.burst - 1) * self.interval)
+
+        waited = now - start
+        if waited + send_at - now > self.max_wait:
+            self._reject(waited + send_at - now)
+
+        if self.interval:
+            self._tat = max(self._tat, send_at) + self.interval
+        if send_at > now:
+            await asyncio.sleep(send_at - now)
+
+    def _observe(self, permit: Permit, latency: float) -> None:
+        """Adjust the limit from one finished request."""
+        if permit.throttled:
+            self.throttle(permit.throttle_after)
+        elif self.latency_target and latency > self.latency_target:
+            self.slow += 1
+            self._decrease(time.monotonic())
+        elif self.adaptive and self.limit < self.max_concurrency:
+            self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+            self._wake()
+
+    def throttle(self, retry_after: Optional[float] = None) -> None:
+        """
+        Back off after the upstream pushed back.
+
+        Called for throttling responses reported on a Permit, and directly
+        for signals noticed after the request finished, like a bot challenge
+        found while parsing.
+
+        Args:
+            retry_after: Seconds the upstream asked us to wait, if it said
+        """
+        now = time.monotonic()
+        self.throttled += 1
+        pause = min(self.default_retry_after if retry_after is None else retry_after, self.max_retry_after)
+        if now + pause > self._blocked_until:
+            self._blocked_until = now + pause
+            if pause:
+                logger.warning(f"{self.name} throttled us, pausing requests for {pause:.1f}s")
+        self._decrease(now)
+
+    def _decrease(self, now: float) -> None:
+        """Cut the in-flight limit, once per cooldown."""
+        if not self.adaptive or now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        previous = int(self.limit)
+        self.limit = max(float(self.min_concurrency), self.limit * self.backoff)
+        if int(self.limit) != previous:
+            logger.info(f"{self.name} concurrency limit lowered to {int(self.limit)}")
+
+    def stats(self) -> dict:
+        """Return limit, queue and throttling counters."""
+        return {
+            "limit": int(self.limit),
+            "in_flight": self._in_flight,
+            "waiting": len(self._waiters),
+            "paused_seconds": round(max(0.0, self._blocked_until - time.monotonic()), 3),
+            "requests": self.requests,
+            "throttled": self.throttled,
+            "slow": self.slow,
+            "rejected": self.rejected,
+            "wait_seconds": round(self.wait_seconds, 3)
+        }
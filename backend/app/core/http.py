@@ -0,0 +1,136 @@
+"""Shared construction of long-lived, instrumented httpx clients."""
+from typing import Any, Optional
+from dataclasses import dataclass
+import httpx
+
+
+def http2_available() -> bool:
+    """Check whether the optional ``h2`` package needed for HTTP/2 is installed."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+@dataclass
+class ConnectionStats:
+    """Counters showing how well a client reuses its pooled connections."""
+
+    requests: int = 0
+    new_connections: int = 0
+    errors: int = 0
+
+    @property
+    def reused(self) -> int:
+        """Requests served over an already open connection."""
+        return max(0, self.requests - self.new_connections)
+
+    def as_dict(self) -> dict:
+        """Return counters including the reuse ratio."""
+        return {
+            "requests": self.requests,
+            "new_connections": self.new_connections,
+            "reused": self.reused,
+            "errors": self.errors,
+            "reuse_ratio": round(self.reused / self.requests, 4) if self.requests else 0.0
+        }
+
+
+class InstrumentedTransport(httpx.AsyncHTTPTransport):
+    """
+    Connection-pooling transport that counts requests and new TCP connections.
+
+    New connections are detected through httpcore's ``trace`` extension, so
+    every request that did not open one was served by a reused connection.
+    """
+
+    def __init__(self, stats: ConnectionStats, **kwargs: Any):
+        """
+        Initialize transport.
+
+        Args:
+            stats: Counters to update
+            **kwargs: Passed to httpx.AsyncHTTPTransport (limits, http2, ...)
+        """
+        super().__init__(**kwargs)
+        self.stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.stats.requests += 1
+        previous_trace = request.extensions.get("trace")
+
+        async def trace(event_name: str, info: dict) -> None:
+            if event_name == "connection.connect_tcp.complete":
+                self.stats.new_connections += 1
+            if previous_trace:
+                result = previous_trace(event_name, info)
+                if hasattr(result, "__await__"):
+                    await result
+
+        request.extensions["trace"] = trace
+        try:
+            return await super().handle_async_request(request)
+        except Exception:
+            self.stats.errors += 1
+            raise
+
+
+def pool_usage(client: Optional[httpx.AsyncClient]) -> Optional[dict]:
+    """
+    Report how many of a client's pooled connections are open and idle.
+
+    Reads httpcore's pool through httpx's default transport, so it returns
+    None for clients that are closed or use a custom transport stack.
+
+    Args:
+        client: Client to inspect
+
+    Returns:
+        Dict with open and idle connection counts, or None if unavailable
+    """
+    pool = getattr(getattr(client, "_transport", None), "_pool", None)
+    if client is None or client.is_closed or pool is None:
+        return None
+    connections = list(pool.connections)
+    return {
+        "open": len(connections),
+        "idle": sum(1 for connection in connections if connection.is_idle())
+    }
+
+
+def build_http_client(
+    stats: ConnectionStats,
+    max_connections: int,
+    max_keepalive_connections: int,
+    keepalive_expiry: float,
+    timeout: float,
+    http2: bool = True,
+    **client_kwargs: Any
+) -> httpx.AsyncClient:
+    """
+    Create a pooled AsyncClient meant to live for the whole application.
+
+    Args:
+        stats: Counters updated by the client's transport
+        max_connections: Upper bound on open connections
+        max_keepalive_connections: Idle connections kept for reuse
+        keepalive_expiry: Seconds an idle connection is kept open
+        timeout: Default request timeout in seconds
+        http2: Use HTTP/2 when the ``h2`` package is installed
+        **client_kwargs: Extra httpx.AsyncClient arguments (headers, base_url, ...)
+
+    Returns:
+        Configured httpx.AsyncClient
+    """
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry
+    )
+    transport = InstrumentedTransport(
+        stats,
+        limits=limits,
+        http2=http2 and http2_available()
+    )
+    return httpx.AsyncClient(transport=transport, timeout=timeout, **client_kwargs)
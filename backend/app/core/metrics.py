@@ -0,0 +1,371 @@
+"""In-process metrics registry with Prometheus text exposition."""
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from bisect import bisect_left
+from contextlib import contextmanager
+import math
+import re
+import threading
+import time
+
+# Latency buckets in seconds, from cache lookups up to slow browser scrapes
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+StatsProvider = Callable[[], Optional[dict]]
+
+_INVALID_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_]")
+
+
+def _metric_name(name: str) -> str:
+    """Turn an arbitrary key into a valid metric name fragment."""
+    return _INVALID_NAME_CHARS.sub("_", name).strip("_").lower()
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text exposition format."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Render a label set, or nothing if there are no labels."""
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    """Render a sample value, keeping integers free of a decimal part."""
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class for labelled metrics."""
+
+    type_name = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        """Order label values like ``labelnames``."""
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self) -> List[str]:
+        """HELP and TYPE lines for the exposition."""
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type_name}"]
+
+    def render(self) -> List[str]:
+        """Sample lines for the exposition."""
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """
+        Increase the counter.
+
+        Args:
+            amount: Non-negative increment
+            **labels: Label values, by label name
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Return the current count for a label set."""
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values in fixed cumulative buckets.
+
+    Only bucket counts, the sum and the count are kept, so observing costs a
+    binary search and a few additions regardless of traffic.
+    """
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last is +Inf), sum, count]
+        self._values: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """
+        Record one observation.
+
+        Args:
+            value: Observed value (seconds, for latency histograms)
+            **labels: Label values, by label name
+        """
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._values[key] = entry
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def snapshot(self, **labels: str) -> Optional[dict]:
+        """Return count and sum for a label set, or None if nothing was observed."""
+        entry = self._values.get(self._key(labels))
+        if entry is None:
+            return None
+        return {"count": entry[2], "sum": entry[1]}
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, [list(entry[0]), entry[1], entry[2]]) for key, entry in self._values.items())
+
+        names = self.labelnames + ("le",)
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(names, key + (_format_value(bound),))} {cumulative}"
+                )
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Named counters and histograms plus gauges read from component stats.
+
+    Counters and histograms are updated on the request path. Gauges are not
+    stored: every scrape calls the registered stats providers (the same
+    ``stats()`` methods used for shutdown logs) and exposes their numbers.
+    """
+
+    def __init__(self, namespace: str = "halcon"):
+        """
+        Initialize registry.
+
+        Args:
+            namespace: Prefix for every metric name
+        """
+        self.namespace = namespace
+        self._metrics: Dict[str, _Metric] = {}
+        self._providers: Dict[str, Tuple[StatsProvider, Optional[str]]] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        """Add a metric, or return the one already registered under its name."""
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered with a different shape")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        """
+        Get or create a counter.
+
+        Args:
+            name: Metric name without the namespace prefix
+            help_text: Description shown in the exposition
+            labelnames: Names of the labels every sample carries
+
+        Returns:
+            Counter instance
+        """
+        return self._register(Counter(f"{self.namespace}_{name}", help_text, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """
+        Get or create a histogram.
+
+        Args:
+            name: Metric name without the namespace prefix
+            help_text: Description shown in the exposition
+            labelnames: Names of the labels every sample carries
+            buckets: Upper bounds of the buckets
+
+        Returns:
+            Histogram instance
+        """
+        return self._register(Histogram(f"{self.namespace}_{name}", help_text, labelnames, buckets))
+
+    def register_stats(self, component: str, provider: StatsProvider, label: Optional[str] = None) -> None:
+        """
+        Expose a component's stats dict as gauges.
+
+        Numeric and boolean values become ``<namespace>_<component>_<key>``
+        gauges; nested dicts extend the name with their keys. When ``label``
+        is given, the top-level keys are instance names (e.g. backend names)
+        and become that label's values instead of part of the name.
+
+        Args:
+            component: Name fragment identifying the component
+            provider: Returns the stats dict, or None if the component is not running
+            label: Optional label name for the top-level keys
+        """
+        with self._lock:
+            self._providers[component] = (provider, label)
+
+    def _collect_gauges(self) -> Dict[str, List[Tuple[str, float]]]:
+        """Call every stats provider and flatten its numbers into gauge samples."""
+        gauges: Dict[str, List[Tuple[str, float]]] = {}
+
+        def flatten(prefix: str, stats: dict, labels: str) -> None:
+            for key, value in stats.items():
+                name = f"{prefix}_{_metric_name(str(key))}"
+                if isinstance(value, dict):
+                    flatten(name, value, labels)
+                elif isinstance(value, (bool, int, float)):
+                    gauges.setdefault(name, []).append((labels, float(value)))
+
+        with self._lock:
+            providers = list(self._providers.items())
+
+        for component, (provider, label) in providers:
+            try:
+                stats = provider()
+            except Exception:
+                continue
+            if not stats:
+                continue
+            prefix = f"{self.namespace}_{_metric_name(component)}"
+            if label:
+                for instance, instance_stats in stats.items():
+                    if isinstance(instance_stats, dict):
+                        flatten(prefix, instance_stats, _format_labels((label,), (str(instance),)))
+            else:
+                flatten(prefix, stats, "")
+        return gauges
+
+    def render(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+
+        Returns:
+            Exposition text, ending with a newline
+        """
+        lines: List[str] = []
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+
+        for metric in metrics:
+            samples = metric.render()
+            if samples:
+                lines.extend(metric.header())
+                lines.extend(samples)
+
+        for name, samples in sorted(self._collect_gauges().items()):
+            lines.append(f"# TYPE {name} gauge")
+            lines.extend(f"{name}{labels} {_format_value(value)}" for labels, value in samples)
+
+        return "\n".join(lines) + "\n"
+
+
+# Singleton registry shared by the whole process
+_registry_instance: Optional[MetricsRegistry] = None
+
+
+def get_metrics() -> MetricsRegistry:
+    """
+    Get singleton metrics registry.
+
+    Returns:
+        MetricsRegistry instance
+    """
+    global _registry_instance
+    if _registry_instance is None:
+        _registry_instance = MetricsRegistry()
+    return _registry_instance
+
+
+@contextmanager
+def timed(histogram: Histogram, **labels: str) -> Iterator[None]:
+    """
+    Observe the duration of a block in a latency histogram.
+
+    The histogram must have an "outcome" label, set to "error" if the block
+    raised and "ok" otherwise. Works around ``await`` expressions inside the
+    block.
+
+    Args:
+        histogram: Histogram to observe, in seconds
+        **labels: Label values other than outcome
+    """
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        histogram.observe(time.perf_counter() - start, outcome=outcome, **labels)
+
+
+def stage_timer(stage: str):
+    """
+    Time a block as one pipeline stage.
+
+    Args:
+        stage: Stage name: extraction, cache, upstream, parse, summary or send
+
+    Returns:
+        Context manager observing STAGE_SECONDS
+    """
+    return timed(STAGE_SECONDS, stage=stage)
+
+
+STAGE_SECONDS = get_metrics().histogram(
+    "stage_duration_seconds",
+    "Latency of each pipeline stage",
+    ("stage", "outcome")
+)
+PIPELINE_SECONDS = get_metrics().histogram(
+    "pipeline_duration_seconds",
+    "End-to-end latency of a search request or WhatsApp message",
+    ("pipeline", "outcome")
+)
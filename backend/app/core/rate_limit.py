@@ -0,0 +1,390 @@
+"""Token-bucket rate limiting (GCRA) with in-process or Redis-compatible state."""
+from typing import Any, Awaitable, Callable, Optional, Tuple, Union
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from app.core.errors import RateLimitException
+from app.core.logger import get_logger
+import inspect
+import time
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class RateLimitResult:
+    """Outcome of one rate limit check."""
+
+    allowed: bool
+    remaining: int
+    retry_after: float = 0.0
+
+
+def gcra(now: float, tat: Optional[float], interval: float, burst: int) -> Tuple[bool, float, float, int]:
+    """
+    One step of the generic cell rate algorithm, a token bucket kept as one number.
+
+    The state is the theoretical arrival time (TAT): when the bucket would be
+    full again. A request is allowed if, after adding ``interval`` to the TAT,
+    the bucket is still no more than ``burst`` requests ahead of ``now``.
+
+    Args:
+        now: Current time in seconds
+        tat: Stored theoretical arrival time, or None for a new key
+        interval: Seconds per token (period / limit)
+        burst: Bucket capacity, i.e. requests allowed back to back
+
+    Returns:
+        (allowed, TAT to store, seconds until allowed, tokens left)
+    """
+    tat = max(tat or now, now)
+    new_tat = tat + interval
+    allow_at = new_tat - burst * interval
+    if now < allow_at:
+        return False, tat, allow_at - now, 0
+    remaining = int((now - allow_at) / interval)
+    return True, new_tat, 0.0, remaining
+
+
+class RateLimitBackend(ABC):
+    """Store for per-key bucket state with expiry."""
+
+    @abstractmethod
+    async def acquire(self, key: str, interval: float, burst: int) -> RateLimitResult:
+        """
+        Take one token for a key if the bucket has one.
+
+        Args:
+            key: Bucket identity, e.g. "ip:1.2.3.4"
+            interval: Seconds per token
+            burst: Bucket capacity
+
+        Returns:
+            RateLimitResult
+        """
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Process-local buckets, one float per key.
+
+    Keys are kept in recency order; a check moves its key to the end and
+    drops a few stale keys from the front, so state expires without a sweep
+    and stays under ``max_keys``. Every operation is O(1).
+    """
+
+    # Stale front keys inspected per check
+    PRUNE_PER_CHECK = 2
+
+    def __init__(self, max_keys: int = 100000):
+        """
+        Initialize in-memory backend.
+
+        Args:
+            max_keys: Maximum number of buckets kept
+        """
+        self.max_keys = max(1, max_keys)
+        self._tat: "OrderedDict[str, float]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+    async def acquire(self, key: str, interval: float, burst: int) -> RateLimitResult:
+        now = time.monotonic()
+        allowed, tat, retry_after, remaining = gcra(now, self._tat.pop(key, None), interval, burst)
+        # A TAT in the past means a full bucket, the same as no state at all
+        if tat > now:
+            self._tat[key] = tat
+        self._prune(now)
+        return RateLimitResult(allowed, remaining, retry_after)
+
+    def _prune(self, now: float) -> None:
+        """Drop expired buckets from the front and enforce the size bound."""
+        for _ in range(self.PRUNE_PER_CHECK):
+            if not self._tat:
+                break
+            key, tat = next(iter(self._tat.items()))
+            if tat > now:
+                break
+            del self._tat[key]
+        while len(self._tat) > self.max_keys:
+            self._tat.popitem(last=False)
+
+
+# Atomic GCRA step; KEYS[1] bucket, ARGV now, interval, burst
+GCRA_SCRIPT = """
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local burst = tonumber(ARGV[3])
+local tat = tonumber(redis.call('GET', KEYS[1]) or ARGV[1])
+if tat < now then tat = now end
+local new_tat = tat + interval
+local allow_at = new_tat - burst * interval
+if now < allow_at then
+    return {0, tostring(allow_at - now)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, tostring(now - allow_at)}
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Buckets shared by every process through Redis or a compatible store.
+
+    Each check is one atomic Lua script call; keys expire when their bucket
+    is full again. Any client with an async ``eval(script, numkeys, *args)``
+    works.
+    """
+
+    def __init__(self, client: Any, prefix: str = "halcon:ratelimit:"):
+        """
+        Initialize Redis backend.
+
+        Args:
+            client: Async Redis-compatible client
+            prefix: Namespace prepended to every key
+        """
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = "halcon:ratelimit:") -> "RedisRateLimitBackend":
+        """
+        Create a backend connected to a Redis URL.
+
+        Args:
+            url: Redis connection URL
+            prefix: Namespace prepended to every key
+
+        Returns:
+            RedisRateLimitBackend instance
+
+        Raises:
+            RuntimeError: If the optional ``redis`` package is not installed
+        """
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError:
+            raise RuntimeError("Redis rate limit backend requires the 'redis' package")
+        return cls(redis_asyncio.from_url(url, decode_responses=True), prefix)
+
+    async def acquire(self, key: str, interval: float, burst: int) -> RateLimitResult:
+        # Wall clock, since the state is shared between hosts
+        allowed, value = await self.client.eval(
+            GCRA_SCRIPT, 1, self.prefix + key, repr(time.time()), repr(interval), str(burst)
+        )
+        if isinstance(value, bytes):
+            value = value.decode("utf-8")
+        if int(allowed):
+            return RateLimitResult(True, int(float(value) / interval))
+        return RateLimitResult(False, 0, float(value))
+
+
+def build_rate_limit_backend(kind: str, max_keys: int, redis_url: str = "") -> RateLimitBackend:
+    """
+    Create a rate limit backend from configuration values.
+
+    Args:
+        kind: "memory" or "redis"
+        max_keys: Bucket bound for the in-memory backend
+        redis_url: Connection URL for the Redis backend
+
+    Returns:
+        RateLimitBackend instance
+    """
+    if kind == "redis":
+        if not redis_url:
+            raise RuntimeError("Redis rate limit backend requires REDIS_URL")
+        return RedisRateLimitBackend.from_url(redis_url)
+    return InMemoryRateLimitBackend(max_keys)
+
+
+class RateLimiter:
+    """
+    Allows each key ``limit`` requests per ``period`` with bursts up to ``burst``.
+
+    Backend errors fail open: a broken shared store must not take the API
+    down with it.
+    """
+
+    def __init__(self, backend: RateLimitBackend, limit: int, period: float = 60.0, burst: Optional[int] = None):
+        """
+        Initialize limiter.
+
+        Args:
+            backend: Bucket state store
+            limit: Requests allowed per period, sustained
+            period: Period in seconds
+            burst: Requests allowed back to back (defaults to ``limit``)
+        """
+        self.backend = backend
+        self.limit = max(1, limit)
+        self.interval = period / self.limit
+        self.burst = max(1, burst if burst is not None else self.limit)
+
+        # Counters
+        self.allowed = 0
+        self.limited = 0
+        self.errors = 0
+
+    async def check(self, key: str) -> RateLimitResult:
+        """
+        Count a request against a key.
+
+        Args:
+            key: Bucket identity
+
+        Returns:
+            RateLimitResult; allowed if the backend failed
+        """
+        try:
+            result = await self.backend.acquire(key, self.interval, self.burst)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Rate limit check failed, allowing request: {e}")
+            return RateLimitResult(True, self.burst)
+
+        if result.allowed:
+            self.allowed += 1
+        else:
+            self.limited += 1
+        return result
+
+    async def enforce(self, key: str) -> RateLimitResult:
+        """
+        Count a request against a key, raising if it is over the limit.
+
+        Args:
+            key: Bucket identity
+
+        Returns:
+            RateLimitResult of an allowed request
+
+        Raises:
+            RateLimitException: If the key is out of tokens
+        """
+        result = await self.check(key)
+        if not result.allowed:
+            logger.info(f"Rate limit exceeded for {key}, retry in {result.retry_after:.1f}s")
+            raise RateLimitException(retry_after=result.retry_after)
+        return result
+
+    def stats(self) -> dict:
+        """Return allow/limit counters."""
+        return {
+            "allowed": self.allowed,
+            "limited": self.limited,
+            "errors": self.errors
+        }
+
+
+LimiterGetter = Callable[[], Optional[RateLimiter]]
+KeyFunc = Callable[[Request], Union[Optional[str], Awaitable[Optional[str]]]]
+
+
+def client_ip(scope: dict, trust_forwarded: bool = False) -> str:
+    """
+    Address of the client that sent a request.
+
+    Args:
+        scope: ASGI connection scope
+        trust_forwarded: Use the first X-Forwarded-For hop (only behind a
+            proxy that sets it, since clients can forge it otherwise)
+
+    Returns:
+        Client IP, or "unknown"
+    """
+    if trust_forwarded:
+        for name, value in scope.get("headers") or []:
+            if name == b"x-forwarded-for":
+                forwarded = value.decode("latin-1").split(",")[0].strip()
+                if forwarded:
+                    return forwarded
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def rate_limit_response(exc: RateLimitException) -> JSONResponse:
+    """Render a RateLimitException the way FastAPI renders HTTPExceptions."""
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail},
+        headers=exc.headers
+    )
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware limiting every HTTP request by client IP.
+
+    The limiter is looked up per request, so it can be configured after the
+    app is built; when the getter returns None requests pass through.
+    """
+
+    def __init__(
+        self,
+        app,
+        get_limiter: LimiterGetter,
+        trust_forwarded: bool = False,
+        exclude_paths: tuple = ()
+    ):
+        """
+        Initialize middleware.
+
+        Args:
+            app: Wrapped ASGI application
+            get_limiter: Returns the limiter to apply, or None when disabled
+            trust_forwarded: Take the client IP from X-Forwarded-For
+            exclude_paths: Path prefixes that are not limited
+        """
+        self.app = app
+        self.get_limiter = get_limiter
+        self.trust_forwarded = trust_forwarded
+        self.exclude_paths = exclude_paths
+
+    async def __call__(self, scope, receive, send):
+        limiter = self.get_limiter() if scope["type"] == "http" else None
+        if limiter is None or scope["path"].startswith(self.exclude_paths):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await limiter.enforce(f"ip:{client_ip(scope, self.trust_forwarded)}")
+        except RateLimitException as e:
+            await rate_limit_response(e)(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+
+class RateLimitDependency:
+    """
+    FastAPI dependency limiting requests by a key taken from the request.
+
+    Requests the key function returns None for are not limited. The key
+    function may be a coroutine, e.g. to read a field of the JSON body.
+    """
+
+    def __init__(self, get_limiter: LimiterGetter, key_func: KeyFunc):
+        """
+        Initialize dependency.
+
+        Args:
+            get_limiter: Returns the limiter to apply, or None when disabled
+            key_func: Builds the bucket key for a request
+        """
+        self.get_limiter = get_limiter
+        self.key_func = key_func
+
+    async def __call__(self, request: Request) -> None:
+        limiter = self.get_limiter()
+        if limiter is None:
+            return
+        key = self.key_func(request)
+        if inspect.isawaitable(key):
+            key = await key
+        if key:
+            await limiter.enforce(key)
@@ -0,0 +1,83 @@
+"""Single-flight: concurrent callers with the same key share one in-flight call."""
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+import asyncio
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls by key.
+
+    The first caller for a key starts the call; callers arriving while it is in
+    flight await the same result instead of starting their own. The call runs
+    in its own task, so a cancelled caller does not cancel it for the others.
+    Nothing is cached: once the call finishes the next caller starts a new one.
+    """
+
+    def __init__(self, name: str):
+        """
+        Initialize single-flight group.
+
+        Args:
+            name: Label used in stats and logs
+        """
+        self.name = name
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        # Counters
+        self.calls = 0
+        self.upstream = 0
+        self.saved = 0
+
+    async def do(
+        self,
+        key: str,
+        fn: Callable[[], Awaitable[T]],
+        copy: Optional[Callable[[T], T]] = None
+    ) -> T:
+        """
+        Run ``fn`` for a key, or join the call already in flight for it.
+
+        Args:
+            key: Identity of the call; equal keys must mean equal results
+            fn: Zero-argument coroutine function performing the call
+            copy: Optional function applied to the shared result for callers
+                that joined, so they cannot mutate each other's result
+
+        Returns:
+            Result of the call
+
+        Raises:
+            Exception: Whatever the shared call raised
+        """
+        self.calls += 1
+        task = self._inflight.get(key)
+        joined = task is not None
+
+        if joined:
+            self.saved += 1
+        else:
+            self.upstream += 1
+            task = asyncio.create_task(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+
+        result = await asyncio.shield(task)
+        return copy(result) if joined and copy else result
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        """Forget a finished call and mark its exception as retrieved."""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        """Return call counters."""
+        return {
+            "calls": self.calls,
+            "upstream": self.upstream,
+            "saved": self.saved,
+            "in_flight": len(self._inflight)
+        }
@@ -0,0 +1,553 @@
+"""Lightweight tracing: contextvar-scoped spans, sampling and batched export."""
+from typing import Any, Dict, Iterator, List, Optional
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import asyncio
+import json
+import os
+import random
+import re
+import time
+import httpx
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+@dataclass
+class SpanContext:
+    """Identity of a span as carried across process and queue boundaries."""
+
+    trace_id: str
+    span_id: str
+    sampled: bool
+
+    def traceparent(self) -> str:
+        """Format as a W3C ``traceparent`` header value."""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[SpanContext]:
+    """
+    Parse a W3C ``traceparent`` header value.
+
+    Args:
+        value: Header value, e.g. ``00-<32 hex>-<16 hex>-01``
+
+    Returns:
+        SpanContext, or None if the value is missing or malformed
+    """
+    if not value:
+        return None
+    match = TRACEPARENT_PATTERN.match(value.strip().lower())
+    if not match or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return SpanContext(
+        trace_id=match.group(1),
+        span_id=match.group(2),
+        sampled=bool(int(match.group(3), 16) & 1)
+    )
+
+
+@dataclass
+class Span:
+    """One timed operation in a trace."""
+
+    name: str
+    context: SpanContext
+    parent_id: Optional[str]
+    # True if this span started the trace in this process (no local parent)
+    local_root: bool
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        """Span duration in milliseconds (0 while running)."""
+        return (self.end_ns - self.start_ns) / 1e6 if self.end_ns else 0.0
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach an attribute; None values are skipped."""
+        if value is not None:
+            self.attributes[key] = value
+
+    def as_dict(self, service_name: str) -> dict:
+        """Flat JSON representation, one object per span."""
+        return {
+            "service": service_name,
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+            "attributes": self.attributes
+        }
+
+
+class _NoopSpan:
+    """Stand-in yielded when tracing is off, so call sites need no checks."""
+
+    context = None
+    attributes: Dict[str, Any] = {}
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class SpanExporter(ABC):
+    """Destination for finished spans."""
+
+    @abstractmethod
+    async def export(self, spans: List[Span], service_name: str) -> None:
+        """
+        Export a batch of finished spans.
+
+        Args:
+            spans: Spans to export
+            service_name: Name of the emitting service
+        """
+
+    async def close(self) -> None:
+        """Release resources held by the exporter."""
+
+
+class JsonlSpanExporter(SpanExporter):
+    """Appends one JSON object per span to a local file."""
+
+    def __init__(self, path: str):
+        """
+        Initialize exporter.
+
+        Args:
+            path: File to append spans to
+        """
+        self.path = path
+
+    async def export(self, spans: List[Span], service_name: str) -> None:
+        lines = "".join(
+            json.dumps(span.as_dict(service_name), ensure_ascii=False, default=str) + "\n"
+            for span in spans
+        )
+        await asyncio.to_thread(self._append, lines)
+
+    def _append(self, lines: str) -> None:
+        """Write lines to the file (runs in a thread)."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+class OtlpHttpSpanExporter(SpanExporter):
+    """Posts spans to an OpenTelemetry collector using OTLP/HTTP with JSON encoding."""
+
+    def __init__(self, endpoint: str, timeout: float = 5.0):
+        """
+        Initialize exporter.
+
+        Args:
+            endpoint: Collector base URL, e.g. http://localhost:4318
+            timeout: Request timeout in seconds
+        """
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.client = httpx.AsyncClient(timeout=timeout)
+
+    async def export(self, spans: List[Span], service_name: str) -> None:
+        body = {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": "halcon"},
+                    "spans": [_otlp_span(span) for span in spans]
+                }]
+            }]
+        }
+        response = await self.client.post(self.url, json=body)
+        response.raise_for_status()
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+def _otlp_attribute(key: str, value: Any) -> dict:
+    """Encode one attribute as an OTLP KeyValue."""
+    if isinstance(value, bool):
+        encoded = {"boolValue": value}
+    elif isinstance(value, int):
+        encoded = {"intValue": str(value)}
+    elif isinstance(value, float):
+        encoded = {"doubleValue": value}
+    else:
+        encoded = {"stringValue": str(value)}
+    return {"key": key, "value": encoded}
+
+
+def _otlp_span(span: Span) -> dict:
+    """Encode a span in OTLP JSON."""
+    encoded = {
+        "traceId": span.context.trace_id,
+        "spanId": span.context.span_id,
+        "name": span.name,
+        "kind": 1,  # SPAN_KIND_INTERNAL
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [_otlp_attribute(key, value) for key, value in span.attributes.items()],
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1}
+    }
+    if span.parent_id:
+        encoded["parentSpanId"] = span.parent_id
+    return encoded
+
+
+def build_span_exporter(kind: str, jsonl_path: str = "", otlp_endpoint: str = "") -> SpanExporter:
+    """
+    Create the configured span exporter.
+
+    Args:
+        kind: "jsonl" or "otlp"
+        jsonl_path: File for the JSONL exporter
+        otlp_endpoint: Collector base URL for the OTLP exporter
+
+    Returns:
+        SpanExporter instance
+
+    Raises:
+        ValueError: If the kind is unknown
+    """
+    if kind == "jsonl":
+        return JsonlSpanExporter(jsonl_path)
+    if kind == "otlp":
+        return OtlpHttpSpanExporter(otlp_endpoint)
+    raise ValueError(f"Unknown tracing exporter '{kind}'")
+
+
+class Tracer:
+    """
+    Creates spans and exports the traces worth keeping.
+
+    The current span lives in a contextvar, so spans opened in tasks created
+    inside another span (``asyncio.create_task`` copies the context) become
+    its children. Spans are buffered per trace until the trace's local root
+    ends; the trace is then exported if it was sampled, was slower than
+    ``slow_ms`` or failed, and dropped otherwise. This keeps tail-latency
+    outliers even at a low sample rate. Exports run in the background in
+    batches; when the buffer is full, new spans are dropped.
+
+    The tracer is disabled until ``start`` is called, and a disabled tracer
+    yields a no-op span without touching the context.
+    """
+
+    # Finished traces whose keep/drop decision is remembered for late spans
+    DECIDED_TRACES = 1024
+
+    def __init__(self):
+        """Initialize a disabled tracer."""
+        self.enabled = False
+        self.exporter: Optional[SpanExporter] = None
+        self.service_name = "halcon-backend"
+        self.sample_rate = 1.0
+        self.slow_ms = 0.0
+        self.flush_interval = 5.0
+        self.max_buffer = 2048
+
+        self._pending: Dict[str, List[Span]] = {}
+        # trace id -> local roots of that trace still running
+        self._open_roots: Dict[str, int] = {}
+        self._decided: "OrderedDict[str, bool]" = OrderedDict()
+        self._buffer: List[Span] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+        # Counters
+        self.traces_kept = 0
+        self.traces_dropped = 0
+        self.spans_exported = 0
+        self.spans_dropped = 0
+        self.export_errors = 0
+
+    def start(
+        self,
+        exporter: SpanExporter,
+        service_name: str = "halcon-backend",
+        sample_rate: float = 1.0,
+        slow_ms: float = 0.0,
+        flush_interval: float = 5.0,
+        max_buffer: int = 2048
+    ) -> None:
+        """
+        Enable tracing and start the background exporter.
+
+        Args:
+            exporter: Destination for kept spans
+            service_name: Service name attached to exported spans
+            sample_rate: Fraction of new traces kept regardless of latency
+            slow_ms: Traces whose local root takes at least this long are
+                always kept (0 disables the latency rule)
+            flush_interval: Seconds between background exports
+            max_buffer: Maximum spans waiting for export
+        """
+        if self.enabled:
+            return
+        self.exporter = exporter
+        self.service_name = service_name
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self.slow_ms = max(slow_ms, 0.0)
+        self.flush_interval = flush_interval
+        self.max_buffer = max(1, max_buffer)
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._export_loop(), name="trace-exporter")
+        self.enabled = True
+        logger.info(
+            f"Tracing enabled ({type(exporter).__name__}, sample rate {self.sample_rate}, "
+            f"slow threshold {self.slow_ms}ms)"
+        )
+
+    async def close(self) -> None:
+        """Stop the background exporter and flush what is buffered."""
+        if not self.enabled:
+            return
+        self.enabled = False
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+        if self.exporter:
+            await self.exporter.close()
+        logger.info(f"Tracing closed, stats: {self.stats()}")
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        parent: Optional[SpanContext] = None,
+        **attributes: Any
+    ) -> Iterator[Any]:
+        """
+        Open a span around a block, as a child of the current span.
+
+        Usable around ``await`` expressions. An exception raised in the block
+        marks the span as failed and is re-raised.
+
+        Args:
+            name: Operation name
+            parent: Remote parent (e.g. from a queued job's traceparent),
+                used only when there is no current span
+            **attributes: Initial span attributes
+
+        Yields:
+            The span, for adding attributes (a no-op span when disabled)
+        """
+        if not self.enabled:
+            yield NOOP_SPAN
+            return
+
+        current = _current_span.get()
+        if current is not None:
+            context = SpanContext(current.context.trace_id, _new_id(8), current.context.sampled)
+            parent_id = current.context.span_id
+        elif parent is not None:
+            context = SpanContext(parent.trace_id, _new_id(8), parent.sampled)
+            parent_id = parent.span_id
+        else:
+            context = SpanContext(_new_id(16), _new_id(8), random.random() < self.sample_rate)
+            parent_id = None
+
+        span = Span(
+            name=name,
+            context=context,
+            parent_id=parent_id,
+            local_root=current is None,
+            attributes={key: value for key, value in attributes.items() if value is not None}
+        )
+        if span.local_root:
+            self._open_roots[context.trace_id] = self._open_roots.get(context.trace_id, 0) + 1
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            self._finish(span)
+
+    def current_span(self) -> Any:
+        """Return the active span, or a no-op span if there is none."""
+        return _current_span.get() or NOOP_SPAN
+
+    def current_traceparent(self) -> Optional[str]:
+        """Return the ``traceparent`` of the active span, for propagation."""
+        span = _current_span.get()
+        return span.context.traceparent() if span else None
+
+    def _finish(self, span: Span) -> None:
+        """Buffer a finished span and decide its trace once the local root ends."""
+        trace_id = span.context.trace_id
+
+        if not span.local_root:
+            if trace_id in self._open_roots:
+                self._pending.setdefault(trace_id, []).append(span)
+            elif self._decided.get(trace_id):
+                # A background child outliving its root follows the root's decision
+                self._enqueue([span])
+            return
+
+        remaining = self._open_roots.get(trace_id, 1) - 1
+        if remaining > 0:
+            self._open_roots[trace_id] = remaining
+        else:
+            self._open_roots.pop(trace_id, None)
+
+        spans = self._pending.pop(trace_id, []) + [span]
+        keep = (
+            span.context.sampled
+            or span.error is not None
+            or (self.slow_ms > 0 and span.duration_ms >= self.slow_ms)
+        )
+        self._decided[trace_id] = keep or self._decided.get(trace_id, False)
+        self._decided.move_to_end(trace_id)
+        while len(self._decided) > self.DECIDED_TRACES:
+            self._decided.popitem(last=False)
+
+        if keep:
+            self.traces_kept += 1
+            self._enqueue(spans)
+        else:
+            self.traces_dropped += 1
+
+    def _enqueue(self, spans: List[Span]) -> None:
+        """Add spans to the export buffer, dropping them if it is full."""
+        room = self.max_buffer - len(self._buffer)
+        if room < len(spans):
+            self.spans_dropped += len(spans) - max(room, 0)
+            spans = spans[:max(room, 0)]
+        self._buffer.extend(spans)
+        if self._wakeup and len(self._buffer) >= self.max_buffer // 2:
+            self._wakeup.set()
+
+    async def flush(self) -> None:
+        """Export every buffered span now."""
+        if not self._buffer or not self.exporter:
+            return
+        batch, self._buffer = self._buffer, []
+        try:
+            await self.exporter.export(batch, self.service_name)
+            self.spans_exported += len(batch)
+        except Exception as e:
+            self.export_errors += 1
+            self.spans_dropped += len(batch)
+            logger.warning(f"Failed to export {len(batch)} spans: {e}")
+
+    async def _export_loop(self) -> None:
+        """Flush periodically, or early when the buffer fills up."""
+        while True:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    def stats(self) -> dict:
+        """Return trace and export counters."""
+        return {
+            "enabled": self.enabled,
+            "traces_kept": self.traces_kept,
+            "traces_dropped": self.traces_dropped,
+            "traces_open": len(self._open_roots),
+            "spans_buffered": len(self._buffer),
+            "spans_exported": self.spans_exported,
+            "spans_dropped": self.spans_dropped,
+            "export_errors": self.export_errors
+        }
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware opening a root span per HTTP request.
+
+    An inbound ``traceparent`` header makes the request part of the caller's
+    trace. The span stays open until the response body has been sent, so
+    streaming responses are timed completely. A 5xx response marks the span
+    as failed even when no exception escaped the app, since endpoints turn
+    their errors into HTTPException responses.
+    """
+
+    def __init__(self, app, exclude_paths: tuple = ("/metrics", "/api/health")):
+        """
+        Initialize middleware.
+
+        Args:
+            app: Wrapped ASGI application
+            exclude_paths: Path prefixes that are not traced (probes, scrapes)
+        """
+        self.app = app
+        self.exclude_paths = exclude_paths
+
+    async def __call__(self, scope, receive, send):
+        tracer = get_tracer()
+        if (
+            scope["type"] != "http"
+            or not tracer.enabled
+            or scope["path"].startswith(self.exclude_paths)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        parent = parse_traceparent(headers.get(b"traceparent", b"").decode("latin-1"))
+
+        with tracer.span(
+            f"{scope['method']} {scope['path']}",
+            parent=parent,
+            **{"http.method": scope["method"], "http.target": scope["path"]}
+        ) as span:
+            async def send_with_status(message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.error = f"HTTP {message['status']}"
+                await send(message)
+
+            await self.app(scope, receive, send_with_status)
+
+
+def _new_id(num_bytes: int) -> str:
+    """Random non-zero hex identifier."""
+    return f"{random.getrandbits(num_bytes * 8) or 1:0{num_bytes * 2}x}"
+
+
+# Singleton tracer shared by the whole process
+_tracer_instance: Optional[Tracer] = None
+
+
+def get_tracer() -> Tracer:
+    """
+    Get singleton tracer (disabled until started).
+
+    Returns:
+        Tracer instance
+    """
+    global _tracer_instance
+    if _tracer_instance is None:
+        _tracer_instance = Tracer()
+    return _tracer_instance
@@ -5,7 +5,24 @@ from contextlib import asynccontextmanager
 from app.config import get_settings
 from app.api.v1 import search, webhooks, health
 from app.core.logger import setup_logging, get_logger
+from app.core.metrics import get_metrics
+from app.core.http import pool_usage
+from app.core.tracing import TracingMiddleware, build_span_exporter, get_tracer
+from app.core.rate_limit import RateLimitMiddleware
 from app.scrapers.mercadolibre import get_scraper
+from app.scrapers.mercadolibre_api import get_api_client
+from app.scrapers.mercadolibre_html import get_html_client
+from app.services.openai_client import get_openai_manager
+from app.services.whatsapp_transport import get_whatsapp_transport
+from app.services.message_queue import get_message_queue
+from app.services.message_dedup import get_message_deduplicator
+from app.services.coalescer import get_message_coalescer
+from app.services.search_backends import get_search_chain
+from app.services.result_cache import get_result_cache
+from app.services.extraction_cache import get_extraction_cache
+from app.services.rate_limiter import get_ip_rate_limiter, rate_limit_stats
+from app.services.governors import governor_stats
+from app.services.circuit_breakers import breaker_stats
 import uvicorn
 
 # Initialize settings and logging
@@ -14,18 +31,96 @@ setup_logging("INFO" if not settings.DEBUG else "DEBUG")
 logger = get_logger(__name__)
 
 
+def start_tracing() -> None:
+    """Start the process-wide tracer with the configured exporter and sampling."""
+    get_tracer().start(
+        build_span_exporter(
+            settings.TRACING_EXPORTER,
+            jsonl_path=settings.TRACING_JSONL_PATH,
+            otlp_endpoint=settings.TRACING_OTLP_ENDPOINT
+        ),
+        service_name=settings.TRACING_SERVICE_NAME,
+        sample_rate=settings.TRACING_SAMPLE_RATE,
+        slow_ms=settings.TRACING_SLOW_MS,
+        flush_interval=settings.TRACING_FLUSH_INTERVAL
+    )
+
+
+async def register_component_metrics() -> None:
+    """Expose the stats of every long-lived component as metrics gauges."""
+    metrics = get_metrics()
+
+    openai_manager = get_openai_manager()
+    metrics.register_stats("openai_http", lambda: {
+        **openai_manager.get_stats(),
+        "pool": pool_usage(openai_manager.http_client)
+    })
+
+    whatsapp_transport = get_whatsapp_transport()
+    metrics.register_stats("whatsapp", lambda: {
+        **whatsapp_transport.get_stats(),
+        "pool": pool_usage(whatsapp_transport.client)
+    })
+
+    api_client = await get_api_client()
+    metrics.register_stats("api_client", lambda: {
+        "pool": pool_usage(api_client.client),
+        "single_flight": api_client.flight.stats()
+    })
+
+    html_client = await get_html_client()
+    metrics.register_stats("html_client", lambda: {
+        "pool": pool_usage(html_client.client),
+        "single_flight": html_client.flight.stats()
+    })
+
+    scraper = await get_scraper()
+    metrics.register_stats("browser", scraper.stats)
+    metrics.register_stats("search_backend", get_search_chain().get_stats, label="backend")
+    metrics.register_stats("message_queue", get_message_queue().counters)
+    metrics.register_stats("tracing", get_tracer().stats)
+    metrics.register_stats("rate_limit", rate_limit_stats, label="scope")
+    metrics.register_stats("governor", governor_stats, label="upstream")
+    metrics.register_stats("circuit_breaker", breaker_stats, label="upstream")
+
+    for component, instance in (
+        ("result_cache", get_result_cache()),
+        ("extraction_cache", get_extraction_cache()),
+        ("message_dedup", get_message_deduplicator())
+    ):
+        if instance:
+            metrics.register_stats(component, instance.stats)
+
+    if settings.MESSAGE_COALESCE_ENABLED:
+        metrics.register_stats("coalescer", get_message_coalescer().stats)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Application lifespan manager.
 
     Handles startup and shutdown events:
-    - Startup: Initialize Playwright browser
+    - Startup: Initialize shared OpenAI and WhatsApp clients, Playwright browser
+      and the WhatsApp message queue workers
     - Shutdown: Clean up resources
     """
     # Startup
     logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
 
+    # Tracing first, so startup work can already be traced
+    tracer = get_tracer()
+    if settings.TRACING_ENABLED:
+        start_tracing()
+
+    # Shared OpenAI client with a pooled, keep-alive connection
+    openai_manager = get_openai_manager()
+    openai_manager.start()
+
+    # Shared WhatsApp Cloud API connection pool
+    whatsapp_transport = get_whatsapp_transport()
+    whatsapp_transport.start()
+
     # Initialize scraper (starts Playwright browser)
     try:
         scraper = await get_scraper()
@@ -34,10 +129,30 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.warning(f"Failed to initialize browser on startup: {e}")
 
+    # Durable WhatsApp message queue and its worker pool
+    message_queue = get_message_queue()
+    webhooks.register_whatsapp_jobs(message_queue)
+    await message_queue.start()
+
+    # Pool and component gauges for /metrics
+    if settings.METRICS_ENABLED:
+        await register_component_metrics()
+
     yield
 
     # Shutdown
     logger.info("Shutting down application")
+
+    # Stop workers first; interrupted jobs are requeued on next start
+    try:
+        await message_queue.close()
+    except Exception as e:
+        logger.error(f"Error closing message queue: {e}")
+
+    dedup = get_message_deduplicator()
+    if dedup:
+        logger.info(f"Webhook message dedup stats: {dedup.stats()}")
+
     try:
         scraper = await get_scraper()
         await scraper.close()
@@ -45,6 +160,22 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Error closing browser: {e}")
 
+    try:
+        await openai_manager.close()
+    except Exception as e:
+        logger.error(f"Error closing OpenAI client: {e}")
+
+    try:
+        await whatsapp_transport.close()
+    except Exception as e:
+        logger.error(f"Error closing WhatsApp transport: {e}")
+
+    # Last, so spans from the shutdown above are exported
+    try:
+        await tracer.close()
+    except Exception as e:
+        logger.error(f"Error closing tracer: {e}")
+
 
 # Create FastAPI application
 app = FastAPI(
@@ -57,6 +188,19 @@ app = FastAPI(
 )
 
 
+# Per-IP limit on every request; the webhook is limited per sender instead
+app.add_middleware(
+    RateLimitMiddleware,
+    get_limiter=get_ip_rate_limiter,
+    trust_forwarded=settings.RATE_LIMIT_TRUST_FORWARDED,
+    exclude_paths=("/api/health", "/metrics", "/api/v1/webhooks")
+)
+
+
+# Root span per request; a no-op unless TRACING_ENABLED
+app.add_middleware(TracingMiddleware)
+
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -73,6 +217,10 @@ app.include_router(webhooks.router, prefix="/api/v1")
 app.include_router(health.router, prefix="/api")
 
 
+# Prometheus scrapes /metrics by default
+app.add_api_route("/metrics", health.metrics, methods=["GET"], include_in_schema=False)
+
+
 @app.get("/")
 async def root():
     """
@@ -91,8 +239,10 @@ async def root():
         },
         "endpoints": {
             "search": "/api/v1/search",
+            "search_stream": "/api/v1/search/stream",
             "webhooks": "/api/v1/webhooks/whatsapp",
-            "health": "/api/health"
+            "health": "/api/health",
+            "metrics": "/metrics"
         }
     }
 
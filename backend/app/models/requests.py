@@ -2,6 +2,9 @@ from pydantic import BaseModel, Field, field_validator
 from typing import Optional, Dict, Any
 from enum import Enum
 
+# Largest result set a single search may ask for; larger ones are paginated upstream
+MAX_NUM_RESULTS = 200
+
 
 class ProductCondition(str, Enum):
     """Product condition types."""
@@ -55,8 +58,8 @@ class ExtractedProductRequest(BaseModel):
     num_results: int = Field(
         10,
         ge=1,
-        le=50,
-        description="Number of results to return (1-50)"
+        le=MAX_NUM_RESULTS,
+        description=f"Number of results to return (1-{MAX_NUM_RESULTS})"
     )
     additional_filters: Optional[Dict[str, Any]] = Field(
         default_factory=dict,
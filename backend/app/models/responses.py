@@ -94,9 +94,10 @@ class ErrorResponse(BaseModel):
 class WhatsAppResponse(BaseModel):
     """Response for WhatsApp webhook."""
 
-    status: str = Field(..., description="Processing status")
+    status: str = Field(..., description="Processing status (accepted/duplicate/ignored)")
     message_id: str = Field(..., description="WhatsApp message ID")
     processing: bool = Field(default=True, description="Whether message is being processed")
+    detail: Optional[str] = Field(default=None, description="Why the message was not processed")
 
     model_config = {
         "json_schema_extra": {
@@ -111,6 +112,42 @@ class WhatsAppResponse(BaseModel):
     }
 
 
+class WhatsAppBatchResponse(BaseModel):
+    """Response for a WhatsApp webhook delivery, which may batch several events."""
+
+    status: str = Field(..., description="accepted if any message was queued, otherwise ignored")
+    accepted: int = Field(default=0, description="Messages queued for processing")
+    duplicates: int = Field(default=0, description="Messages already received before")
+    ignored: int = Field(default=0, description="Messages that are not processable text")
+    rate_limited: int = Field(default=0, description="Messages dropped by the per-sender rate limit")
+    statuses: int = Field(default=0, description="Delivery status events received")
+    results: List[WhatsAppResponse] = Field(default_factory=list, description="Per-message results")
+
+    model_config = {
+        "json_schema_extra": {
+            "examples": [
+                {
+                    "status": "accepted",
+                    "accepted": 1,
+                    "duplicates": 0,
+                    "ignored": 1,
+                    "rate_limited": 0,
+                    "statuses": 2,
+                    "results": [
+                        {"status": "accepted", "message_id": "wamid.123456789", "processing": True},
+                        {
+                            "status": "ignored",
+                            "message_id": "wamid.987654321",
+                            "processing": False,
+                            "detail": "Unsupported message type: image"
+                        }
+                    ]
+                }
+            ]
+        }
+    }
+
+
 class HealthResponse(BaseModel):
     """Health check response."""
 
@@ -0,0 +1,219 @@
+"""Pool of pre-warmed, stealth-configured browser contexts for the scraper."""
+from typing import Awaitable, Callable, List, Optional
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from playwright.async_api import Browser, BrowserContext, Page
+from app.core.logger import get_logger
+from app.core.errors import ScraperException
+import asyncio
+import time
+
+logger = get_logger(__name__)
+
+ContextSetup = Callable[[BrowserContext], Awaitable[None]]
+
+
+@dataclass
+class PooledPage:
+    """A browser context with its single page, as handed out by the pool."""
+
+    context: BrowserContext
+    page: Page
+    uses: int = 0
+    created_at: float = 0.0
+
+
+class BrowserContextPool:
+    """
+    Bounded pool of browser contexts, each holding one ready-to-use page.
+
+    Contexts are created up front with stealth, viewport and headers already
+    applied, checked out for a single scrape and returned afterwards. A context
+    is recycled after ``max_uses`` checkouts or when it fails a health check.
+    When every context is busy, callers wait up to ``acquire_timeout`` seconds
+    before a ScraperException is raised.
+    """
+
+    def __init__(
+        self,
+        browser: Browser,
+        size: int,
+        max_uses: int,
+        acquire_timeout: float,
+        context_options: dict,
+        setup: Optional[ContextSetup] = None
+    ):
+        """
+        Initialize pool.
+
+        Args:
+            browser: Running Playwright browser to create contexts on
+            size: Maximum number of contexts in the pool
+            max_uses: Checkouts before a context is closed and replaced
+            acquire_timeout: Seconds to wait for a free context
+            context_options: Keyword arguments for ``browser.new_context``
+            setup: Optional coroutine run on every new context (e.g. stealth)
+        """
+        self.browser = browser
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self.acquire_timeout = acquire_timeout
+        self.context_options = context_options
+        self.setup = setup
+
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.size)
+        self._all: List[PooledPage] = []
+        self._closed = False
+
+        # Counters
+        self.created = 0
+        self.recycled = 0
+        self.checkouts = 0
+        self.timeouts = 0
+
+    async def start(self) -> None:
+        """Pre-warm every context in the pool."""
+        results = await asyncio.gather(
+            *(self._create() for _ in range(self.size)),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to pre-warm browser context: {result}")
+            else:
+                self._idle.put_nowait(result)
+        logger.info(f"Browser context pool ready with {self._idle.qsize()}/{self.size} contexts")
+
+    async def close(self) -> None:
+        """Close every context owned by the pool."""
+        self._closed = True
+        for pooled in list(self._all):
+            await self._dispose(pooled)
+        while not self._idle.empty():
+            self._idle.get_nowait()
+        logger.info("Browser context pool closed")
+
+    @asynccontextmanager
+    async def page(self):
+        """
+        Check out a page for the duration of the ``async with`` block.
+
+        Yields:
+            Ready-to-use Playwright Page
+
+        Raises:
+            ScraperException: If the pool is closed or exhausted
+        """
+        pooled = await self.acquire()
+        healthy = True
+        try:
+            yield pooled.page
+        except Exception:
+            healthy = False
+            raise
+        finally:
+            await self.release(pooled, healthy=healthy)
+
+    async def acquire(self) -> PooledPage:
+        """
+        Check out a pooled page, waiting for one if the pool is exhausted.
+
+        Returns:
+            PooledPage that must be given back with ``release``
+
+        Raises:
+            ScraperException: If no context frees up within the timeout
+        """
+        if self._closed:
+            raise ScraperException("Browser context pool is closed")
+
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise ScraperException(
+                f"Browser context pool exhausted ({self.size} busy for {self.acquire_timeout}s)"
+            )
+
+        try:
+            pooled = self._idle.get_nowait() if not self._idle.empty() else None
+            if pooled is None or not await self._is_healthy(pooled):
+                if pooled is not None:
+                    await self._dispose(pooled)
+                pooled = await self._create()
+        except Exception as e:
+            self._slots.release()
+            raise ScraperException(f"Failed to create browser context: {e}")
+
+        pooled.uses += 1
+        self.checkouts += 1
+        return pooled
+
+    async def release(self, pooled: PooledPage, healthy: bool = True) -> None:
+        """
+        Return a page to the pool, recycling it when worn out or broken.
+
+        Args:
+            pooled: Page previously returned by ``acquire``
+            healthy: False if the caller hit an error while using the page
+        """
+        try:
+            if self._closed:
+                await self._dispose(pooled)
+            elif not healthy or pooled.uses >= self.max_uses:
+                self.recycled += 1
+                await self._dispose(pooled)
+            else:
+                self._idle.put_nowait(pooled)
+        finally:
+            self._slots.release()
+
+    def stats(self) -> dict:
+        """Return pool usage counters."""
+        return {
+            "size": self.size,
+            "open": len(self._all),
+            "idle": self._idle.qsize(),
+            "in_use": len(self._all) - self._idle.qsize(),
+            "created": self.created,
+            "recycled": self.recycled,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts
+        }
+
+    async def _create(self) -> PooledPage:
+        """Create a new context and page with the configured setup applied."""
+        context = await self.browser.new_context(**self.context_options)
+        try:
+            if self.setup:
+                await self.setup(context)
+            page = await context.new_page()
+        except Exception:
+            await context.close()
+            raise
+
+        pooled = PooledPage(context=context, page=page, created_at=time.monotonic())
+        self._all.append(pooled)
+        self.created += 1
+        return pooled
+
+    async def _is_healthy(self, pooled: PooledPage) -> bool:
+        """Check that the page is still open and its renderer responds."""
+        if pooled.page.is_closed() or not self.browser.is_connected():
+            return False
+        try:
+            await asyncio.wait_for(pooled.page.evaluate("1"), timeout=2.0)
+            return True
+        except Exception as e:
+            logger.debug(f"Pooled page failed health check: {e}")
+            return False
+
+    async def _dispose(self, pooled: PooledPage) -> None:
+        """Close a context and forget about it."""
+        if pooled in self._all:
+            self._all.remove(pooled)
+        try:
+            await pooled.context.close()
+        except Exception as e:
+            logger.debug(f"Error closing browser context: {e}")
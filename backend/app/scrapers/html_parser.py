@@ -0,0 +1,300 @@
+"""Browser-free parser for Mercado Libre listing HTML."""
+from typing import Dict, FrozenSet, List, Optional, Tuple
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from app.models.responses import ProductResult
+from app.scrapers.listing import CARD_FIELDS, NO_RESULTS_SELECTOR, build_products
+
+# Selectors for the element that wraps one product card
+CARD_SELECTOR = 'li.ui-search-layout__item, .ui-search-layout__item, .ui-search-result__wrapper'
+
+# Markers of anti-bot interstitials that only a real browser can get past
+BOT_CHALLENGE_MARKERS = (
+    "captcha",
+    "account-verification",
+    "suspicious-traffic",
+    "validate.perfdrive"
+)
+
+VOID_ELEMENTS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr"
+})
+
+SimpleSelector = Tuple[Optional[str], FrozenSet[str]]
+
+
+def _compile(selector_list: str) -> List[SimpleSelector]:
+    """
+    Compile a comma-separated list of ``tag.class.class`` selectors.
+
+    Args:
+        selector_list: CSS selector list using only tag and class selectors
+
+    Returns:
+        List of (tag or None, required classes) pairs
+    """
+    compiled = []
+    for selector in selector_list.split(","):
+        tag, *classes = selector.strip().split(".")
+        compiled.append((tag or None, frozenset(classes)))
+    return compiled
+
+
+def _matches(selectors: List[SimpleSelector], tag: str, classes: set) -> bool:
+    """Check whether an element matches any compiled selector."""
+    return any(
+        (sel_tag is None or sel_tag == tag) and sel_classes <= classes
+        for sel_tag, sel_classes in selectors
+    )
+
+
+CARD_MATCHER = _compile(CARD_SELECTOR)
+NO_RESULTS_MATCHER = _compile(NO_RESULTS_SELECTOR)
+FIELD_MATCHERS = {
+    name: (_compile(selector), attribute)
+    for name, (selector, attribute) in CARD_FIELDS.items()
+}
+# Every class any field selector needs, for a cheap early reject
+FIELD_CLASSES = frozenset().union(
+    *(sel_classes for selectors, _ in FIELD_MATCHERS.values() for _, sel_classes in selectors)
+)
+
+
+@dataclass
+class ListingPage:
+    """Outcome of parsing one listing page."""
+
+    products: List[ProductResult]
+    no_results: bool = False
+    bot_challenge: bool = False
+    # Product cards found, including incomplete ones left out of products
+    cards: int = 0
+
+
+class _ListingParser(HTMLParser):
+    """
+    Streaming parser that collects raw card fields like the DOM path does.
+
+    Each field takes the first matching element inside its card, as
+    ``querySelector`` would, reading either an attribute or its text.
+    """
+
+    def __init__(self, limit: Optional[int] = None):
+        super().__init__(convert_charrefs=True)
+        self.limit = limit
+        self.cards: List[dict] = []
+        self.no_results = False
+        self.done = False
+
+        self._stack: List[str] = []
+        self._card: Optional[dict] = None
+        self._card_depth = 0
+        # field -> stack depth of the element whose text is being collected
+        self._capturing: Dict[str, int] = {}
+        self._text: Dict[str, List[str]] = {}
+        self._raw_depth: Optional[int] = None
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+
+        attributes = dict(attrs)
+        classes = set((attributes.get("class") or "").split())
+
+        if tag not in VOID_ELEMENTS:
+            self._stack.append(tag)
+            if tag in ("script", "style") and self._raw_depth is None:
+                self._raw_depth = len(self._stack)
+        depth = len(self._stack)
+
+        if not self.no_results and _matches(NO_RESULTS_MATCHER, tag, classes):
+            self.no_results = True
+
+        if self._card is None:
+            if tag not in VOID_ELEMENTS and _matches(CARD_MATCHER, tag, classes):
+                self._card = {}
+                self._card_depth = depth
+            return
+
+        if classes.isdisjoint(FIELD_CLASSES):
+            return
+
+        for name, (selectors, attribute) in FIELD_MATCHERS.items():
+            if name in self._card or name in self._capturing:
+                continue
+            if not _matches(selectors, tag, classes):
+                continue
+            if attribute:
+                self._card[name] = attributes.get(attribute)
+            elif tag in VOID_ELEMENTS:
+                self._card[name] = ""
+            else:
+                self._capturing[name] = depth
+                self._text[name] = []
+
+    def handle_endtag(self, tag):
+        if self.done or tag in VOID_ELEMENTS or tag not in self._stack:
+            return
+
+        # Pop up to the matching open tag, closing anything left unclosed
+        while self._stack:
+            depth = len(self._stack)
+            open_tag = self._stack.pop()
+            self._close_element(depth)
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self._capturing and self._raw_depth is None:
+            for name in self._capturing:
+                self._text[name].append(data)
+
+    def _close_element(self, depth: int) -> None:
+        """Finish captures and cards whose element ends at this depth."""
+        if self._raw_depth == depth:
+            self._raw_depth = None
+
+        if self._card is None:
+            return
+
+        for name, start in list(self._capturing.items()):
+            if start == depth:
+                self._card[name] = " ".join("".join(self._text.pop(name)).split())
+                del self._capturing[name]
+
+        if depth == self._card_depth:
+            self.cards.append(self._card)
+            self._card = None
+            if self.limit is not None and len(self.cards) >= self.limit:
+                self.done = True
+
+
+class ListingStreamParser:
+    """
+    Incremental listing parser fed with response body chunks.
+
+    Every ``feed`` returns the products whose cards were completed by that
+    chunk, so callers can emit results before the whole page has arrived.
+    """
+
+    # Only the start of a page is kept for challenge detection
+    MAX_HEAD_CHARS = 200_000
+
+    def __init__(self, limit: Optional[int] = None):
+        """
+        Initialize stream parser.
+
+        Args:
+            limit: Maximum number of product cards to read
+        """
+        self._parser = _ListingParser(limit)
+        self._emitted = 0
+        self._head: List[str] = []
+        self._head_chars = 0
+
+    @property
+    def done(self) -> bool:
+        """True once ``limit`` cards have been read."""
+        return self._parser.done
+
+    @property
+    def cards(self) -> int:
+        """Product cards read so far, including incomplete ones."""
+        return len(self._parser.cards)
+
+    @property
+    def no_results(self) -> bool:
+        """True if the page carried the no-results marker."""
+        return self._parser.no_results
+
+    @property
+    def bot_challenge(self) -> bool:
+        """True if no card was found and the page looks like a challenge."""
+        return not self._parser.cards and is_bot_challenge("".join(self._head))
+
+    def feed(self, chunk: str) -> List[ProductResult]:
+        """
+        Parse the next chunk of the page.
+
+        Args:
+            chunk: Decoded HTML text following the previous chunk
+
+        Returns:
+            Products completed by this chunk
+        """
+        if not self._parser.cards and self._head_chars < self.MAX_HEAD_CHARS:
+            self._head.append(chunk)
+            self._head_chars += len(chunk)
+        self._parser.feed(chunk)
+        return self._take()
+
+    def close(self) -> List[ProductResult]:
+        """
+        Flush the parser at the end of the body.
+
+        Returns:
+            Products completed by the end of the page
+        """
+        self._parser.close()
+        return self._take()
+
+    def _take(self) -> List[ProductResult]:
+        """Build products from cards not returned yet."""
+        cards = self._parser.cards[self._emitted:]
+        self._emitted = len(self._parser.cards)
+        if self._parser.cards:
+            self._head = []
+        return build_products(cards) if cards else []
+
+
+def is_bot_challenge(html: str) -> bool:
+    """
+    Check whether a page is an anti-bot interstitial rather than a listing.
+
+    Args:
+        html: Raw page HTML
+
+    Returns:
+        True if the page carries a known challenge marker
+    """
+    lowered = html.lower()
+    return any(marker in lowered for marker in BOT_CHALLENGE_MARKERS)
+
+
+def parse_listing_page(html: str, limit: Optional[int] = None) -> ListingPage:
+    """
+    Parse a listing page into products, without a browser.
+
+    Args:
+        html: Raw listing HTML (saved page or HTTP response body)
+        limit: Maximum number of product cards to read
+
+    Returns:
+        ListingPage with products and page classification flags
+    """
+    parser = _ListingParser(limit)
+    parser.feed(html)
+    parser.close()
+
+    products = build_products(parser.cards)
+    return ListingPage(
+        products=products,
+        no_results=parser.no_results,
+        bot_challenge=not parser.cards and is_bot_challenge(html),
+        cards=len(parser.cards)
+    )
+
+
+def parse_listing_html(html: str, limit: Optional[int] = None) -> List[ProductResult]:
+    """
+    Parse listing HTML into ProductResult objects.
+
+    Args:
+        html: Raw listing HTML
+        limit: Maximum number of product cards to read
+
+    Returns:
+        List of ProductResult objects
+    """
+    return parse_listing_page(html, limit).products
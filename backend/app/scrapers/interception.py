@@ -0,0 +1,106 @@
+"""Request interception that keeps the scraper from loading what it never reads."""
+from typing import Dict, Iterable, Optional
+from playwright.async_api import BrowserContext, Route, Request
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Typical transfer size per resource type on a listing page, in bytes. Blocked
+# requests never reach the network, so savings can only be estimated.
+DEFAULT_SIZE_ESTIMATES: Dict[str, int] = {
+    "image": 25_000,
+    "media": 500_000,
+    "font": 40_000,
+    "stylesheet": 60_000,
+    "script": 80_000,
+    "xhr": 5_000,
+    "fetch": 5_000,
+    "ping": 500,
+    "other": 2_000
+}
+
+
+class ResourceBlocker:
+    """
+    Aborts browser requests by resource type or URL pattern.
+
+    Installed once per browser context with ``context.route``, so every page of
+    the context is covered. Keeps counters of blocked and allowed requests and
+    an estimate of the bytes that were not downloaded.
+    """
+
+    def __init__(
+        self,
+        resource_types: Iterable[str],
+        url_patterns: Iterable[str],
+        size_estimates: Optional[Dict[str, int]] = None
+    ):
+        """
+        Initialize blocker.
+
+        Args:
+            resource_types: Playwright resource types to block (image, font, ...)
+            url_patterns: Substrings; any request URL containing one is blocked
+            size_estimates: Bytes saved per blocked request, by resource type
+        """
+        self.resource_types = {t.strip().lower() for t in resource_types if t.strip()}
+        self.url_patterns = [p.strip().lower() for p in url_patterns if p.strip()]
+        self.size_estimates = size_estimates or DEFAULT_SIZE_ESTIMATES
+
+        # Counters
+        self.allowed = 0
+        self.blocked = 0
+        self.blocked_by_type: Dict[str, int] = {}
+        self.estimated_bytes_saved = 0
+
+    async def install(self, context: BrowserContext) -> None:
+        """
+        Route every request of a browser context through the blocker.
+
+        Args:
+            context: Playwright browser context
+        """
+        await context.route("**/*", self._handle)
+
+    def should_block(self, request: Request) -> bool:
+        """
+        Decide whether a request is blocked.
+
+        Args:
+            request: Intercepted Playwright request
+
+        Returns:
+            True if the request matches a blocked type or URL pattern
+        """
+        if request.resource_type in self.resource_types:
+            return True
+        url = request.url.lower()
+        return any(pattern in url for pattern in self.url_patterns)
+
+    def stats(self) -> dict:
+        """Return interception counters."""
+        return {
+            "allowed": self.allowed,
+            "blocked": self.blocked,
+            "blocked_by_type": dict(self.blocked_by_type),
+            "estimated_bytes_saved": self.estimated_bytes_saved
+        }
+
+    async def _handle(self, route: Route) -> None:
+        """Abort or continue an intercepted request."""
+        request = route.request
+        try:
+            if self.should_block(request):
+                resource_type = request.resource_type
+                self.blocked += 1
+                self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+                self.estimated_bytes_saved += self.size_estimates.get(
+                    resource_type, self.size_estimates.get("other", 0)
+                )
+                await route.abort("blockedbyclient")
+            else:
+                self.allowed += 1
+                await route.continue_()
+        except Exception as e:
+            # The page may have been closed while the request was in flight
+            logger.debug(f"Request interception error for {request.url}: {e}")
@@ -0,0 +1,235 @@
+"""Mercado Libre listing page knowledge shared by every scraping engine."""
+from typing import Callable, List, Optional
+from app.models.responses import ProductResult
+from app.models.requests import ExtractedProductRequest, ProductCondition
+from app.core.logger import get_logger
+from app.services.result_cache import canonical_request_key
+import urllib.parse
+import re
+
+logger = get_logger(__name__)
+
+LISTING_BASE_URL = "https://listado.mercadolibre.com.co"
+ARTICLE_BASE_URL = "https://articulo.mercadolibre.com.co"
+
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# Comprehensive headers to look more like a real browser
+BROWSER_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
+    'Accept-Language': 'es-CO,es;q=0.9,en;q=0.8',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Cache-Control': 'max-age=0'
+}
+
+# Product card fields: name -> (selector inside the card, attribute or None for text)
+CARD_FIELDS = {
+    "title": ('.ui-search-item__title, .ui-search-item__title-label', None),
+    "price": ('.andes-money-amount__fraction, .price-tag-fraction', None),
+    "url": ('a.ui-search-link, a.ui-search-result__content', 'href'),
+    "thumbnail": ('img.ui-search-result-image__element, img.ui-search-result__image', 'src'),
+    "condition": ('.ui-search-item__group__element--condition', None),
+    "shipping": ('.ui-search-item__shipping, .ui-pb-highlight', None),
+    "location": ('.ui-search-item__location-label', None)
+}
+
+NO_RESULTS_SELECTOR = '.ui-search-rescue__title'
+
+# Cards per listing page; further pages are addressed with a _Desde_ offset
+LISTING_PAGE_SIZE = 48
+
+# Item ID inside an article URL, e.g. MCO-1234567890 or MCO1234567890
+ITEM_ID_PATTERN = re.compile(r'MCO-?(\d+)', re.IGNORECASE)
+
+
+def build_search_url(
+    request: ExtractedProductRequest,
+    base_url: str = LISTING_BASE_URL,
+    offset: int = 0
+) -> str:
+    """
+    Build Mercado Libre search URL with filters.
+
+    Args:
+        request: Structured product request with filters
+        base_url: Listing site base URL
+        offset: Number of results to skip, for pages after the first
+
+    Returns:
+        Complete search URL with query parameters
+    """
+    query = urllib.parse.quote(request.product_name)
+    url = f"{base_url}/{query}"
+
+    # Listing pages are addressed by the 1-based position of their first result
+    if offset:
+        url += f"_Desde_{offset + 1}"
+
+    params = []
+
+    # Price filter
+    if request.max_price:
+        params.append(f"price=0-{int(request.max_price)}")
+
+    # Condition filter
+    if request.condition != ProductCondition.ANY:
+        condition_map = {
+            ProductCondition.NEW: "new",
+            ProductCondition.USED: "used"
+        }
+        params.append(f"condition={condition_map[request.condition]}")
+
+    if params:
+        url += "?" + "&".join(params)
+
+    logger.info(f"Built search URL: {url}")
+    return url
+
+
+def flight_key(request: ExtractedProductRequest) -> str:
+    """
+    Key identifying an upstream fetch for single-flight deduplication.
+
+    Unlike the result cache key this keeps the result count, since callers
+    sharing a fetch must get exactly what they asked for.
+
+    Args:
+        request: Structured product request
+
+    Returns:
+        Key string
+    """
+    return f"{canonical_request_key(request)}|{request.num_results}"
+
+
+def copy_products(products: List[ProductResult]) -> List[ProductResult]:
+    """Return independent copies of shared product results."""
+    return [product.model_copy() for product in products]
+
+
+def item_key(product: ProductResult) -> str:
+    """
+    Identity of a listed item, for deduplicating results across pages.
+
+    Args:
+        product: Product result
+
+    Returns:
+        Item ID from the URL, or the URL without tracking parameters
+    """
+    url = str(product.url)
+    match = ITEM_ID_PATTERN.search(url)
+    if match:
+        return match.group(1)
+    return url.split("?", 1)[0].split("#", 1)[0]
+
+
+def within_price(request: ExtractedProductRequest) -> Optional[Callable[[ProductResult], bool]]:
+    """
+    Filter for products that respect the requested maximum price.
+
+    Listing pages mix in promoted items that ignore the URL filters. Only the
+    price is checked, since cards without a condition label default to new.
+
+    Args:
+        request: Structured product request
+
+    Returns:
+        Predicate, or None if the request has no price limit
+    """
+    if not request.max_price:
+        return None
+    max_price = request.max_price
+    return lambda product: product.price <= max_price
+
+
+def build_product(raw: dict) -> Optional[ProductResult]:
+    """
+    Build a ProductResult from the raw field values of one card.
+
+    Args:
+        raw: Card values keyed like CARD_FIELDS (text or attribute, or None)
+
+    Returns:
+        ProductResult or None if required fields are missing
+    """
+    try:
+        title = raw.get("title")
+        if not title:
+            return None
+
+        price_text = raw.get("price")
+        price = parse_price(price_text) if price_text else None
+        if not price:
+            return None
+
+        url = raw.get("url")
+        if not url:
+            return None
+
+        # Ensure URL is absolute
+        if url.startswith('/'):
+            url = f"{ARTICLE_BASE_URL}{url}"
+
+        condition = raw.get("condition") or "Nuevo"  # Default to new
+        shipping_text = raw.get("shipping") or ""
+        location = raw.get("location")
+
+        return ProductResult(
+            title=title.strip(),
+            price=price,
+            currency="COP",
+            condition=condition.strip(),
+            thumbnail=raw.get("thumbnail"),
+            url=url,
+            free_shipping='gratis' in shipping_text.lower(),
+            location=location.strip() if location else None
+        )
+
+    except Exception as e:
+        logger.debug(f"Card build error: {e}")
+        return None
+
+
+def build_products(raw_cards: List[dict]) -> List[ProductResult]:
+    """
+    Build ProductResults from raw cards, skipping incomplete ones.
+
+    Args:
+        raw_cards: Card values as produced by any extraction engine
+
+    Returns:
+        List of ProductResult objects
+    """
+    results = []
+    for raw in raw_cards:
+        result = build_product(raw)
+        if result:
+            results.append(result)
+            logger.debug(f"Extracted: {result.title[:50]}... - ${result.price}")
+    return results
+
+
+def parse_price(price_text: str) -> float:
+    """
+    Parse price string to float.
+
+    Args:
+        price_text: Price text from page (e.g., "1.850.000")
+
+    Returns:
+        Price as float
+    """
+    # Remove currency symbols, dots, commas, and spaces
+    clean = re.sub(r'[^\d]', '', price_text)
+    try:
+        return float(clean)
+    except ValueError:
+        logger.warning(f"Failed to parse price: {price_text}")
+        return 0.0
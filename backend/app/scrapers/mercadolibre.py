@@ -1,36 +1,114 @@
-from typing import List, Optional
-from playwright.async_api import async_playwright, Page, Browser, Playwright
+from typing import Dict, List, Optional
+from playwright.async_api import async_playwright, Page, Browser, BrowserContext, Playwright
 from playwright_stealth import Stealth
 from app.models.responses import ProductResult
-from app.models.requests import ExtractedProductRequest, ProductCondition
+from app.models.requests import ExtractedProductRequest, MAX_NUM_RESULTS
+from app.scrapers.browser_pool import BrowserContextPool
+from app.scrapers.mercadolibre_html import get_html_client
+from app.scrapers.interception import ResourceBlocker
+from app.scrapers.listing import (
+    LISTING_BASE_URL,
+    USER_AGENT,
+    BROWSER_HEADERS,
+    CARD_FIELDS,
+    NO_RESULTS_SELECTOR,
+    LISTING_PAGE_SIZE,
+    build_search_url,
+    build_product,
+    build_products,
+    flight_key,
+    copy_products,
+    item_key,
+    within_price
+)
+from app.scrapers.pagination import ResultPage, collect_pages
+from app.config import get_settings
 from app.core.logger import get_logger
 from app.core.errors import ScraperException
+from app.core.singleflight import SingleFlight
+from app.core.metrics import stage_timer
+from app.core.tracing import get_tracer
+from app.services.governors import MERCADOLIBRE_WEB, get_governor
+from app.services.circuit_breakers import MERCADOLIBRE_BROWSER, get_breaker
 import urllib.parse
 import asyncio
-import re
+import math
 
 logger = get_logger(__name__)
+settings = get_settings()
+tracer = get_tracer()
 
 # Initialize stealth configuration
 stealth_config = Stealth(
     navigator_languages_override=('es-CO', 'es', 'en'),
-    navigator_user_agent_override='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+    navigator_user_agent_override=USER_AGENT
 )
 
+# Context options shared by every pooled browser context
+CONTEXT_OPTIONS = {
+    "viewport": {"width": 1920, "height": 1080},
+    "user_agent": USER_AGENT,
+    "locale": "es-CO",
+    "extra_http_headers": BROWSER_HEADERS
+}
+
+# Reads CARD_FIELDS from every card in one evaluate call
+EXTRACT_CARDS_JS = """
+(cards, { limit, fields }) => cards.slice(0, limit).map((card) => {
+    const raw = {};
+    for (const [name, [selector, attribute]] of Object.entries(fields)) {
+        const el = card.querySelector(selector);
+        raw[name] = !el ? null : attribute ? el.getAttribute(attribute) : el.innerText;
+    }
+    return raw;
+})
+"""
+
 
 class MercadoLibreScraper:
     """Scraper for Mercado Libre Colombia using Playwright."""
 
-    BASE_URL = "https://listado.mercadolibre.com.co"
+    BASE_URL = LISTING_BASE_URL
+
+    # Product card selectors, in default probing order
+    RESULT_SELECTORS = [
+        'li.ui-search-layout__item',
+        '.ui-search-result__wrapper',
+        '.ui-search-layout__item',
+        'li[class*="ui-search"]',
+        'div[class*="ui-search-result"]'
+    ]
+    # Also match non-card items, so they are never remembered as the hint
+    GENERIC_SELECTORS = frozenset({'li[class*="ui-search"]', 'div[class*="ui-search-result"]'})
+    NO_RESULTS_SELECTOR = NO_RESULTS_SELECTOR
 
     def __init__(self):
         """Initialize scraper."""
         self.playwright: Optional[Playwright] = None
         self.browser: Optional[Browser] = None
+        self.pool: Optional[BrowserContextPool] = None
+        self.blocker: Optional[ResourceBlocker] = None
+        if settings.SCRAPER_BLOCK_RESOURCES:
+            self.blocker = ResourceBlocker(
+                settings.blocked_resource_types_list,
+                settings.blocked_url_patterns_list
+            )
+        self._init_lock = asyncio.Lock()
+        # Card selector that last matched, per listing host
+        self._selector_hints: Dict[str, str] = {}
+        # Identical concurrent searches share one browser scrape
+        self.flight = SingleFlight("playwright")
+        # Same listing host as the HTML client, so both share one governor
+        self.governor = get_governor(MERCADOLIBRE_WEB)
+        self.breaker = get_breaker(MERCADOLIBRE_BROWSER)
 
     async def initialize(self):
-        """Initialize Playwright browser instance."""
-        if not self.browser:
+        """Initialize Playwright browser instance and pre-warm the context pool."""
+        if self.browser:
+            return
+        async with self._init_lock:
+            if self.browser:
+                return
             try:
                 logger.info("Initializing Playwright browser")
                 self.playwright = await async_playwright().start()
@@ -43,13 +121,28 @@ class MercadoLibreScraper:
                         '--disable-blink-features=AutomationControlled'
                     ]
                 )
+                self.pool = BrowserContextPool(
+                    self.browser,
+                    size=settings.BROWSER_POOL_SIZE,
+                    max_uses=settings.BROWSER_POOL_MAX_USES,
+                    acquire_timeout=settings.BROWSER_POOL_ACQUIRE_TIMEOUT,
+                    context_options=CONTEXT_OPTIONS,
+                    setup=self._setup_context
+                )
+                await self.pool.start()
                 logger.info("Browser initialized successfully")
             except Exception as e:
                 logger.error(f"Failed to initialize browser: {e}")
                 raise ScraperException(f"Browser initialization failed: {e}")
 
     async def close(self):
-        """Close browser and Playwright instance."""
+        """Close context pool, browser and Playwright instance."""
+        if self.blocker:
+            logger.info(f"Request interception stats: {self.blocker.stats()}")
+        logger.info(f"Browser single-flight stats: {self.flight.stats()}")
+        if self.pool:
+            await self.pool.close()
+            self.pool = None
         if self.browser:
             await self.browser.close()
             self.browser = None
@@ -58,45 +151,72 @@ class MercadoLibreScraper:
             self.playwright = None
         logger.info("Browser closed")
 
-    def build_search_url(self, request: ExtractedProductRequest) -> str:
+    async def _setup_context(self, context: BrowserContext) -> None:
+        """
+        Prepare a freshly created browser context before it joins the pool.
+
+        Args:
+            context: New Playwright browser context
+        """
+        # Apply stealth mode to avoid detection
+        await stealth_config.apply_stealth_async(context)
+
+        # Skip images, fonts, media and trackers; only the DOM is read
+        if self.blocker:
+            await self.blocker.install(context)
+
+    def build_search_url(self, request: ExtractedProductRequest, offset: int = 0) -> str:
         """
         Build Mercado Libre search URL with filters.
 
         Args:
             request: Structured product request with filters
+            offset: Number of results to skip, for pages after the first
 
         Returns:
             Complete search URL with query parameters
         """
-        query = urllib.parse.quote(request.product_name)
-        url = f"{self.BASE_URL}/{query}"
+        return build_search_url(request, self.BASE_URL, offset)
 
-        params = []
+    async def scrape_products(
+        self,
+        request: ExtractedProductRequest
+    ) -> List[ProductResult]:
+        """
+        Scrape products from Mercado Libre based on structured request.
 
-        # Price filter
-        if request.max_price:
-            params.append(f"price=0-{int(request.max_price)}")
+        With the "html" engine the listing is first fetched and parsed without
+        a browser; Playwright is only used when that fails, e.g. because
+        Mercado Libre served a challenge that needs JavaScript.
 
-        # Condition filter
-        if request.condition != ProductCondition.ANY:
-            condition_map = {
-                ProductCondition.NEW: "new",
-                ProductCondition.USED: "used"
-            }
-            params.append(f"condition={condition_map[request.condition]}")
+        Args:
+            request: Structured product request with search parameters
 
-        if params:
-            url += "?" + "&".join(params)
+        Returns:
+            List of ProductResult objects
 
-        logger.info(f"Built search URL: {url}")
-        return url
+        Raises:
+            ScraperException: If scraping fails
+        """
+        if settings.SCRAPER_ENGINE == "html":
+            try:
+                html_client = await get_html_client()
+                return await html_client.search_products(request)
+            except ScraperException as e:
+                logger.info(f"HTML engine could not serve the listing, using browser: {e}")
 
-    async def scrape_products(
+        return await self.scrape_with_browser(request)
+
+    async def scrape_with_browser(
         self,
         request: ExtractedProductRequest
     ) -> List[ProductResult]:
         """
-        Scrape products from Mercado Libre based on structured request.
+        Scrape products with Playwright only, regardless of the configured engine.
+
+        Requests for more results than one listing page holds load further
+        pages in parallel on separate pooled pages. Concurrent calls for the
+        same request share a single scrape.
 
         Args:
             request: Structured product request with search parameters
@@ -107,194 +227,277 @@ class MercadoLibreScraper:
         Raises:
             ScraperException: If scraping fails
         """
+        return await self.flight.do(
+            flight_key(request),
+            lambda: self._scrape_with_browser(request),
+            copy=copy_products
+        )
+
+    async def _scrape_with_browser(
+        self,
+        request: ExtractedProductRequest
+    ) -> List[ProductResult]:
+        """Run one browser scrape; see ``scrape_with_browser``."""
         await self.initialize()
 
-        search_url = self.build_search_url(request)
-        page = await self.browser.new_page()
+        async def scrape_offset(offset: int) -> ResultPage:
+            search_url = self.build_search_url(request, offset)
+            try:
+                async with self.pool.page() as page:
+                    return await self._scrape_page(page, search_url, LISTING_PAGE_SIZE)
 
-        try:
-            # Apply stealth mode to avoid detection
-            await stealth_config.apply_stealth_async(page)
-
-            # Set realistic viewport
-            await page.set_viewport_size({"width": 1920, "height": 1080})
-
-            # Set comprehensive headers to look more like a real browser
-            await page.set_extra_http_headers({
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-                'Accept-Language': 'es-CO,es;q=0.9,en;q=0.8',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'DNT': '1',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-                'Sec-Fetch-Dest': 'document',
-                'Sec-Fetch-Mode': 'navigate',
-                'Sec-Fetch-Site': 'none',
-                'Cache-Control': 'max-age=0'
-            })
+            except ScraperException:
+                raise
+
+            except Exception as e:
+                logger.error(f"Scraping failed: {e}")
+                raise ScraperException(f"Failed to scrape Mercado Libre: {e}")
+
+        # Listing pages always hold LISTING_PAGE_SIZE cards whatever is
+        # wanted, so page by that and truncate only at the end
+        results = await collect_pages(
+            scrape_offset,
+            wanted=request.num_results,
+            page_size=LISTING_PAGE_SIZE,
+            max_pages=math.ceil(MAX_NUM_RESULTS / LISTING_PAGE_SIZE),
+            fanout=settings.SEARCH_PAGE_FANOUT,
+            item_key=item_key,
+            accept=within_price(request)
+        )
+        logger.info(f"Successfully scraped {len(results)} products")
+        return results
+
+    async def _scrape_page(
+        self,
+        page: Page,
+        search_url: str,
+        limit: int
+    ) -> ResultPage:
+        """
+        Load a search URL on a pooled page and extract its product cards.
 
+        Args:
+            page: Page checked out from the context pool
+            search_url: Listing URL to navigate to
+            limit: Maximum number of product cards to extract
+
+        Returns:
+            ResultPage with the extracted products and the cards found
+        """
+        with stage_timer("upstream"), tracer.span("mercadolibre.browser", url=search_url):
             # Navigate to search results
             logger.info(f"Navigating to: {search_url}")
-            await page.goto(search_url, wait_until="domcontentloaded", timeout=30000)
-
-            # Wait for content to load
-            await page.wait_for_timeout(3000)
-
-            # Try multiple selector strategies
-            products = []
-            selectors_to_try = [
-                'li.ui-search-layout__item',
-                '.ui-search-result__wrapper',
-                '.ui-search-layout__item',
-                'li[class*="ui-search"]',
-                'div[class*="ui-search-result"]'
-            ]
-
-            for selector in selectors_to_try:
+            async with self.breaker.guard() as call:
+                async with self.governor.request() as permit:
+                    # Time spent waiting for the governor is not the upstream's latency
+                    call.begin()
+                    response = await page.goto(search_url, wait_until="domcontentloaded", timeout=30000)
+                    if response is not None:
+                        permit.record(response.status, response.headers)
+
+                # Wait until product cards or the no-results marker show up
+                host = urllib.parse.urlsplit(search_url).netloc
+                selector = await self._wait_for_results(page, host)
+
+        if selector is None:
+            logger.info("No products found for this search")
+            return ResultPage([], 0)
+
+        with stage_timer("parse"):
+            results = None
+            if settings.SCRAPER_BULK_EXTRACTION:
                 try:
-                    await page.wait_for_selector(selector, timeout=5000)
-                    products = await page.query_selector_all(selector)
-                    if len(products) > 0:
-                        logger.info(f"Found {len(products)} products with selector: {selector}")
-                        break
+                    results = await self._extract_products_bulk(page, selector, limit)
                 except Exception as e:
-                    logger.debug(f"Selector {selector} failed: {e}")
-                    continue
-
-            if len(products) == 0:
-                # Try to see if there are no results
-                no_results = await page.query_selector('.ui-search-rescue__title')
-                if no_results:
-                    logger.info("No products found for this search")
-                    return []
+                    logger.warning(f"Bulk extraction failed, falling back to per-card extraction: {e}")
 
-                # Take screenshot for debugging
-                logger.warning("No products found with any selector")
-                return []
+            if results is None:
+                results = await self._extract_products_per_card(page, selector, limit)
 
-            logger.info(f"Found {len(products)} product cards on page")
+        if len(results.products) < results.raw_count and self._selector_hints.get(host) == selector:
+            # Matched something other than product cards; race every selector next time
+            del self._selector_hints[host]
 
-            results = []
-            for product in products[:request.num_results]:
-                try:
-                    result = await self._extract_product_data(product)
-                    if result:
-                        results.append(result)
-                        logger.debug(f"Extracted: {result.title[:50]}... - ${result.price}")
-                except Exception as e:
-                    logger.warning(f"Failed to extract product: {e}")
-                    continue
-
-            logger.info(f"Successfully scraped {len(results)} products")
-            return results
+        logger.info(f"Scraped {len(results.products)} products from {search_url}")
+        return results
 
-        except Exception as e:
-            logger.error(f"Scraping failed: {e}")
-            raise ScraperException(f"Failed to scrape Mercado Libre: {e}")
-
-        finally:
-            await page.close()
+    def stats(self) -> dict:
+        """Return browser pool, request interception and single-flight counters."""
+        return {
+            "pool": self.pool.stats() if self.pool else None,
+            "interception": self.blocker.stats() if self.blocker else None,
+            "single_flight": self.flight.stats()
+        }
 
-    async def _extract_product_data(self, element) -> Optional[ProductResult]:
+    async def _wait_for_results(self, page: Page, host: str) -> Optional[str]:
         """
-        Extract data from a single product card.
+        Wait until the listing is ready, racing every candidate selector.
+
+        All card selectors and the no-results marker are awaited at the same
+        time and the first one to match wins; when several match in the same
+        round, the no-results marker wins, then the earliest card selector in
+        RESULT_SELECTORS. A generic selector that wins alone only returns after
+        SCRAPER_GENERIC_GRACE_MS without a specific one matching. A winning
+        specific selector is remembered per host and checked first on later
+        calls; generic ones never are.
 
         Args:
-            element: Playwright element locator for product card
+            page: Page that is navigating to a listing
+            host: Listing host used to key the selector hint
 
         Returns:
-            ProductResult or None if extraction fails
+            Matching card selector, or None if the page has no results
         """
+        hint = self._selector_hints.get(host)
+        if hint and await page.query_selector(hint):
+            return hint
+
+        candidates = [hint] if hint else []
+        candidates += [sel for sel in self.RESULT_SELECTORS if sel != hint]
+        candidates.append(self.NO_RESULTS_SELECTOR)
+
+        timeout = settings.SCRAPER_READY_TIMEOUT_MS
+        grace = settings.SCRAPER_GENERIC_GRACE_MS / 1000
+        tasks = {
+            asyncio.create_task(page.wait_for_selector(sel, state="attached", timeout=timeout)): sel
+            for sel in candidates
+        }
+
         try:
-            # Title
-            title_elem = await element.query_selector(
-                '.ui-search-item__title, .ui-search-item__title-label'
-            )
-            title = await title_elem.inner_text() if title_elem else None
+            pending = set(tasks)
+            generic = None
+            while pending:
+                wait = None
+                if generic is not None:
+                    wait = max(0.0, grace_deadline - asyncio.get_running_loop().time())
+                done, pending = await asyncio.wait(
+                    pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    break
+
+                matched = set()
+                for task in done:
+                    if task.exception() is not None:
+                        logger.debug(f"Selector {tasks[task]} failed: {task.exception()}")
+                        continue
+                    matched.add(tasks[task])
+
+                if self.NO_RESULTS_SELECTOR in matched:
+                    return None
+
+                for selector in self.RESULT_SELECTORS:
+                    if selector not in matched:
+                        continue
+                    if selector not in self.GENERIC_SELECTORS:
+                        logger.info(f"Listing ready with selector: {selector}")
+                        self._selector_hints[host] = selector
+                        return selector
+                    if generic is None:
+                        # Give the specific selectors a moment to catch up
+                        generic = selector
+                        grace_deadline = asyncio.get_running_loop().time() + grace
+                    break
+
+            if generic is not None:
+                logger.info(f"Listing ready with generic selector: {generic}")
+                return generic
+
+            logger.warning(f"No listing selector matched within {timeout}ms")
+            return None
 
-            if not title:
-                return None
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
-            # Price
-            price_elem = await element.query_selector(
-                '.andes-money-amount__fraction, .price-tag-fraction'
-            )
-            price_text = await price_elem.inner_text() if price_elem else None
-            price = self._parse_price(price_text) if price_text else None
+    async def _extract_products_bulk(
+        self,
+        page: Page,
+        selector: str,
+        limit: int
+    ) -> ResultPage:
+        """
+        Extract every product card in a single browser round trip.
 
-            if not price:
-                return None
+        Args:
+            page: Page with a loaded listing
+            selector: Card selector that matched the listing
+            limit: Maximum number of cards to extract
 
-            # URL
-            link_elem = await element.query_selector('a.ui-search-link, a.ui-search-result__content')
-            url = await link_elem.get_attribute('href') if link_elem else None
+        Returns:
+            ResultPage with the extracted products and the cards read
+        """
+        raw_cards = await page.eval_on_selector_all(
+            selector,
+            EXTRACT_CARDS_JS,
+            {"limit": limit, "fields": CARD_FIELDS}
+        )
+        logger.info(f"Found {len(raw_cards)} product cards on page")
+        return ResultPage(build_products(raw_cards), len(raw_cards))
+
+    async def _extract_products_per_card(
+        self,
+        page: Page,
+        selector: str,
+        limit: int
+    ) -> ResultPage:
+        """
+        Extract product cards one element query at a time.
 
-            if not url:
-                return None
+        Slower than ``_extract_products_bulk`` but kept as a fallback for pages
+        where evaluating the bulk script fails.
 
-            # Ensure URL is absolute
-            if url.startswith('/'):
-                url = f"https://articulo.mercadolibre.com.co{url}"
+        Args:
+            page: Page with a loaded listing
+            selector: Card selector that matched the listing
+            limit: Maximum number of cards to extract
 
-            # Thumbnail
-            img_elem = await element.query_selector(
-                'img.ui-search-result-image__element, img.ui-search-result__image'
-            )
-            thumbnail = await img_elem.get_attribute('src') if img_elem else None
-
-            # Condition
-            condition_elem = await element.query_selector('.ui-search-item__group__element--condition')
-            if condition_elem:
-                condition = await condition_elem.inner_text()
-            else:
-                condition = "Nuevo"  # Default to new
-
-            # Free shipping
-            shipping_elem = await element.query_selector(
-                '.ui-search-item__shipping, .ui-pb-highlight'
-            )
-            free_shipping = False
-            if shipping_elem:
-                shipping_text = await shipping_elem.inner_text()
-                free_shipping = 'gratis' in shipping_text.lower()
-
-            # Location
-            location_elem = await element.query_selector('.ui-search-item__location-label')
-            location = await location_elem.inner_text() if location_elem else None
-
-            return ProductResult(
-                title=title.strip(),
-                price=price,
-                currency="COP",
-                condition=condition.strip(),
-                thumbnail=thumbnail,
-                url=url,
-                free_shipping=free_shipping,
-                location=location.strip() if location else None
-            )
+        Returns:
+            ResultPage with the extracted products and the cards read
+        """
+        products = await page.query_selector_all(selector)
+        logger.info(f"Found {len(products)} product cards on page")
 
-        except Exception as e:
-            logger.debug(f"Element extraction error: {e}")
-            return None
+        cards = products[:limit]
+        results = []
+        for product in cards:
+            try:
+                result = await self._extract_product_data(product)
+                if result:
+                    results.append(result)
+                    logger.debug(f"Extracted: {result.title[:50]}... - ${result.price}")
+            except Exception as e:
+                logger.warning(f"Failed to extract product: {e}")
+                continue
+        return ResultPage(results, len(cards))
 
-    def _parse_price(self, price_text: str) -> float:
+    async def _extract_product_data(self, element) -> Optional[ProductResult]:
         """
-        Parse price string to float.
+        Extract data from a single product card.
 
         Args:
-            price_text: Price text from page (e.g., "1.850.000")
+            element: Playwright element locator for product card
 
         Returns:
-            Price as float
+            ProductResult or None if extraction fails
         """
-        # Remove currency symbols, dots, commas, and spaces
-        clean = re.sub(r'[^\d]', '', price_text)
         try:
-            return float(clean)
-        except ValueError:
-            logger.warning(f"Failed to parse price: {price_text}")
-            return 0.0
+            raw = {}
+            for field, (field_selector, attribute) in CARD_FIELDS.items():
+                field_elem = await element.query_selector(field_selector)
+                if not field_elem:
+                    raw[field] = None
+                elif attribute:
+                    raw[field] = await field_elem.get_attribute(attribute)
+                else:
+                    raw[field] = await field_elem.inner_text()
+
+            return build_product(raw)
+
+        except Exception as e:
+            logger.debug(f"Element extraction error: {e}")
+            return None
 
 
 # Singleton instance for reuse across requests
@@ -2,12 +2,23 @@
 from typing import List, Optional
 import httpx
 from app.models.responses import ProductResult
-from app.models.requests import ExtractedProductRequest, ProductCondition
+from app.models.requests import ExtractedProductRequest, ProductCondition, MAX_NUM_RESULTS
+from app.config import get_settings
 from app.core.logger import get_logger
 from app.core.errors import ScraperException
+from app.core.singleflight import SingleFlight
+from app.core.metrics import stage_timer
+from app.core.tracing import get_tracer
+from app.scrapers.listing import flight_key, copy_products, item_key
+from app.scrapers.pagination import ResultPage, collect_pages
+from app.services.governors import MERCADOLIBRE_API, get_governor
+from app.services.circuit_breakers import MERCADOLIBRE_API as API_BREAKER, get_breaker
 import asyncio
+import math
 
 logger = get_logger(__name__)
+settings = get_settings()
+tracer = get_tracer()
 
 
 class MercadoLibreAPI:
@@ -15,6 +26,7 @@ class MercadoLibreAPI:
 
     BASE_URL = "https://api.mercadolibre.com"
     SITE_ID = "MCO"  # Colombia
+    PAGE_LIMIT = 50  # API max results per call
 
     def __init__(self):
         """Initialize API client."""
@@ -24,11 +36,15 @@ class MercadoLibreAPI:
             "Accept-Language": "es-CO,es;q=0.9,en;q=0.8"
         }
         self.client = httpx.AsyncClient(timeout=30.0, headers=headers, follow_redirects=True)
+        # Identical concurrent searches share one API call
+        self.flight = SingleFlight("api")
+        self.governor = get_governor(MERCADOLIBRE_API)
+        self.breaker = get_breaker(API_BREAKER)
 
     async def close(self):
         """Close HTTP client."""
         await self.client.aclose()
-        logger.info("HTTP client closed")
+        logger.info(f"HTTP client closed, single-flight stats: {self.flight.stats()}")
 
     async def search_products(
         self,
@@ -37,12 +53,71 @@ class MercadoLibreAPI:
         """
         Search products using Mercado Libre API.
 
+        Concurrent calls for the same request share a single API call.
+
         Args:
             request: Structured product request with search parameters
 
         Returns:
             List of ProductResult objects
 
+        Raises:
+            ScraperException: If API request fails
+        """
+        return await self.flight.do(
+            flight_key(request),
+            lambda: self._fetch_products(request),
+            copy=copy_products
+        )
+
+    async def _fetch_products(
+        self,
+        request: ExtractedProductRequest
+    ) -> List[ProductResult]:
+        """
+        Call the search API and parse its results.
+
+        Requests above the API page limit are fetched as several offset
+        pages in parallel and merged without duplicates.
+
+        Args:
+            request: Structured product request with search parameters
+
+        Returns:
+            List of ProductResult objects
+
+        Raises:
+            ScraperException: If API request fails
+        """
+        page_size = min(request.num_results, self.PAGE_LIMIT)
+        results = await collect_pages(
+            lambda offset: self._fetch_page(request, offset, page_size),
+            wanted=request.num_results,
+            page_size=page_size,
+            max_pages=math.ceil(MAX_NUM_RESULTS / page_size),
+            fanout=settings.SEARCH_PAGE_FANOUT,
+            item_key=item_key
+        )
+        logger.info(f"Successfully fetched {len(results)} products from API")
+        return results
+
+    async def _fetch_page(
+        self,
+        request: ExtractedProductRequest,
+        offset: int,
+        limit: int
+    ) -> ResultPage:
+        """
+        Call the search API for one page of results.
+
+        Args:
+            request: Structured product request with search parameters
+            offset: Number of results to skip
+            limit: Page size, at most PAGE_LIMIT
+
+        Returns:
+            ResultPage with the parsed products
+
         Raises:
             ScraperException: If API request fails
         """
@@ -53,8 +128,10 @@ class MercadoLibreAPI:
             # Build parameters
             params = {
                 "q": query,
-                "limit": min(request.num_results, 50),  # API max is 50
+                "limit": limit,
             }
+            if offset:
+                params["offset"] = offset
 
             # Add price filter
             if request.max_price:
@@ -72,24 +149,30 @@ class MercadoLibreAPI:
             url = f"{self.BASE_URL}/sites/{self.SITE_ID}/search"
             logger.info(f"Searching Mercado Libre API: {url} with params: {params}")
 
-            response = await self.client.get(url, params=params)
-            response.raise_for_status()
-
-            data = response.json()
-
-            # Parse results
-            results = []
-            for item in data.get("results", []):
-                try:
-                    result = self._parse_product(item)
-                    if result:
-                        results.append(result)
-                except Exception as e:
-                    logger.warning(f"Failed to parse product: {e}")
-                    continue
-
-            logger.info(f"Successfully fetched {len(results)} products from API")
-            return results
+            with stage_timer("upstream"), tracer.span("mercadolibre.api", offset=offset, limit=limit):
+                async with self.breaker.guard() as call, self.governor.request() as permit:
+                    # Time spent waiting for the governor is not the upstream's latency
+                    call.begin()
+                    response = await self.client.get(url, params=params)
+                    permit.record(response.status_code, response.headers)
+                    response.raise_for_status()
+
+            with stage_timer("parse"):
+                data = response.json()
+                items = data.get("results", [])
+
+                # Parse results
+                results = []
+                for item in items:
+                    try:
+                        result = self._parse_product(item)
+                        if result:
+                            results.append(result)
+                    except Exception as e:
+                        logger.warning(f"Failed to parse product: {e}")
+                        continue
+
+            return ResultPage(results, len(items))
 
         except httpx.HTTPError as e:
             logger.error(f"API request failed: {e}")
@@ -0,0 +1,300 @@
+"""Mercado Libre listing client that fetches raw HTML and parses it without a browser."""
+from typing import AsyncIterator, List, Optional
+import httpx
+from app.models.responses import ProductResult
+from app.models.requests import ExtractedProductRequest, MAX_NUM_RESULTS
+from app.config import get_settings
+from app.scrapers.listing import (
+    USER_AGENT, BROWSER_HEADERS, LISTING_PAGE_SIZE,
+    build_search_url, flight_key, copy_products, item_key, within_price
+)
+from app.scrapers.html_parser import ListingStreamParser, parse_listing_page
+from app.scrapers.pagination import ResultPage, collect_pages
+from app.core.logger import get_logger
+from app.core.errors import (
+    ScraperException, BotChallengeException, UpstreamThrottledException, CircuitOpenException
+)
+from app.core.singleflight import SingleFlight
+from app.core.metrics import stage_timer
+from app.core.tracing import get_tracer
+from app.services.governors import MERCADOLIBRE_WEB, get_governor
+from app.services.circuit_breakers import MERCADOLIBRE_HTML, get_breaker
+from contextlib import aclosing
+import asyncio
+import math
+
+logger = get_logger(__name__)
+settings = get_settings()
+tracer = get_tracer()
+
+
+class MercadoLibreHTMLClient:
+    """Client for Mercado Libre listing pages over plain HTTP."""
+
+    def __init__(self):
+        """Initialize HTML client."""
+        headers = {
+            **BROWSER_HEADERS,
+            "User-Agent": USER_AGENT,
+            # httpx only decodes brotli when the optional brotli package is installed
+            "Accept-Encoding": "gzip, deflate"
+        }
+        self.client = httpx.AsyncClient(timeout=15.0, headers=headers, follow_redirects=True)
+        # Identical concurrent searches share one listing fetch
+        self.flight = SingleFlight("html")
+        self.governor = get_governor(MERCADOLIBRE_WEB)
+        self.breaker = get_breaker(MERCADOLIBRE_HTML)
+
+    async def close(self):
+        """Close HTTP client."""
+        await self.client.aclose()
+        logger.info(f"HTML client closed, single-flight stats: {self.flight.stats()}")
+
+    async def search_products(
+        self,
+        request: ExtractedProductRequest
+    ) -> List[ProductResult]:
+        """
+        Fetch listing pages and parse their products.
+
+        Pages beyond the first are fetched in parallel when the request asks
+        for more results than one page holds. Concurrent calls for the same
+        request share a single fetch.
+
+        Args:
+            request: Structured product request with search parameters
+
+        Returns:
+            List of ProductResult objects
+
+        Raises:
+            BotChallengeException: If Mercado Libre served an anti-bot page
+            ScraperException: If the page cannot be fetched or understood
+        """
+        return await self.flight.do(
+            flight_key(request),
+            lambda: self._fetch_products(request),
+            copy=copy_products
+        )
+
+    async def _fetch_products(
+        self,
+        request: ExtractedProductRequest
+    ) -> List[ProductResult]:
+        """Fetch and parse listing pages in parallel; see ``search_products``."""
+        # Listing pages always hold LISTING_PAGE_SIZE cards whatever is
+        # wanted, so page by that and truncate only at the end
+        products = await collect_pages(
+            lambda offset: self._fetch_page(request, offset),
+            wanted=request.num_results,
+            page_size=LISTING_PAGE_SIZE,
+            max_pages=math.ceil(MAX_NUM_RESULTS / LISTING_PAGE_SIZE),
+            fanout=settings.SEARCH_PAGE_FANOUT,
+            item_key=item_key,
+            accept=within_price(request)
+        )
+
+        if products:
+            logger.info(f"Successfully parsed {len(products)} products from HTML")
+        else:
+            logger.info("No products found for this search")
+        return products
+
+    async def _fetch_page(
+        self,
+        request: ExtractedProductRequest,
+        offset: int
+    ) -> ResultPage:
+        """
+        Fetch and parse one listing page.
+
+        Args:
+            request: Structured product request with search parameters
+            offset: Number of results to skip
+
+        Returns:
+            ResultPage with the page's products, empty past the last page
+
+        Raises:
+            BotChallengeException: If Mercado Libre served an anti-bot page
+            ScraperException: If the page cannot be fetched or understood
+        """
+        url = build_search_url(request, offset=offset)
+
+        try:
+            with stage_timer("upstream"), tracer.span("mercadolibre.html", offset=offset):
+                async with self.breaker.guard() as call, self.governor.request() as permit:
+                    # Time spent waiting for the governor is not the upstream's latency
+                    call.begin()
+                    response = await self.client.get(url)
+                    permit.record(response.status_code, response.headers)
+                    response.raise_for_status()
+        except (httpx.HTTPError, UpstreamThrottledException, CircuitOpenException) as e:
+            logger.error(f"Listing request failed: {e}")
+            raise ScraperException(f"Failed to fetch Mercado Libre listing: {e}")
+
+        with stage_timer("parse"):
+            page = parse_listing_page(response.text, LISTING_PAGE_SIZE)
+
+        if page.products or page.no_results:
+            return ResultPage(page.products, page.cards)
+
+        if page.bot_challenge:
+            self.governor.throttle()
+            raise BotChallengeException("Mercado Libre served a bot challenge page")
+
+        raise ScraperException("Listing page had no recognizable product cards")
+
+    async def stream_products(
+        self,
+        request: ExtractedProductRequest
+    ) -> AsyncIterator[ProductResult]:
+        """
+        Fetch listing pages and yield products while each body downloads.
+
+        Unlike ``search_products`` this does not share fetches between
+        concurrent callers, since each stream consumes its own response.
+        Pages are fetched one after another so results keep page order.
+
+        Args:
+            request: Structured product request with search parameters
+
+        Yields:
+            ProductResult objects in page order
+
+        Raises:
+            BotChallengeException: If Mercado Libre served an anti-bot page
+            ScraperException: If the first page cannot be fetched or understood
+        """
+        accept = within_price(request)
+        seen = set()
+        emitted = 0
+
+        for offset in range(0, MAX_NUM_RESULTS, LISTING_PAGE_SIZE):
+            parser = ListingStreamParser(LISTING_PAGE_SIZE)
+
+            page = self._stream_page(build_search_url(request, offset=offset), parser)
+            try:
+                async with aclosing(page):
+                    async for product in page:
+                        key = item_key(product)
+                        if key in seen or (accept and not accept(product)):
+                            continue
+                        seen.add(key)
+                        emitted += 1
+                        yield product
+                        if emitted >= request.num_results:
+                            break
+            except ScraperException as e:
+                if not offset:
+                    raise
+                # Keep what earlier pages returned and stop before this one
+                logger.warning(f"Listing page at offset {offset} failed, stopping pagination: {e}")
+                break
+
+            # A short page, counting cards that did not parse, is the last one
+            if emitted >= request.num_results or parser.cards < LISTING_PAGE_SIZE:
+                break
+
+        if emitted:
+            logger.info(f"Successfully streamed {emitted} products from HTML")
+            return
+
+        if parser.no_results or offset:
+            logger.info("No products found for this search")
+            return
+
+        if parser.bot_challenge:
+            self.governor.throttle()
+            raise BotChallengeException("Mercado Libre served a bot challenge page")
+
+        raise ScraperException("Listing page had no recognizable product cards")
+
+    async def _stream_page(
+        self,
+        url: str,
+        parser: ListingStreamParser
+    ) -> AsyncIterator[ProductResult]:
+        """
+        Stream one listing page through a parser, yielding its products.
+
+        The body is downloaded and parsed by a separate task that hands
+        products over through an unbounded queue, so a slow consumer never
+        holds the governor slot or the upstream connection, nor inflates
+        the latency the governor adapts to.
+
+        Args:
+            url: Listing page URL
+            parser: Fresh stream parser; inspect it afterwards to classify the page
+
+        Yields:
+            ProductResult objects in page order
+
+        Raises:
+            ScraperException: If the page cannot be fetched
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        download = asyncio.create_task(self._download_page(url, parser, queue))
+        try:
+            while True:
+                product = await queue.get()
+                if product is None:
+                    break
+                yield product
+            await download
+        finally:
+            if not download.done():
+                download.cancel()
+                await asyncio.gather(download, return_exceptions=True)
+
+        for product in parser.close():
+            yield product
+
+    async def _download_page(
+        self,
+        url: str,
+        parser: ListingStreamParser,
+        queue: asyncio.Queue
+    ) -> None:
+        """
+        Download a listing page into a stream parser; see ``_stream_page``.
+
+        Parsed products are put on ``queue``, followed by None once the
+        download ends for any reason.
+
+        Raises:
+            ScraperException: If the page cannot be fetched
+        """
+        try:
+            async with self.breaker.guard() as call, self.governor.request() as permit:
+                call.begin()
+                async with self.client.stream("GET", url) as response:
+                    permit.record(response.status_code, response.headers)
+                    response.raise_for_status()
+                    async for chunk in response.aiter_text():
+                        for product in parser.feed(chunk):
+                            queue.put_nowait(product)
+                        if parser.done:
+                            break
+        except (httpx.HTTPError, UpstreamThrottledException, CircuitOpenException) as e:
+            logger.error(f"Listing request failed: {e}")
+            raise ScraperException(f"Failed to fetch Mercado Libre listing: {e}")
+        finally:
+            queue.put_nowait(None)
+
+
+# Singleton instance for reuse across requests
+_html_instance: Optional[MercadoLibreHTMLClient] = None
+
+
+async def get_html_client() -> MercadoLibreHTMLClient:
+    """
+    Get singleton HTML client instance.
+
+    Returns:
+        MercadoLibreHTMLClient instance
+    """
+    global _html_instance
+    if _html_instance is None:
+        _html_instance = MercadoLibreHTMLClient()
+    return _html_instance
@@ -0,0 +1,141 @@
+"""Concurrent, deduplicating collection of paginated search results."""
+from typing import Awaitable, Callable, Dict, List, Optional
+from dataclasses import dataclass
+from app.models.responses import ProductResult
+from app.core.logger import get_logger
+import asyncio
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class ResultPage:
+    """One fetched page of results."""
+
+    products: List[ProductResult]
+    # Entries the upstream returned, including ones that could not be parsed
+    raw_count: int
+
+
+PageFetcher = Callable[[int], Awaitable[ResultPage]]
+
+
+def _assemble(
+    pages: Dict[int, List[ProductResult]],
+    item_key: Callable[[ProductResult], str],
+    accept: Optional[Callable[[ProductResult], bool]]
+) -> tuple:
+    """
+    Merge the contiguous prefix of fetched pages, in page order.
+
+    Returns:
+        (unique accepted products, number of pages in the prefix)
+    """
+    seen = set()
+    products: List[ProductResult] = []
+    index = 0
+    while index in pages:
+        for product in pages[index]:
+            key = item_key(product)
+            if key in seen or (accept and not accept(product)):
+                continue
+            seen.add(key)
+            products.append(product)
+        index += 1
+    return products, index
+
+
+async def collect_pages(
+    fetch_page: PageFetcher,
+    wanted: int,
+    page_size: int,
+    max_pages: int,
+    fanout: int,
+    item_key: Callable[[ProductResult], str],
+    accept: Optional[Callable[[ProductResult], bool]] = None
+) -> List[ProductResult]:
+    """
+    Fetch result pages concurrently until enough products are collected.
+
+    Pages are requested by offset with at most ``fanout`` in flight, and only
+    as many as could still be needed: a page is started only while the
+    products already collected plus a full page for every page still
+    outstanding fall short of ``wanted``. Products are kept in page order,
+    deduplicated by ``item_key`` and filtered by ``accept``. Collection
+    stops at the first page whose upstream returned fewer than
+    ``page_size`` entries (end of results), at ``max_pages``, or as soon as
+    ``wanted`` products are in, cancelling pages still in flight.
+
+    Args:
+        fetch_page: Coroutine function returning the ResultPage at an offset
+        wanted: Number of products to return
+        page_size: Entries the upstream returns per full page
+        max_pages: Upper bound on pages to fetch
+        fanout: Maximum concurrent page fetches
+        item_key: Identity of a product for deduplication
+        accept: Optional filter products must pass to count
+
+    Returns:
+        Up to ``wanted`` unique products, in result order
+
+    Raises:
+        Exception: Whatever fetching the first page raised
+    """
+    pages: Dict[int, List[ProductResult]] = {}
+    tasks: Dict[asyncio.Task, int] = {}
+    next_page = 0
+    last_page: Optional[int] = None
+    collected: List[ProductResult] = []
+
+    try:
+        while True:
+            collected, prefix_pages = _assemble(pages, item_key, accept)
+            if len(collected) >= wanted:
+                break
+
+            # Start pages that may still be needed
+            while (
+                len(tasks) < fanout
+                and next_page < max_pages
+                and (last_page is None or next_page <= last_page)
+                and len(collected) + (next_page - prefix_pages) * page_size < wanted
+            ):
+                task = asyncio.create_task(fetch_page(next_page * page_size))
+                tasks[task] = next_page
+                next_page += 1
+
+            if not tasks:
+                break
+
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                page = tasks.pop(task)
+                try:
+                    result = task.result()
+                except Exception as e:
+                    if page == 0:
+                        raise
+                    # Keep what earlier pages returned and stop before this one
+                    logger.warning(f"Result page {page} failed, stopping pagination: {e}")
+                    last_page = page - 1 if last_page is None else min(last_page, page - 1)
+                    continue
+
+                pages[page] = result.products
+                if result.raw_count < page_size:
+                    last_page = page if last_page is None else min(last_page, page)
+
+            # Pages past the end of the results are not needed
+            for page in [p for p in pages if last_page is not None and p > last_page]:
+                del pages[page]
+    finally:
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    if next_page > 1:
+        logger.info(
+            f"Collected {min(len(collected), wanted)} products from {len(pages)} pages "
+            f"({next_page} requested)"
+        )
+    return collected[:wanted]
@@ -0,0 +1,67 @@
+"""Configured circuit breakers, one per upstream dependency."""
+from typing import Dict
+from app.config import get_settings
+from app.core.circuit_breaker import CircuitBreaker
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Breakers: the three search backends, OpenAI and the WhatsApp Cloud API
+MERCADOLIBRE_API = "mercadolibre_api"
+MERCADOLIBRE_HTML = "mercadolibre_html"
+MERCADOLIBRE_BROWSER = "mercadolibre_browser"
+OPENAI = "openai"
+WHATSAPP = "whatsapp"
+UPSTREAMS = (MERCADOLIBRE_API, MERCADOLIBRE_HTML, MERCADOLIBRE_BROWSER, OPENAI, WHATSAPP)
+
+_breaker_instances: Dict[str, CircuitBreaker] = {}
+
+
+def _slow_ms(upstream: str) -> float:
+    """Latency in milliseconds above which a call to an upstream counts as slow."""
+    thresholds = {
+        MERCADOLIBRE_API: settings.CIRCUIT_BREAKER_MERCADOLIBRE_API_SLOW_MS,
+        MERCADOLIBRE_HTML: settings.CIRCUIT_BREAKER_MERCADOLIBRE_HTML_SLOW_MS,
+        MERCADOLIBRE_BROWSER: settings.CIRCUIT_BREAKER_MERCADOLIBRE_BROWSER_SLOW_MS,
+        OPENAI: settings.CIRCUIT_BREAKER_OPENAI_SLOW_MS,
+        WHATSAPP: settings.CIRCUIT_BREAKER_WHATSAPP_SLOW_MS
+    }
+    if upstream not in thresholds:
+        raise ValueError(f"Unknown upstream: {upstream}")
+    return thresholds[upstream]
+
+
+def get_breaker(upstream: str) -> CircuitBreaker:
+    """
+    Get the singleton circuit breaker for an upstream.
+
+    With CIRCUIT_BREAKER_ENABLED off the breaker only tracks outcomes and
+    never refuses a call.
+
+    Args:
+        upstream: One of the upstream names defined in this module
+
+    Returns:
+        CircuitBreaker instance
+    """
+    breaker = _breaker_instances.get(upstream)
+    if breaker is None:
+        breaker = CircuitBreaker(
+            upstream,
+            window=settings.CIRCUIT_BREAKER_WINDOW,
+            min_calls=settings.CIRCUIT_BREAKER_MIN_CALLS,
+            failure_rate=settings.CIRCUIT_BREAKER_FAILURE_RATE,
+            slow_ms=_slow_ms(upstream),
+            slow_rate=settings.CIRCUIT_BREAKER_SLOW_RATE,
+            open_seconds=settings.CIRCUIT_BREAKER_OPEN_SECONDS,
+            half_open_calls=settings.CIRCUIT_BREAKER_HALF_OPEN_CALLS,
+            enabled=settings.CIRCUIT_BREAKER_ENABLED
+        )
+        _breaker_instances[upstream] = breaker
+    return breaker
+
+
+def breaker_stats() -> Dict[str, dict]:
+    """Return state and counters of every upstream's breaker, by upstream."""
+    return {upstream: get_breaker(upstream).stats() for upstream in UPSTREAMS}
@@ -0,0 +1,234 @@
+"""Per-sender debounce that merges rapid-fire messages into one search."""
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from dataclasses import dataclass, field
+import asyncio
+from app.config import get_settings
+from app.core.logger import get_logger
+from app.services.message_queue import mark_job_committed
+from app.services.whatsapp_service import WhatsAppService
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# prepare(sender, text) runs the cancellable work; deliver(sender, text, prepared) replies
+PrepareCallback = Callable[[str, str], Awaitable[Any]]
+DeliverCallback = Callable[[str, str, Any], Awaitable[None]]
+
+
+@dataclass
+class _Conversation:
+    """Messages from one sender waiting to be answered together."""
+
+    messages: List[str]
+    message_ids: List[str]
+    future: asyncio.Future
+    deadline: float
+    hard_deadline: float
+    changed: asyncio.Event = field(default_factory=asyncio.Event)
+    runner: Optional[asyncio.Task] = None
+    prepare_task: Optional[asyncio.Task] = None
+    version: int = 0
+
+
+class MessageCoalescer:
+    """
+    Merges messages a sender sends in quick succession into one answer.
+
+    Each message restarts a ``window``-second debounce for its sender, capped at
+    ``max_wait`` seconds after the first message, and the merged text is then
+    prepared (extraction and search). A message that arrives while that
+    preparation is still running cancels it and the merged text is prepared
+    again, so superseded OpenAI calls and scrapes are abandoned. Once delivery
+    starts, or a search is running past ``max_wait``, the batch is closed and
+    later messages open a new one.
+
+    A failed batch is reported once: only the message that opened it raises,
+    so the queue retries and notifies for that one job instead of each
+    merged message sending its own error reply.
+
+    Coalescing is per process: messages from the same sender handled by
+    different worker processes are answered separately.
+    """
+
+    def __init__(
+        self,
+        prepare: PrepareCallback,
+        deliver: DeliverCallback,
+        window: float,
+        max_wait: float
+    ):
+        """
+        Initialize coalescer.
+
+        Args:
+            prepare: Cancellable coroutine producing what ``deliver`` sends
+            deliver: Coroutine that replies to the sender; never cancelled
+            window: Quiet period in seconds that closes a batch
+            max_wait: Longest a batch keeps absorbing messages, in seconds
+        """
+        self.prepare = prepare
+        self.deliver = deliver
+        self.window = window
+        self.max_wait = max(window, max_wait)
+        self._open: Dict[str, _Conversation] = {}
+
+        # Counters
+        self.messages = 0
+        self.batches = 0
+        self.merged = 0
+        self.superseded = 0
+
+    async def submit(self, sender: str, message: str, message_id: str = "") -> None:
+        """
+        Add a message to its sender's batch and wait until the batch is settled.
+
+        Args:
+            sender: Conversation key, e.g. the sender's phone number
+            message: Message text
+            message_id: Message ID, used for logging
+
+        Raises:
+            Exception: Whatever ``prepare`` or ``deliver`` raised for the batch,
+                only for the message that opened it
+        """
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        self.messages += 1
+
+        conversation = self._open.get(sender)
+        if conversation is not None and conversation.prepare_task is not None \
+                and now >= conversation.hard_deadline:
+            # Do not keep restarting a search that has already waited long enough
+            self._close(sender, conversation)
+            conversation = None
+
+        opened = conversation is None
+        if opened:
+            conversation = _Conversation(
+                messages=[message],
+                message_ids=[message_id],
+                future=loop.create_future(),
+                deadline=now + self.window,
+                hard_deadline=now + self.max_wait
+            )
+            self._open[sender] = conversation
+            self.batches += 1
+            conversation.runner = asyncio.create_task(self._run(sender, conversation))
+        else:
+            conversation.messages.append(message)
+            conversation.message_ids.append(message_id)
+            conversation.deadline = min(now + self.window, conversation.hard_deadline)
+            conversation.version += 1
+            conversation.changed.set()
+            self.merged += 1
+            if conversation.prepare_task is not None and not conversation.prepare_task.done():
+                conversation.prepare_task.cancel()
+                self.superseded += 1
+                logger.info(f"Message {message_id} from {sender} supersedes in-flight search")
+
+        # Shield so one cancelled waiter does not cancel the whole batch
+        error = await asyncio.shield(conversation.future)
+        if error is not None:
+            if opened:
+                raise error
+            logger.info(f"Message {message_id} from {sender} was in a failed batch, reported once")
+
+    def stats(self) -> dict:
+        """Return coalescing counters."""
+        return {
+            "messages": self.messages,
+            "batches": self.batches,
+            "merged": self.merged,
+            "superseded": self.superseded,
+            "open": len(self._open)
+        }
+
+    @staticmethod
+    def merge(messages: List[str]) -> str:
+        """Join a batch of messages into one query, dropping repeats."""
+        parts: List[str] = []
+        for message in messages:
+            text = message.strip()
+            if text and text not in parts:
+                parts.append(text)
+        return " ".join(parts)
+
+    def _close(self, sender: str, conversation: _Conversation) -> None:
+        """Stop a batch from absorbing messages."""
+        if self._open.get(sender) is conversation:
+            del self._open[sender]
+
+    async def _run(self, sender: str, conversation: _Conversation) -> None:
+        """Debounce, prepare (restarting when superseded) and deliver a batch."""
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                # Wait for the sender to pause
+                while (delay := conversation.deadline - loop.time()) > 0:
+                    conversation.changed.clear()
+                    try:
+                        await asyncio.wait_for(conversation.changed.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+
+                version = conversation.version
+                text = self.merge(conversation.messages)
+                task = asyncio.create_task(self.prepare(sender, text))
+                conversation.prepare_task = task
+                await asyncio.wait({task})
+
+                if task.cancelled() or conversation.version != version:
+                    # A newer message arrived; discard this outcome and prepare the merged text
+                    if not task.cancelled():
+                        task.exception()
+                    continue
+
+                prepared = task.result()
+                break
+
+            # Close the batch before replying; new messages start a new one
+            self._close(sender, conversation)
+            if len(conversation.messages) > 1:
+                logger.info(
+                    f"Answering {len(conversation.messages)} messages from {sender} together: {text!r}"
+                )
+            await self.deliver(sender, text, prepared)
+            conversation.future.set_result(None)
+
+        except Exception as e:
+            self._close(sender, conversation)
+            # Resolved with the error so only the opening message raises it
+            conversation.future.set_result(e)
+
+
+# Singleton instance for reuse across requests
+_coalescer_instance: Optional[MessageCoalescer] = None
+
+
+def get_message_coalescer() -> MessageCoalescer:
+    """
+    Get singleton coalescer answering WhatsApp messages.
+
+    Returns:
+        MessageCoalescer instance
+    """
+    global _coalescer_instance
+    if _coalescer_instance is None:
+        service = WhatsAppService()
+
+        async def prepare(sender: str, text: str):
+            return await service.search_for_message(text)
+
+        async def deliver(sender: str, text: str, prepared) -> None:
+            structured_request, results = prepared
+            # Runs in the job that opened the batch; a retry must not resend messages
+            await mark_job_committed()
+            await service.send_search_response(sender, text, structured_request, results)
+
+        _coalescer_instance = MessageCoalescer(
+            prepare,
+            deliver,
+            window=settings.MESSAGE_COALESCE_WINDOW_MS / 1000,
+            max_wait=settings.MESSAGE_COALESCE_MAX_WAIT_MS / 1000
+        )
+    return _coalescer_instance
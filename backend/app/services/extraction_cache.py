@@ -0,0 +1,203 @@
+"""Cache of OpenAI query extractions with exact and near-duplicate lookup."""
+from typing import List, Optional
+from collections import OrderedDict
+from pydantic import ValidationError
+from app.config import get_settings
+from app.models.requests import ExtractedProductRequest
+from app.services.result_cache import normalize_text
+from app.core.cache import InMemoryCacheBackend
+from app.core.logger import get_logger
+import json
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Filler words that never change the extraction; every other token must match
+STOPWORDS = frozenset({
+    "hola", "buenas", "busco", "buscame", "quiero", "necesito", "dame", "muestrame",
+    "me", "por", "favor", "porfa", "un", "una", "unos", "unas", "el", "la", "los",
+    "las", "de", "del", "en", "que", "sea", "algun", "alguna"
+})
+
+
+def fingerprint(text: str, n: int = 3) -> frozenset:
+    """
+    Character n-gram fingerprint of normalized text.
+
+    Args:
+        text: Normalized text
+        n: N-gram length
+
+    Returns:
+        Set of n-grams
+    """
+    padded = f" {text} "
+    return frozenset(padded[i:i + n] for i in range(max(1, len(padded) - n + 1)))
+
+
+def content_tokens(text: str) -> frozenset:
+    """
+    Tokens that must match exactly for two queries to count as similar.
+
+    Any content word can change the product ("audifonos sony" vs "audifonos
+    sonos", "para nino" vs "para nina"), so only filler words may differ.
+
+    Args:
+        text: Normalized text
+
+    Returns:
+        Set of non-stopword tokens
+    """
+    return frozenset(token for token in text.split() if token not in STOPWORDS)
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    """Jaccard similarity of two sets."""
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+class ExtractionCache:
+    """
+    Cache of structured extractions keyed on normalized query text.
+
+    The exact layer matches queries that only differ in case, accents,
+    punctuation or whitespace. The optional similarity layer matches
+    near-duplicates by character trigram Jaccard similarity, but only between
+    queries with the same content words, so they differ in filler words alone.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, similarity_threshold: float = 0.0):
+        """
+        Initialize extraction cache.
+
+        Args:
+            max_entries: LRU bound on cached queries
+            ttl: Seconds an extraction stays valid
+            similarity_threshold: Minimum similarity for a near-duplicate hit (0 disables)
+        """
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self._exact = InMemoryCacheBackend(max_entries)
+        # normalized text -> (fingerprint, content tokens), most recent last
+        self._index: "OrderedDict[str, tuple]" = OrderedDict()
+
+        # Counters
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    def get(self, query: str) -> Optional[ExtractedProductRequest]:
+        """
+        Look up a cached extraction for a query.
+
+        Args:
+            query: Raw user query
+
+        Returns:
+            Validated ExtractedProductRequest, or None on a miss
+        """
+        key = normalize_text(query)
+        # Key the raw value was read from: the query's own or a near-duplicate's
+        source = key
+        raw = self._exact.get_nowait(key)
+        similar = False
+
+        if raw is None and self.similarity_threshold > 0:
+            for match in self._find_similar(key):
+                raw = self._exact.get_nowait(match)
+                if raw is not None:
+                    source, similar = match, True
+                    break
+                # Expired or evicted from the exact layer
+                self._index.pop(match, None)
+
+        if raw is None:
+            self.misses += 1
+            return None
+
+        try:
+            extracted = ExtractedProductRequest(**json.loads(raw))
+        except (ValidationError, ValueError) as e:
+            logger.warning(f"Dropping invalid cached extraction for '{source}': {e}")
+            self._exact.delete_nowait(source)
+            self._index.pop(source, None)
+            self.misses += 1
+            return None
+
+        if similar:
+            self.similar_hits += 1
+        else:
+            self.exact_hits += 1
+        return extracted
+
+    def set(self, query: str, extracted: ExtractedProductRequest) -> None:
+        """
+        Store the extraction for a query.
+
+        Args:
+            query: Raw user query
+            extracted: Extraction returned by the model
+        """
+        key = normalize_text(query)
+        self._exact.set_nowait(key, extracted.model_dump_json(), self.ttl)
+
+        if self.similarity_threshold > 0:
+            self._index[key] = (fingerprint(key), content_tokens(key))
+            self._index.move_to_end(key)
+            while len(self._index) > self._exact.max_entries:
+                self._index.popitem(last=False)
+
+    def stats(self) -> dict:
+        """Return hit/miss and eviction counters."""
+        lookups = self.exact_hits + self.similar_hits + self.misses
+        hits = self.exact_hits + self.similar_hits
+        return {
+            "exact_hits": self.exact_hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "evictions": self._exact.evictions,
+            "entries": len(self._exact),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0
+        }
+
+    def _find_similar(self, key: str) -> List[str]:
+        """Return indexed queries above the threshold, most similar first."""
+        query_fp = fingerprint(key)
+        query_tokens = content_tokens(key)
+        scored = []
+
+        for candidate, (candidate_fp, candidate_tokens) in self._index.items():
+            if candidate_tokens != query_tokens:
+                continue
+            score = jaccard(query_fp, candidate_fp)
+            if score >= self.similarity_threshold:
+                scored.append((score, candidate))
+
+        scored.sort(key=lambda item: item[0], reverse=True)
+        if scored:
+            logger.debug(f"Near-duplicate extraction candidates for '{key}': {scored[:3]}")
+        return [candidate for _, candidate in scored]
+
+
+# Singleton instance for reuse across requests
+_cache_instance: Optional[ExtractionCache] = None
+
+
+def get_extraction_cache() -> Optional[ExtractionCache]:
+    """
+    Get singleton extraction cache, or None when disabled.
+
+    Returns:
+        ExtractionCache instance or None
+    """
+    global _cache_instance
+    if _cache_instance is None and settings.EXTRACTION_CACHE_ENABLED:
+        _cache_instance = ExtractionCache(
+            max_entries=settings.EXTRACTION_CACHE_MAX_ENTRIES,
+            ttl=settings.EXTRACTION_CACHE_TTL_SECONDS,
+            similarity_threshold=settings.EXTRACTION_CACHE_SIMILARITY_THRESHOLD
+        )
+    return _cache_instance
@@ -0,0 +1,89 @@
+"""Configured outbound governors, one per upstream shared by every client of it."""
+from typing import Dict
+from app.config import get_settings
+from app.core.governor import OutboundGovernor
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Upstreams: api.mercadolibre.com, listado.mercadolibre.com.co (HTML client and
+# browser), OpenAI and the WhatsApp Cloud API on graph.facebook.com
+MERCADOLIBRE_API = "mercadolibre_api"
+MERCADOLIBRE_WEB = "mercadolibre_web"
+OPENAI = "openai"
+WHATSAPP = "whatsapp"
+
+_governor_instances: Dict[str, OutboundGovernor] = {}
+
+
+def _limits(upstream: str) -> dict:
+    """Settings for one upstream: QPS, maximum concurrency and latency target."""
+    if upstream == MERCADOLIBRE_API:
+        return {
+            "qps": settings.GOVERNOR_MERCADOLIBRE_API_QPS,
+            "max_concurrency": settings.GOVERNOR_MERCADOLIBRE_API_MAX_CONCURRENCY,
+            "latency_target_ms": settings.GOVERNOR_MERCADOLIBRE_API_LATENCY_MS
+        }
+    if upstream == MERCADOLIBRE_WEB:
+        return {
+            "qps": settings.GOVERNOR_MERCADOLIBRE_WEB_QPS,
+            "max_concurrency": settings.GOVERNOR_MERCADOLIBRE_WEB_MAX_CONCURRENCY,
+            "latency_target_ms": settings.GOVERNOR_MERCADOLIBRE_WEB_LATENCY_MS
+        }
+    if upstream == OPENAI:
+        return {
+            "qps": settings.GOVERNOR_OPENAI_QPS,
+            "max_concurrency": settings.GOVERNOR_OPENAI_MAX_CONCURRENCY,
+            "latency_target_ms": settings.GOVERNOR_OPENAI_LATENCY_MS
+        }
+    if upstream == WHATSAPP:
+        return {
+            "qps": settings.GOVERNOR_WHATSAPP_QPS,
+            "max_concurrency": settings.WHATSAPP_MAX_CONCURRENT_SENDS,
+            "latency_target_ms": settings.GOVERNOR_WHATSAPP_LATENCY_MS
+        }
+    raise ValueError(f"Unknown upstream: {upstream}")
+
+
+def get_governor(upstream: str) -> OutboundGovernor:
+    """
+    Get the singleton governor for an upstream.
+
+    With GOVERNOR_ENABLED off the governor only applies the fixed maximum
+    concurrency, without pacing, adaptation or Retry-After pauses.
+
+    Args:
+        upstream: One of the upstream names defined in this module
+
+    Returns:
+        OutboundGovernor instance
+    """
+    governor = _governor_instances.get(upstream)
+    if governor is None:
+        limits = _limits(upstream)
+        if settings.GOVERNOR_ENABLED:
+            governor = OutboundGovernor(
+                upstream,
+                qps=limits["qps"],
+                burst=max(1, round(limits["qps"])),
+                max_concurrency=limits["max_concurrency"],
+                latency_target_ms=limits["latency_target_ms"],
+                max_wait=settings.GOVERNOR_MAX_WAIT
+            )
+        else:
+            governor = OutboundGovernor(
+                upstream,
+                max_concurrency=limits["max_concurrency"],
+                adaptive=False,
+                max_wait=float("inf"),
+                default_retry_after=0.0,
+                max_retry_after=0.0
+            )
+        _governor_instances[upstream] = governor
+    return governor
+
+
+def governor_stats() -> Dict[str, dict]:
+    """Return the counters of every governor created so far, by upstream."""
+    return {upstream: governor.stats() for upstream, governor in _governor_instances.items()}
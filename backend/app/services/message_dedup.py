@@ -0,0 +1,111 @@
+"""Idempotency index of WhatsApp message IDs already accepted by the webhook."""
+from typing import Optional
+from app.config import get_settings
+from app.core.cache import CacheBackend, build_cache_backend
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+
+class MessageDeduplicator:
+    """
+    Remembers webhook message IDs so that redeliveries are processed once.
+
+    Meta retries a webhook until it gets a 200, which can deliver the same
+    message several times. Each ID is claimed with an atomic set-if-absent on
+    the backend, so concurrent deliveries to different web workers sharing a
+    Redis backend are also caught. Marks expire after ``ttl`` seconds; the
+    in-memory backend additionally bounds how many IDs are kept.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float):
+        """
+        Initialize deduplicator.
+
+        Args:
+            backend: Store for seen message IDs
+            ttl: Seconds a message ID is remembered
+        """
+        self.backend = backend
+        self.ttl = ttl
+
+        # Counters
+        self.accepted = 0
+        self.duplicates = 0
+        self.errors = 0
+
+    @staticmethod
+    def _key(message_id: str) -> str:
+        return f"wamid:{message_id}"
+
+    async def claim(self, message_id: str) -> bool:
+        """
+        Mark a message ID as seen.
+
+        Fails open: if the backend is unreachable the message is treated as new
+        rather than dropped.
+
+        Args:
+            message_id: WhatsApp message ID
+
+        Returns:
+            True the first time an ID is seen, False for duplicates
+        """
+        try:
+            first = await self.backend.add(self._key(message_id), "1", self.ttl)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Message dedup store unavailable, accepting {message_id}: {e}")
+            return True
+
+        if first:
+            self.accepted += 1
+        else:
+            self.duplicates += 1
+            logger.info(f"Duplicate WhatsApp message {message_id} ignored")
+        return first
+
+    async def release(self, message_id: str) -> None:
+        """
+        Forget a claimed message ID so a redelivery is processed again.
+
+        Used when a claimed message could not be queued.
+
+        Args:
+            message_id: WhatsApp message ID
+        """
+        try:
+            await self.backend.delete(self._key(message_id))
+        except Exception as e:
+            logger.warning(f"Failed to release message {message_id} from dedup store: {e}")
+
+    def stats(self) -> dict:
+        """Return dedup counters."""
+        return {
+            "accepted": self.accepted,
+            "duplicates": self.duplicates,
+            "errors": self.errors
+        }
+
+
+# Singleton instance for reuse across requests
+_dedup_instance: Optional[MessageDeduplicator] = None
+
+
+def get_message_deduplicator() -> Optional[MessageDeduplicator]:
+    """
+    Get singleton message deduplicator, or None when dedup is disabled.
+
+    Returns:
+        MessageDeduplicator instance or None
+    """
+    global _dedup_instance
+    if _dedup_instance is None and settings.MESSAGE_DEDUP_ENABLED:
+        backend = build_cache_backend(
+            settings.MESSAGE_DEDUP_BACKEND,
+            settings.MESSAGE_DEDUP_MAX_ENTRIES,
+            settings.REDIS_URL
+        )
+        _dedup_instance = MessageDeduplicator(backend, ttl=settings.MESSAGE_DEDUP_TTL_SECONDS)
+    return _dedup_instance
@@ -0,0 +1,580 @@
+"""Durable, SQLite-backed job queue with an asyncio worker pool."""
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from app.config import get_settings
+from app.core.errors import QueueFullException
+from app.core.logger import get_logger
+from app.core.tracing import get_tracer, parse_traceparent
+
+logger = get_logger(__name__)
+settings = get_settings()
+tracer = get_tracer()
+
+JobHandler = Callable[..., Awaitable[None]]
+FailureHandler = Callable[..., Awaitable[None]]
+
+# Higher runs first
+PRIORITY_HIGH = 10
+PRIORITY_NORMAL = 0
+PRIORITY_LOW = -10
+
+# Payload key carrying the enqueuer's trace context; never passed to handlers
+TRACEPARENT_KEY = "_traceparent"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    last_error TEXT,
+    owner TEXT,
+    lease_until REAL,
+    committed_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (status, priority DESC, available_at, id);
+"""
+
+# Columns added after the first schema, created on databases that predate them
+ADDED_COLUMNS = (("owner", "TEXT"), ("lease_until", "REAL"), ("committed_at", "REAL"))
+
+# Queue and job the current handler is running for
+_current_job: ContextVar[Optional[Tuple["MessageQueue", Dict[str, Any]]]] = ContextVar(
+    "current_job", default=None
+)
+
+
+async def mark_job_committed() -> None:
+    """
+    Record that the running job has started side effects that must not repeat.
+
+    Handlers call this right before e.g. replying to the user. From then on
+    the job is never run again: a failure, timeout, shutdown or lost worker
+    marks it as failed instead of retrying it. Outside a job this does nothing.
+    """
+    current = _current_job.get()
+    if current is None:
+        return
+    queue, job = current
+    if job.get("committed"):
+        return
+    job["committed"] = True
+    await queue._execute(
+        "UPDATE jobs SET committed_at = ? WHERE id = ? AND owner = ?",
+        (time.time(), job["id"], queue.owner)
+    )
+
+
+class MessageQueue:
+    """
+    Persistent job queue processed by a fixed pool of asyncio workers.
+
+    Jobs are stored in SQLite so that accepted work survives restarts. Workers
+    claim the highest-priority ready job, run the handler registered for its
+    kind and delete it on success. A claimed job is leased to the claiming
+    process for ``lease_seconds`` and the lease is renewed while it runs, so
+    several processes can share one database: only jobs whose lease expired
+    (their process died) are requeued, never jobs another process is still
+    running. Processes with zero workers only enqueue. Failed jobs are retried with exponential
+    backoff and kept with status ``failed`` once ``max_attempts`` is reached,
+    at which point the kind's optional failure handler is called. Jobs that
+    called ``mark_job_committed`` are never retried.
+    ``max_pending`` bounds the backlog; ``enqueue`` raises QueueFullException
+    beyond it so callers can push back instead of buffering without limit.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        workers: int,
+        max_pending: int,
+        max_attempts: int,
+        backoff_base: float,
+        backoff_max: float,
+        poll_interval: float,
+        job_timeout: float,
+        lease_seconds: float = 30.0
+    ):
+        """
+        Initialize queue.
+
+        Args:
+            path: SQLite database file (":memory:" keeps jobs in process only)
+            workers: Number of concurrent workers, i.e. jobs in flight
+            max_pending: Maximum number of jobs waiting to run
+            max_attempts: Attempts before a job is marked as failed
+            backoff_base: Delay in seconds before the first retry, doubled per attempt
+            backoff_max: Upper bound for the retry delay in seconds
+            poll_interval: Seconds an idle worker sleeps between checks
+            job_timeout: Seconds a single job may run before it counts as failed
+            lease_seconds: How long a claimed job stays reserved without a
+                heartbeat before other processes may requeue it
+        """
+        self.path = path
+        self.workers = max(0, workers)
+        self.max_pending = max(1, max_pending)
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.poll_interval = poll_interval
+        self.job_timeout = job_timeout
+        self.lease_seconds = max(1.0, lease_seconds)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self._handlers: Dict[str, JobHandler] = {}
+        self._failure_handlers: Dict[str, FailureHandler] = {}
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._running = False
+
+        # Counters
+        self.enqueued = 0
+        self.rejected = 0
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+        self.recovered = 0
+
+    def register(
+        self,
+        kind: str,
+        handler: JobHandler,
+        on_failure: Optional[FailureHandler] = None
+    ) -> None:
+        """
+        Register the coroutines that process jobs of a kind.
+
+        Args:
+            kind: Job kind passed to ``enqueue``
+            handler: Coroutine function called with the job payload as keyword arguments
+            on_failure: Optional coroutine function called with the payload once
+                a job has used up all its attempts
+        """
+        self._handlers[kind] = handler
+        if on_failure is not None:
+            self._failure_handlers[kind] = on_failure
+
+    async def start(self) -> None:
+        """Open the database and start the workers and their lease heartbeat."""
+        if self._running:
+            return
+        await asyncio.to_thread(self._open)
+
+        self._running = True
+        if self.workers:
+            await self._requeue_expired()
+            self._tasks = [
+                asyncio.create_task(self._worker(i), name=f"message-queue-worker-{i}")
+                for i in range(self.workers)
+            ]
+            self._tasks.append(asyncio.create_task(self._heartbeat(), name="message-queue-heartbeat"))
+        logger.info(f"Message queue started with {self.workers} workers ({self.path})")
+
+    async def close(self) -> None:
+        """Stop the workers and hand the jobs they were running back to the queue."""
+        self._running = False
+        self._wakeup.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._conn is not None and self.workers:
+            try:
+                now = time.time()
+                await self._execute(
+                    "UPDATE jobs SET status = 'failed', last_error = 'interrupted after commit', "
+                    "owner = NULL, lease_until = NULL, updated_at = ? "
+                    "WHERE status = 'running' AND owner = ? AND committed_at IS NOT NULL",
+                    (now, self.owner)
+                )
+                released = await self._execute(
+                    "UPDATE jobs SET status = 'pending', owner = NULL, lease_until = NULL, "
+                    "updated_at = ? WHERE status = 'running' AND owner = ? AND committed_at IS NULL",
+                    (now, self.owner)
+                )
+                if released:
+                    logger.info(f"Requeued {released} jobs interrupted by shutdown")
+            except Exception as e:
+                logger.error(f"Failed to requeue interrupted jobs: {e}")
+        if self._conn is not None:
+            with self._db_lock:
+                self._conn.close()
+            self._conn = None
+        logger.info(f"Message queue closed, stats: {self.counters()}")
+
+    async def enqueue(
+        self,
+        kind: str,
+        payload: Dict[str, Any],
+        priority: int = PRIORITY_NORMAL,
+        max_attempts: Optional[int] = None
+    ) -> int:
+        """
+        Persist a job and wake up an idle worker.
+
+        Args:
+            kind: Job kind with a registered handler
+            payload: JSON-serializable keyword arguments for the handler
+            priority: Higher values run first
+            max_attempts: Override for the queue-wide attempt limit
+
+        Returns:
+            ID of the stored job
+
+        Raises:
+            QueueFullException: If the backlog is at ``max_pending``
+        """
+        job_ids = await self.enqueue_many(kind, [payload], priority, max_attempts)
+        return job_ids[0]
+
+    async def enqueue_many(
+        self,
+        kind: str,
+        payloads: List[Dict[str, Any]],
+        priority: int = PRIORITY_NORMAL,
+        max_attempts: Optional[int] = None
+    ) -> List[int]:
+        """
+        Persist several jobs in a single transaction.
+
+        Either every job is stored or none is, so a caller can safely ask its
+        sender to redeliver the whole batch when the queue is full.
+
+        Args:
+            kind: Job kind with a registered handler
+            payloads: JSON-serializable keyword arguments, one per job
+            priority: Higher values run first
+            max_attempts: Override for the queue-wide attempt limit
+
+        Returns:
+            IDs of the stored jobs, in payload order
+
+        Raises:
+            QueueFullException: If the batch does not fit under ``max_pending``
+        """
+        if not payloads:
+            return []
+        if self._conn is None:
+            await asyncio.to_thread(self._open)
+
+        job_ids = await asyncio.to_thread(
+            self._insert,
+            kind,
+            [json.dumps(self._with_trace(payload)) for payload in payloads],
+            priority,
+            max_attempts or self.max_attempts
+        )
+        if job_ids is None:
+            self.rejected += len(payloads)
+            raise QueueFullException(
+                f"Message queue is full ({self.max_pending} pending jobs, {len(payloads)} offered)"
+            )
+
+        self.enqueued += len(job_ids)
+        self._wakeup.set()
+        return job_ids
+
+    async def stats(self) -> dict:
+        """Return job counts per status and processing counters."""
+        rows = await asyncio.to_thread(
+            self._fetchall, "SELECT status, COUNT(*) FROM jobs GROUP BY status", ()
+        )
+        return {
+            "workers": self.workers,
+            "jobs": {status: count for status, count in rows},
+            **self.counters()
+        }
+
+    def counters(self) -> dict:
+        """Return in-process processing counters."""
+        return {
+            "enqueued": self.enqueued,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "retried": self.retried,
+            "failed": self.failed,
+            "recovered": self.recovered
+        }
+
+    async def _worker(self, index: int) -> None:
+        """Claim and run jobs until the queue is closed."""
+        while self._running:
+            try:
+                job = await asyncio.to_thread(self._claim)
+            except Exception as e:
+                logger.error(f"Queue worker {index} failed to claim a job: {e}")
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._run(job)
+
+    async def _heartbeat(self) -> None:
+        """Renew the leases of this process's jobs and requeue expired ones."""
+        while self._running:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await self._execute(
+                    "UPDATE jobs SET lease_until = ? WHERE status = 'running' AND owner = ?",
+                    (time.time() + self.lease_seconds, self.owner)
+                )
+                await self._requeue_expired()
+            except Exception as e:
+                logger.error(f"Message queue heartbeat failed: {e}")
+
+    async def _requeue_expired(self) -> None:
+        """Requeue running jobs whose owner stopped renewing their lease."""
+        now = time.time()
+        lost = await self._execute(
+            "UPDATE jobs SET status = 'failed', last_error = 'lease expired after commit', "
+            "owner = NULL, lease_until = NULL, updated_at = ? WHERE status = 'running' "
+            "AND committed_at IS NOT NULL AND (lease_until IS NULL OR lease_until < ?)",
+            (now, now)
+        )
+        if lost:
+            self.failed += lost
+            logger.warning(f"Failed {lost} committed jobs whose worker stopped renewing their lease")
+
+        recovered = await self._execute(
+            "UPDATE jobs SET status = 'pending', owner = NULL, lease_until = NULL, updated_at = ? "
+            "WHERE status = 'running' AND committed_at IS NULL "
+            "AND (lease_until IS NULL OR lease_until < ?)",
+            (now, now)
+        )
+        if recovered:
+            self.recovered += recovered
+            self._wakeup.set()
+            logger.info(f"Requeued {recovered} jobs whose worker stopped renewing their lease")
+
+    @staticmethod
+    def _with_trace(payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Add the current trace context to a payload, so the job continues the trace."""
+        traceparent = tracer.current_traceparent()
+        return {**payload, TRACEPARENT_KEY: traceparent} if traceparent else payload
+
+    @staticmethod
+    def _payload(job: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[str]]:
+        """Decode a job payload and split off its trace context."""
+        payload = json.loads(job["payload"])
+        return payload, payload.pop(TRACEPARENT_KEY, None)
+
+    async def _run(self, job: Dict[str, Any]) -> None:
+        """Run one claimed job and record its outcome."""
+        handler = self._handlers.get(job["kind"])
+        token = _current_job.set((self, job))
+        try:
+            if handler is None:
+                raise LookupError(f"No handler registered for job kind '{job['kind']}'")
+            payload, traceparent = self._payload(job)
+            with tracer.span(
+                f"job {job['kind']}",
+                parent=parse_traceparent(traceparent),
+                **{"job.id": job["id"], "job.attempt": job["attempts"]}
+            ):
+                await asyncio.wait_for(handler(**payload), timeout=self.job_timeout)
+
+        except asyncio.CancelledError:
+            # Shutdown: close() hands the job back to the queue
+            raise
+
+        except Exception as e:
+            attempts = job["attempts"]
+            if job.get("committed"):
+                # Running it again would repeat what it already did
+                logger.error(f"Job {job['id']} ({job['kind']}) failed after commit, not retrying: {e}")
+                await self._fail(job, e, notify=False)
+            elif attempts >= job["max_attempts"]:
+                logger.error(f"Job {job['id']} ({job['kind']}) failed after {attempts} attempts: {e}")
+                await self._fail(job, e, notify=True)
+            else:
+                delay = min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1))
+                logger.warning(f"Job {job['id']} ({job['kind']}) failed, retrying in {delay:.1f}s: {e}")
+                now = time.time()
+                if await self._execute(
+                    "UPDATE jobs SET status = 'pending', owner = NULL, lease_until = NULL, "
+                    "available_at = ?, last_error = ?, updated_at = ? WHERE id = ? AND owner = ?",
+                    (now + delay, str(e), now, job["id"], self.owner)
+                ):
+                    self.retried += 1
+                else:
+                    self._lease_lost(job)
+            return
+
+        finally:
+            _current_job.reset(token)
+
+        if await self._execute(
+            "DELETE FROM jobs WHERE id = ? AND owner = ?", (job["id"], self.owner)
+        ):
+            self.completed += 1
+        else:
+            self._lease_lost(job)
+
+    async def _fail(self, job: Dict[str, Any], error: Exception, notify: bool) -> None:
+        """Mark a job as failed for good, calling its failure handler if asked to."""
+        updated = await self._execute(
+            "UPDATE jobs SET status = 'failed', owner = NULL, lease_until = NULL, "
+            "last_error = ?, updated_at = ? WHERE id = ? AND owner = ?",
+            (str(error), time.time(), job["id"], self.owner)
+        )
+        if not updated:
+            self._lease_lost(job)
+            return
+        self.failed += 1
+        if notify:
+            await self._notify_failure(job)
+
+    def _lease_lost(self, job: Dict[str, Any]) -> None:
+        """Log a job whose lease expired and was taken over while it ran."""
+        logger.warning(
+            f"Job {job['id']} ({job['kind']}) lost its lease while running; "
+            f"leaving it to its new owner"
+        )
+
+    async def _notify_failure(self, job: Dict[str, Any]) -> None:
+        """Call the failure handler of a job that will not be retried."""
+        on_failure = self._failure_handlers.get(job["kind"])
+        if on_failure is None:
+            return
+        try:
+            payload, _ = self._payload(job)
+            await on_failure(**payload)
+        except Exception as e:
+            logger.error(f"Failure handler for job {job['id']} ({job['kind']}) raised: {e}")
+
+    def _open(self) -> None:
+        """Open the SQLite connection and create the schema."""
+        with self._db_lock:
+            if self._conn is not None:
+                return
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.executescript(SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for name, column_type in ADDED_COLUMNS:
+                if name not in columns:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {name} {column_type}")
+            self._conn = conn
+
+    def _insert(
+        self,
+        kind: str,
+        payloads: List[str],
+        priority: int,
+        max_attempts: int
+    ) -> Optional[List[int]]:
+        """Insert pending jobs unless they would overflow the backlog."""
+        now = time.time()
+        with self._db_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                pending = self._conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = 'pending'"
+                ).fetchone()[0]
+                if pending + len(payloads) > self.max_pending:
+                    self._conn.execute("ROLLBACK")
+                    return None
+                job_ids = [
+                    self._conn.execute(
+                        "INSERT INTO jobs (kind, payload, priority, max_attempts, available_at, "
+                        "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (kind, payload, priority, max_attempts, now, now, now)
+                    ).lastrowid
+                    for payload in payloads
+                ]
+                self._conn.execute("COMMIT")
+                return job_ids
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        """Atomically mark the next ready job as running and return it."""
+        now = time.time()
+        with self._db_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                job = self._conn.execute(
+                    "SELECT * FROM jobs WHERE status = 'pending' AND available_at <= ? "
+                    "ORDER BY priority DESC, available_at, id LIMIT 1",
+                    (now,)
+                ).fetchone()
+                if job is not None:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', attempts = attempts + 1, owner = ?, "
+                        "lease_until = ?, updated_at = ? WHERE id = ?",
+                        (self.owner, now + self.lease_seconds, now, job["id"])
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        if job is None:
+            return None
+        job = dict(job)
+        job["attempts"] += 1
+        return job
+
+    async def _execute(self, sql: str, params: tuple) -> int:
+        """Run a single write statement and return the affected row count."""
+        def run() -> int:
+            with self._db_lock:
+                return self._conn.execute(sql, params).rowcount
+        return await asyncio.to_thread(run)
+
+    def _fetchall(self, sql: str, params: tuple) -> list:
+        """Run a query and return every row."""
+        with self._db_lock:
+            return self._conn.execute(sql, params).fetchall()
+
+
+# Singleton instance for reuse across requests
+_queue_instance: Optional[MessageQueue] = None
+
+
+def get_message_queue() -> MessageQueue:
+    """
+    Get singleton message queue instance.
+
+    Returns:
+        MessageQueue instance
+    """
+    global _queue_instance
+    if _queue_instance is None:
+        _queue_instance = MessageQueue(
+            path=settings.MESSAGE_QUEUE_PATH,
+            workers=settings.MESSAGE_QUEUE_WORKERS if settings.MESSAGE_QUEUE_RUN_WORKERS else 0,
+            max_pending=settings.MESSAGE_QUEUE_MAX_PENDING,
+            max_attempts=settings.MESSAGE_QUEUE_MAX_ATTEMPTS,
+            backoff_base=settings.MESSAGE_QUEUE_BACKOFF_BASE,
+            backoff_max=settings.MESSAGE_QUEUE_BACKOFF_MAX,
+            poll_interval=settings.MESSAGE_QUEUE_POLL_INTERVAL,
+            job_timeout=settings.MESSAGE_QUEUE_JOB_TIMEOUT,
+            lease_seconds=settings.MESSAGE_QUEUE_LEASE_SECONDS
+        )
+    return _queue_instance
@@ -0,0 +1,86 @@
+"""Application-scoped OpenAI client with a shared, pooled HTTP connection."""
+from typing import Optional
+import httpx
+from openai import AsyncOpenAI
+from app.config import get_settings
+from app.core.http import ConnectionStats, build_http_client
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+
+class OpenAIClientManager:
+    """
+    Owns the one AsyncOpenAI client used by the whole application.
+
+    Started and closed by the FastAPI lifespan so every request shares the
+    same connection pool instead of paying a TLS handshake per request.
+    """
+
+    def __init__(self):
+        """Initialize manager without opening any connection."""
+        self.client: Optional[AsyncOpenAI] = None
+        self.http_client: Optional[httpx.AsyncClient] = None
+        self.stats = ConnectionStats()
+
+    def start(self) -> AsyncOpenAI:
+        """
+        Create the pooled HTTP client and the OpenAI client on top of it.
+
+        Returns:
+            Shared AsyncOpenAI client
+        """
+        if self.client is None:
+            self.http_client = build_http_client(
+                self.stats,
+                max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY,
+                timeout=settings.OPENAI_TIMEOUT,
+                http2=settings.OPENAI_HTTP2
+            )
+            self.client = AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                http_client=self.http_client
+            )
+            logger.info("OpenAI client initialized")
+        return self.client
+
+    def get_client(self) -> AsyncOpenAI:
+        """
+        Get the shared client, starting it on first use.
+
+        Returns:
+            Shared AsyncOpenAI client
+        """
+        return self.client or self.start()
+
+    async def close(self) -> None:
+        """Close the client and its connection pool."""
+        if self.client is not None:
+            await self.client.close()
+            self.client = None
+            self.http_client = None
+            logger.info(f"OpenAI client closed, connection stats: {self.stats.as_dict()}")
+
+    def get_stats(self) -> dict:
+        """Return connection reuse counters."""
+        return self.stats.as_dict()
+
+
+# Singleton instance for reuse across requests
+_manager_instance: Optional[OpenAIClientManager] = None
+
+
+def get_openai_manager() -> OpenAIClientManager:
+    """
+    Get singleton OpenAI client manager.
+
+    Returns:
+        OpenAIClientManager instance
+    """
+    global _manager_instance
+    if _manager_instance is None:
+        _manager_instance = OpenAIClientManager()
+    return _manager_instance
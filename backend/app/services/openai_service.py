@@ -1,38 +1,135 @@
 import json
-from typing import Dict, Any
-from openai import AsyncOpenAI
+from typing import Dict, Any, Optional
+from openai import APIStatusError
 from app.config import get_settings
-from app.models.requests import ExtractedProductRequest, ProductCondition
+from app.models.requests import ExtractedProductRequest, ProductCondition, MAX_NUM_RESULTS
+from app.services.extraction_cache import ExtractionCache, get_extraction_cache
+from app.services.query_parser import parse_query
+from app.services.openai_client import get_openai_manager
+from app.services.summary_templates import render_summary
+from app.services.governors import OPENAI, get_governor
+from app.services.circuit_breakers import get_breaker
 from app.core.logger import get_logger
 from app.core.errors import OpenAIException
+from app.core.metrics import get_metrics, stage_timer
+from app.core.tracing import get_tracer
 
 logger = get_logger(__name__)
 settings = get_settings()
+tracer = get_tracer()
+
+EXTRACTIONS = get_metrics().counter(
+    "extractions_total",
+    "Product request extractions by the source that answered",
+    ("source",)
+)
 
 
 class OpenAIService:
     """Service for interacting with OpenAI API."""
 
     def __init__(self):
-        """Initialize OpenAI service."""
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        """Initialize OpenAI service on the shared, pooled client."""
+        self.client = get_openai_manager().get_client()
         self.model = settings.OPENAI_MODEL
+        self.governor = get_governor(OPENAI)
+        self.breaker = get_breaker(OPENAI)
+
+    async def _create_completion(self, **kwargs: Any):
+        """
+        Call the chat completions API through the OpenAI breaker and governor.
+
+        While the breaker is open the call fails at once, so callers go
+        straight to their local fallback (rule-based extraction, template
+        summary) instead of waiting out the timeout.
+
+        Args:
+            **kwargs: Arguments for ``chat.completions.create``
+
+        Returns:
+            Chat completion response
+
+        Raises:
+            CircuitOpenException: If the OpenAI breaker is open
+            UpstreamThrottledException: If the governor cannot admit the call in time
+            openai.OpenAIError: If the call fails
+        """
+        async with self.breaker.guard() as call, self.governor.request() as permit:
+            # Time spent waiting for the governor is not the upstream's latency
+            call.begin()
+            try:
+                return await self.client.chat.completions.create(**kwargs)
+            except APIStatusError as e:
+                permit.record(e.status_code, e.response.headers)
+                raise
 
     async def extract_product_request(self, user_query: str) -> ExtractedProductRequest:
         """
         Extract structured product information from natural language query.
 
+        Repeated and near-duplicate queries are answered from the extraction
+        cache, and simple queries by the local rule-based parser when it is
+        confident enough. Everything else goes to the model.
+
+        Args:
+            user_query: Natural language product search query
+
+        Returns:
+            ExtractedProductRequest with structured data
+
+        Raises:
+            OpenAIException: If extraction fails
+        """
+        with stage_timer("extraction"), tracer.span("extract_product_request", query=user_query[:100]) as span:
+            cache = get_extraction_cache()
+            if cache:
+                cached = cache.get(user_query)
+                if cached:
+                    logger.info(f"Extraction cache hit: {cached.model_dump()}")
+                    EXTRACTIONS.inc(source="cache")
+                    span.set_attribute("extraction.source", "cache")
+                    return cached
+
+            parsed = None
+            if settings.QUERY_PARSER_ENABLED:
+                parsed = parse_query(user_query)
+                if parsed.request and parsed.confidence >= settings.QUERY_PARSER_MIN_CONFIDENCE:
+                    logger.info(
+                        f"Rule-based extraction (confidence {parsed.confidence}): "
+                        f"{parsed.request.model_dump()}"
+                    )
+                    EXTRACTIONS.inc(source="rules")
+                    span.set_attribute("extraction.source", "rules")
+                    return parsed.request
+
+            return await self._extract_with_llm(
+                user_query,
+                cache=cache,
+                fallback=parsed.request if parsed else None
+            )
+
+    async def _extract_with_llm(
+        self,
+        user_query: str,
+        cache: Optional[ExtractionCache] = None,
+        fallback: Optional[ExtractedProductRequest] = None
+    ) -> ExtractedProductRequest:
+        """
+        Extract structured product information with OpenAI Function Calling.
+
         Uses OpenAI Function Calling to ensure structured JSON output that matches
         our ExtractedProductRequest schema.
 
         Args:
             user_query: Natural language product search query
+            cache: Extraction cache to store a successful result in
+            fallback: Extraction to use if the model call fails
 
         Returns:
             ExtractedProductRequest with structured data
 
         Raises:
-            OpenAIException: If extraction fails
+            OpenAIException: If the model returns invalid JSON
         """
         function_schema = {
             "name": "extract_product_info",
@@ -63,12 +160,12 @@ class OpenAIService:
                     "num_results": {
                         "type": "integer",
                         "description": (
-                            "Number of results desired (1-50). "
+                            f"Number of results desired (1-{MAX_NUM_RESULTS}). "
                             "Default to 10 if not specified"
                         ),
                         "default": 10,
                         "minimum": 1,
-                        "maximum": 50
+                        "maximum": MAX_NUM_RESULTS
                     }
                 },
                 "required": ["product_name"]
@@ -105,7 +202,7 @@ Ejemplos:
         try:
             logger.info(f"Extracting structured data from query: {user_query[:100]}")
 
-            response = await self.client.chat.completions.create(
+            response = await self._create_completion(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -124,10 +221,19 @@ Ejemplos:
             function_args = json.loads(function_call.arguments)
             logger.info(f"Extracted args: {function_args}")
 
+            # Clamp out-of-range counts instead of failing validation
+            if isinstance(function_args.get("num_results"), int):
+                function_args["num_results"] = min(max(function_args["num_results"], 1), MAX_NUM_RESULTS)
+
             # Validate and create structured request
             extracted = ExtractedProductRequest(**function_args)
             logger.info(f"Successfully extracted: {extracted.model_dump()}")
 
+            if cache:
+                cache.set(user_query, extracted)
+
+            EXTRACTIONS.inc(source="llm")
+            tracer.current_span().set_attribute("extraction.source", "llm")
             return extracted
 
         except json.JSONDecodeError as e:
@@ -137,8 +243,12 @@ Ejemplos:
         except Exception as e:
             logger.error(f"OpenAI extraction failed: {e}")
 
-            # Fallback: create basic extraction from query
+            # Fallback: best local parse, or a basic extraction from the query
             logger.warning("Using fallback extraction")
+            EXTRACTIONS.inc(source="fallback")
+            tracer.current_span().set_attribute("extraction.source", "fallback")
+            if fallback:
+                return fallback
             return ExtractedProductRequest(
                 product_name=user_query[:100],
                 condition=ProductCondition.ANY,
@@ -155,6 +265,8 @@ Ejemplos:
         Generate natural language response for WhatsApp.
 
         Creates a friendly, concise message summarizing the search results.
+        Uses the deterministic templates unless SUMMARY_USE_LLM is enabled, in
+        which case the templates are only the fallback when the model fails.
 
         Args:
             results: List of ProductResult objects
@@ -170,6 +282,17 @@ Ejemplos:
                 f"Intenta con una búsqueda diferente."
             )
 
+        product_name = structured_request.get('product_name') or query
+
+        with stage_timer("summary"), tracer.span("generate_summary", result_count=len(results)):
+            return await self._write_summary(results, query, product_name)
+
+    async def _write_summary(self, results: list, query: str, product_name: str) -> str:
+        """Write the summary for a non-empty result list; see ``generate_response_message``."""
+        # Template summaries avoid a model round trip on every reply
+        if not settings.SUMMARY_USE_LLM:
+            return render_summary(results, product_name)
+
         # Create summary of top 3 results
         top_results = results[:3]
         results_summary = []
@@ -203,7 +326,7 @@ Ejemplo:
 """
 
         try:
-            response = await self.client.chat.completions.create(
+            response = await self._create_completion(
                 model="gpt-3.5-turbo",
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.7,
@@ -216,9 +339,21 @@ Ejemplo:
             logger.error(f"Failed to generate response message: {e}")
 
             # Fallback message
-            product_name = structured_request.get('product_name', 'productos')
-            return (
-                f"🔍 Encontré {len(results)} opciones de {product_name}. "
-                f"El precio más bajo es ${results[0].price:,.0f}. "
-                f"Te envío los mejores resultados."
-            )
+            return render_summary(results, product_name)
+
+
+# Singleton instance for reuse across requests
+_service_instance: Optional[OpenAIService] = None
+
+
+def get_openai_service() -> OpenAIService:
+    """
+    Get singleton OpenAI service instance.
+
+    Returns:
+        OpenAIService instance
+    """
+    global _service_instance
+    if _service_instance is None:
+        _service_instance = OpenAIService()
+    return _service_instance
@@ -0,0 +1,326 @@
+"""Deterministic Spanish query parser used before falling back to OpenAI."""
+from typing import List, Optional, Tuple
+from dataclasses import dataclass, field
+from app.models.requests import ExtractedProductRequest, ProductCondition, MAX_NUM_RESULTS
+import re
+
+NUMBER_WORDS = {
+    "un": 1, "una": 1, "uno": 1, "dos": 2, "tres": 3, "cuatro": 4, "cinco": 5,
+    "seis": 6, "siete": 7, "ocho": 8, "nueve": 9, "diez": 10, "medio": 0.5
+}
+
+_NUM = r"\d+(?:[.,]\d+)*"
+_WORD_NUM = r"(?:un|una|uno|dos|tres|cuatro|cinco|seis|siete|ocho|nueve|diez|medio)"
+
+# "2 millones", "1.5M", "un millón", "dos palos", optionally "y medio" or "y 500 mil"
+_MILLIONS = (
+    rf"(?P<m_num>{_NUM}|{_WORD_NUM})\s*(?:millones|mill[oó]n|palos?|(?P<m_short>m)\b)"
+    rf"(?:\s+y\s+(?P<m_half>medio)\b|\s+(?:y\s+)?(?P<m_extra>{_NUM})\s*(?:mil\b|k\b))?"
+)
+# "500 mil", "800k"
+_THOUSANDS = rf"(?P<k_num>{_NUM})\s*(?:mil\b|k\b)"
+# "$1.500.000", "1500000" (only trusted after an explicit price word or "$")
+_PLAIN = rf"(?P<p_num>{_NUM})"
+
+PRICE_AMOUNT = re.compile(
+    rf"(?<!\w)(?P<dollar>\$\s*)?(?:{_MILLIONS}|{_THOUSANDS}|{_PLAIN})(?:\s*(?:de\s+)?(?:pesos|cop)\b)?",
+    re.IGNORECASE
+)
+# Words announcing a maximum price, right before the amount
+PRICE_PREFIX = re.compile(
+    r"(?:(?:por\s+)?menos\s+de|m[aá]ximo(?:\s+de)?|hasta|por\s+debajo\s+de|"
+    r"no\s+m[aá]s\s+de|que\s+no\s+pase\s+de|tope(?:\s+de)?|presupuesto(?:\s+de)?)\s*$",
+    re.IGNORECASE
+)
+# Generic prepositions that may precede an amount ("de 2 millones")
+GENERIC_PREFIX = re.compile(r"\b(?:de|por|a|en)\s*$", re.IGNORECASE)
+
+# "busco un carro" is an article, so after "busco" only digits are counts
+COUNT_LEAD = re.compile(
+    rf"^\s*(?:(?:dame|mu[eé]strame|ens[eé][ñn]ame|env[ií]ame|m[aá]ndame|quiero\s+ver|top)\s+"
+    rf"(?P<count>\d{{1,3}}|{_WORD_NUM})|(?:busco|b[uú]scame)\s+(?P<digits>\d{{1,3}}))\b"
+    r"(?:\s+(?:opciones|resultados|productos|alternativas|ofertas|publicaciones)(?:\s+de)?\b)?",
+    re.IGNORECASE
+)
+COUNT_NOUN = re.compile(
+    rf"\b(?P<count>\d{{1,3}}|{_WORD_NUM})\s+"
+    r"(?:opciones|resultados|productos|alternativas|ofertas|publicaciones)(?:\s+de)?\b",
+    re.IGNORECASE
+)
+
+# "año nuevo" is a season, not a condition
+NEW_WORDS = re.compile(r"(?<!a[ñn]o\s)\b(?:nuev[oa]s?)\b", re.IGNORECASE)
+USED_WORDS = re.compile(r"\b(?:(?:de\s+)?segunda(?:\s+mano)?|usad[oa]s?)\b", re.IGNORECASE)
+ANY_WORDS = re.compile(r"\b(?:cualquiera|cualquier\s+(?:estado|condici[oó]n))\b", re.IGNORECASE)
+_CONDITION = (
+    r"(?:(?<!a[ñn]o\s)nuev[oa]s?|(?:de\s+)?segunda(?:\s+mano)?|usad[oa]s?|"
+    r"cualquiera|cualquier\s+(?:estado|condici[oó]n))"
+)
+# Condition words are only trusted as a trailing qualifier ("iphone 15 usado",
+# "cámara nueva o usada"); elsewhere they may be part of the name ("nueva york")
+CONDITION_TAIL = re.compile(
+    rf"(?:^|\s){_CONDITION}(?:\s+(?:o|y)\s+{_CONDITION})*[\s,.;:!?]*$",
+    re.IGNORECASE
+)
+
+LEADING_GREETING = re.compile(
+    r"^(?:hola|buenas(?:\s+tardes|\s+noches)?|buenos\s+d[ií]as|por\s+favor|oye|hey)\b[\s,.!]*",
+    re.IGNORECASE
+)
+LEADING_INTENT = re.compile(
+    r"^(?:estoy\s+buscando|busco|buscando|necesito|quiero(?:\s+ver|\s+comprar)?|"
+    r"quisiera(?:\s+comprar)?|me\s+gustar[ií]a(?:\s+comprar)?|dame|mu[eé]strame|"
+    r"ens[eé][ñn]ame|b[uú]scame|busca|cons[ií]gueme|encu[eé]ntrame|cot[ií]zame|"
+    r"ay[uú]dame\s+a\s+(?:buscar|encontrar)|tienes|hay|venden)\b\s*",
+    re.IGNORECASE
+)
+LEADING_ARTICLE = re.compile(
+    r"^(?:un|una|unos|unas|el|la|los|las|alg[uú]n|alguna|algunos|algunas)\b\s*",
+    re.IGNORECASE
+)
+TRAILING_NOISE = re.compile(
+    r"(?:[\s,.;:!?¿¡]+|\s+(?:por\s+favor|gracias|de|por|con|a|en|y|o|que|para|del|al))+$",
+    re.IGNORECASE
+)
+
+# Left in the product name, these suggest the query needs the model
+PRICE_HINTS = re.compile(
+    r"\b(?:mil|mill[oó]n(?:es)?|pesos|precio|presupuesto|barat[oa]s?|econ[oó]mic[oa]s?)\b|\$|"
+    r"\b\d{1,3}(?:\.\d{3})+\b",
+    re.IGNORECASE
+)
+COMPLEX_HINTS = re.compile(
+    r"\b(?:mejor(?:es)?|cu[aá]l(?:es)?|vs|versus|comparar|diferencia|recomienda[sn]?|recomendaci[oó]n)\b|\?",
+    re.IGNORECASE
+)
+NEGATION_HINTS = re.compile(r"\b(?:sin|no|excepto|menos)\b", re.IGNORECASE)
+
+
+@dataclass
+class ParsedQuery:
+    """Result of rule-based parsing with how much it can be trusted."""
+
+    request: Optional[ExtractedProductRequest]
+    confidence: float
+    rules: List[str] = field(default_factory=list)
+
+
+def _to_number(text: str) -> float:
+    """
+    Convert a numeric token in Spanish notation to a float.
+
+    "1.500.000" and "1,500,000" are thousands-separated; "1.5" and "1,5" are
+    decimals.
+    """
+    lowered = text.lower()
+    if lowered in NUMBER_WORDS:
+        return float(NUMBER_WORDS[lowered])
+    if re.fullmatch(r"\d{1,3}(?:[.,]\d{3})+", text):
+        return float(re.sub(r"[.,]", "", text))
+    return float(text.replace(",", "."))
+
+
+def _remove_span(text: str, start: int, end: int) -> str:
+    """Cut a span out of a string, leaving a single space in its place."""
+    return f"{text[:start].rstrip()} {text[end:].lstrip()}".strip()
+
+
+def _extract_price(text: str) -> Tuple[Optional[float], str, List[str], float]:
+    """
+    Find the maximum price in a query.
+
+    Returns:
+        (price or None, text without the price phrase, rules fired, confidence penalty)
+    """
+    found: List[Tuple[float, int, int, bool]] = []
+    ambiguous = False
+    too_small = False
+
+    for match in PRICE_AMOUNT.finditer(text):
+        before = text[:match.start()]
+        explicit = PRICE_PREFIX.search(before)
+        generic = None if explicit else GENERIC_PREFIX.search(before)
+
+        if match.group("m_num"):
+            value = _to_number(match.group("m_num")) * 1_000_000
+            if match.group("m_half"):
+                value += 500_000
+            elif match.group("m_extra"):
+                value += _to_number(match.group("m_extra")) * 1_000
+            # A bare "m" is also a size or unit ("talla 42 m", "rin 29 M")
+            if match.group("m_short") and not (explicit or match.group("dollar")):
+                ambiguous = True
+        elif match.group("k_num"):
+            value = _to_number(match.group("k_num")) * 1_000
+        else:
+            # Bare numbers are model names ("iPhone 15") unless clearly a price,
+            # like "$..." or a dotted thousands amount after "de" ("de 50.000")
+            dotted = generic and re.fullmatch(r"\d{1,3}(?:\.\d{3})+", match.group("p_num"))
+            if not (explicit or match.group("dollar") or dotted):
+                continue
+            value = _to_number(match.group("p_num"))
+            # "menos de 800" most likely means 800 mil; leave it to the model
+            if explicit and not match.group("dollar") and value < 10_000:
+                too_small = True
+                continue
+
+        # Small amounts without a price word are specs ("monitor 4k"), not prices
+        if not explicit and value < 10_000:
+            continue
+
+        prefix = explicit or generic
+        start = prefix.start() if prefix else match.start()
+        found.append((value, start, match.end(), bool(explicit)))
+
+    if not found:
+        if too_small:
+            return None, text, ["small_price"], 0.5
+        return None, text, [], 0.0
+
+    rules = ["price"]
+    penalty = 0.0
+    if len(found) > 1:
+        rules.append("multiple_prices")
+        penalty += 0.4
+    value, start, end, explicit = found[0]
+    if not explicit:
+        penalty += 0.1
+    if ambiguous:
+        rules.append("ambiguous_million")
+        penalty += 0.5
+    if too_small:
+        rules.append("small_price")
+        penalty += 0.5
+
+    for _, s, e, _ in sorted(found, key=lambda f: f[1], reverse=True):
+        text = _remove_span(text, s, e)
+    return value, text, rules, penalty
+
+
+def _extract_count(text: str) -> Tuple[Optional[int], str, List[str]]:
+    """
+    Find the number of results requested ("Dame 5 ...", "3 opciones de ...").
+
+    Only a count leading the query, alone or after a verb, is taken; one in
+    the middle ("pack de 10 productos de limpieza") stays in the text.
+
+    Returns:
+        (count or None, text without the count phrase, rules fired)
+    """
+    match = COUNT_LEAD.search(text)
+    if match:
+        count = int(_to_number(match.group("count") or match.group("digits")))
+        return count, _remove_span(text, match.start(), match.end()), []
+
+    match = COUNT_NOUN.search(text)
+    if match:
+        if _clean_product_name(text[:match.start()]):
+            return None, text, ["ambiguous_count"]
+        count = int(_to_number(match.group("count")))
+        return count, _remove_span(text, match.start(), match.end()), []
+
+    return None, text, []
+
+
+def _extract_condition(text: str) -> Tuple[ProductCondition, str, List[str]]:
+    """Find the product condition in the trailing qualifier and strip it."""
+    tail = CONDITION_TAIL.search(text)
+    if tail is None:
+        # Condition words elsewhere are ambiguous and stay in the name
+        if NEW_WORDS.search(text) or USED_WORDS.search(text) or ANY_WORDS.search(text):
+            return ProductCondition.ANY, text, ["ambiguous_condition"]
+        return ProductCondition.ANY, text, []
+
+    qualifier = tail.group()
+    text = text[:tail.start()]
+    has_new = bool(NEW_WORDS.search(qualifier))
+    has_used = bool(USED_WORDS.search(qualifier))
+    has_any = bool(ANY_WORDS.search(qualifier))
+
+    if has_any or (has_new and has_used):
+        return ProductCondition.ANY, text, ["condition_any"]
+    if has_new:
+        return ProductCondition.NEW, text, ["condition_new"]
+    return ProductCondition.USED, text, ["condition_used"]
+
+
+def _clean_product_name(text: str) -> str:
+    """Strip greetings, search verbs, articles and trailing connectors."""
+    text = " ".join(text.split())
+    previous = None
+    while text != previous:
+        previous = text
+        for pattern in (LEADING_GREETING, LEADING_INTENT, LEADING_ARTICLE):
+            text = pattern.sub("", text).lstrip(" ,.;:!¿¡")
+        text = TRAILING_NOISE.sub("", text)
+    return text.strip()
+
+
+def parse_query(
+    query: str,
+    default_num_results: int = 10,
+    max_num_results: int = MAX_NUM_RESULTS
+) -> ParsedQuery:
+    """
+    Parse a Spanish product query into a structured request.
+
+    Handles the same rules given to the model: prices like "2 millones",
+    "500 mil" or "500k" after "menos de/máximo/hasta", conditions such as
+    "nuevo", "usado" or "segunda mano", and counts like "Dame 5 ...".
+
+    Args:
+        query: Raw user query
+        default_num_results: Result count when none is requested
+        max_num_results: Upper bound for the requested count
+
+    Returns:
+        ParsedQuery with the request (None if no product was found) and a
+        confidence between 0 and 1
+    """
+    confidence = 1.0
+
+    max_price, text, rules, penalty = _extract_price(query)
+    confidence -= penalty
+
+    num_results, text, count_rules = _extract_count(text)
+    if num_results is not None:
+        rules.append("count")
+    if count_rules:
+        # A count inside the name may belong to the product ("pack de 10")
+        rules.extend(count_rules)
+        confidence -= 0.5
+
+    condition, text, condition_rules = _extract_condition(text)
+    rules.extend(condition_rules)
+    if "ambiguous_condition" in condition_rules:
+        confidence -= 0.3
+
+    product_name = _clean_product_name(text)
+    words = product_name.split()
+
+    if len(product_name) < 2 or not any(c.isalpha() for c in product_name):
+        return ParsedQuery(request=None, confidence=0.0, rules=rules)
+
+    if PRICE_HINTS.search(product_name):
+        confidence -= 0.5
+        rules.append("unparsed_price")
+    if COMPLEX_HINTS.search(product_name):
+        confidence -= 0.4
+        rules.append("complex")
+    if NEGATION_HINTS.search(product_name):
+        confidence -= 0.2
+        rules.append("negation")
+    if len(words) > 10:
+        confidence -= 0.5
+        rules.append("long")
+    elif len(words) > 6:
+        confidence -= 0.3
+        rules.append("long")
+
+    request = ExtractedProductRequest(
+        product_name=product_name,
+        max_price=max_price,
+        condition=condition,
+        num_results=min(max(num_results or default_num_results, 1), max_num_results)
+    )
+    return ParsedQuery(request=request, confidence=max(0.0, round(confidence, 2)), rules=rules)
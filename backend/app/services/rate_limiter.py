@@ -0,0 +1,97 @@
+"""Configured rate limiters per client IP, API user and WhatsApp sender."""
+from typing import Dict, Optional
+from fastapi import Request
+from app.config import get_settings
+from app.core.rate_limit import RateLimitBackend, RateLimiter, build_rate_limit_backend
+from app.core.logger import get_logger
+import json
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Limiter scopes: "ip" (every HTTP request), "user" (search API) and "phone" (webhook)
+SCOPES = ("ip", "user", "phone")
+
+_backend_instance: Optional[RateLimitBackend] = None
+_limiter_instances: Dict[str, RateLimiter] = {}
+
+
+def get_rate_limiter(scope: str) -> Optional[RateLimiter]:
+    """
+    Get the singleton limiter for a scope, or None when rate limiting is disabled.
+
+    Every scope shares one backend; keys are prefixed with the scope.
+
+    Args:
+        scope: "ip", "user" or "phone"
+
+    Returns:
+        RateLimiter instance or None
+    """
+    global _backend_instance
+    if not settings.RATE_LIMIT_ENABLED:
+        return None
+
+    limiter = _limiter_instances.get(scope)
+    if limiter is None:
+        if scope not in SCOPES:
+            raise ValueError(f"Unknown rate limit scope: {scope}")
+        if _backend_instance is None:
+            _backend_instance = build_rate_limit_backend(
+                settings.RATE_LIMIT_BACKEND,
+                settings.RATE_LIMIT_MAX_KEYS,
+                settings.REDIS_URL
+            )
+        if scope == "phone":
+            limit, burst = settings.RATE_LIMIT_PHONE_PER_MINUTE, settings.RATE_LIMIT_PHONE_BURST
+        else:
+            limit, burst = settings.RATE_LIMIT_PER_MINUTE, settings.RATE_LIMIT_BURST
+        limiter = RateLimiter(_backend_instance, limit, period=60.0, burst=burst)
+        _limiter_instances[scope] = limiter
+    return limiter
+
+
+def get_ip_rate_limiter() -> Optional[RateLimiter]:
+    """Limiter applied to every HTTP request by client IP."""
+    return get_rate_limiter("ip")
+
+
+def get_user_rate_limiter() -> Optional[RateLimiter]:
+    """Limiter applied to search requests by API user."""
+    return get_rate_limiter("user")
+
+
+async def search_user_key(request: Request) -> Optional[str]:
+    """
+    Bucket key of the user making a search request.
+
+    Uses the X-User-Id header, or the ``user_id`` field of the JSON body.
+    Anonymous requests are only limited by IP.
+
+    Args:
+        request: Incoming search request
+
+    Returns:
+        "user:<id>", or None for anonymous requests
+    """
+    user_id = request.headers.get("x-user-id")
+    if not user_id:
+        try:
+            body = json.loads(await request.body() or b"{}")
+        except ValueError:
+            return None
+        if isinstance(body, dict) and isinstance(body.get("user_id"), str):
+            user_id = body["user_id"]
+    return f"user:{user_id}" if user_id else None
+
+
+def rate_limit_stats() -> Optional[dict]:
+    """
+    Return allow/limit counters of every limiter created so far.
+
+    Returns:
+        Stats per scope, or None when rate limiting is disabled
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return None
+    return {scope: limiter.stats() for scope, limiter in _limiter_instances.items()}
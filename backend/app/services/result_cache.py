@@ -0,0 +1,192 @@
+"""Cache of search results keyed on a canonical form of the structured request."""
+from typing import List, Optional
+from app.config import get_settings
+from app.models.requests import ExtractedProductRequest
+from app.models.responses import ProductResult
+from app.core.cache import CacheBackend, build_cache_backend
+from app.core.logger import get_logger
+import unicodedata
+import json
+import re
+import time
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize free text for use in cache keys.
+
+    Lowercases, strips accents and punctuation and collapses whitespace, so
+    "iPhone 15 " and "iphone  15" map to the same key.
+
+    Args:
+        text: Text to normalize
+
+    Returns:
+        Normalized text
+    """
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    without_accents = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(re.sub(r"[^\w\s]", " ", without_accents).split())
+
+
+def canonical_request_key(request: ExtractedProductRequest) -> str:
+    """
+    Build the canonical search key of a structured request, without its size.
+
+    ``num_results`` is left out on purpose: a cached entry for N results can
+    serve any request for N or fewer. The price is kept exact: an entry
+    fetched under a higher limit would hold fewer qualifying items than a
+    fresh fetch at the requested one.
+
+    Args:
+        request: Structured product request
+
+    Returns:
+        Canonical key string
+    """
+    price = int(request.max_price) if request.max_price else None
+    return f"{normalize_text(request.product_name)}|{price or '-'}|{request.condition.value}"
+
+
+class SearchResultCache:
+    """
+    TTL cache of search results with hit/miss counters.
+
+    Entries remember how many results were requested when they were stored,
+    so a full entry only answers requests it holds enough results for.
+    Entries outlive their TTL by
+    ``stale_ttl`` so they can still answer, marked stale, while every
+    upstream is down.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float, stale_ttl: float = 0.0):
+        """
+        Initialize result cache.
+
+        Args:
+            backend: Storage backend
+            ttl: Seconds an entry stays valid
+            stale_ttl: Seconds an expired entry is kept for stale lookups
+        """
+        self.backend = backend
+        self.ttl = ttl
+        self.stale_ttl = max(0.0, stale_ttl)
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.errors = 0
+
+    def key_for(self, request: ExtractedProductRequest) -> str:
+        """Return the cache key for a request."""
+        return "search:" + canonical_request_key(request)
+
+    async def get(
+        self,
+        request: ExtractedProductRequest,
+        allow_stale: bool = False
+    ) -> Optional[List[ProductResult]]:
+        """
+        Look up cached results for a request.
+
+        Args:
+            request: Structured product request
+            allow_stale: Also return entries past their TTL; such lookups
+                are counted as stale hits and never as misses
+
+        Returns:
+            Cached results (at most ``num_results``), or None on a miss
+        """
+        try:
+            raw = await self.backend.get(self.key_for(request))
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Result cache read failed: {e}")
+            return None
+
+        if raw is None:
+            if not allow_stale:
+                self.misses += 1
+            return None
+
+        entry = json.loads(raw)
+        stored = entry["results"]
+
+        # Entries written before stale keeping have no timestamp and are fresh
+        expired = time.time() - entry.get("stored_at", time.time()) > self.ttl
+        results = [ProductResult(**item) for item in stored]
+        if request.max_price:
+            results = [r for r in results if r.price <= request.max_price]
+        # A full entry may have had more matches upstream than it kept; it
+        # cannot answer a request for more than it holds
+        too_small = len(stored) >= entry["num_results"] and len(results) < request.num_results
+        if (expired and not allow_stale) or too_small:
+            if not allow_stale:
+                self.misses += 1
+            return None
+
+        if allow_stale:
+            self.stale_hits += 1
+        else:
+            self.hits += 1
+        return results[:request.num_results]
+
+    async def set(self, request: ExtractedProductRequest, results: List[ProductResult]) -> None:
+        """
+        Store results for a request.
+
+        Args:
+            request: Structured product request the results answer
+            results: Results returned by the upstream backend
+        """
+        entry = {
+            "num_results": request.num_results,
+            "stored_at": time.time(),
+            "results": [r.model_dump(mode="json") for r in results]
+        }
+        try:
+            await self.backend.set(self.key_for(request), json.dumps(entry), self.ttl + self.stale_ttl)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Result cache write failed: {e}")
+
+    def stats(self) -> dict:
+        """Return hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale_hits": self.stale_hits,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+# Singleton instance for reuse across requests
+_cache_instance: Optional[SearchResultCache] = None
+
+
+def get_result_cache() -> Optional[SearchResultCache]:
+    """
+    Get singleton result cache, or None when caching is disabled.
+
+    Returns:
+        SearchResultCache instance or None
+    """
+    global _cache_instance
+    if _cache_instance is None and settings.SEARCH_CACHE_ENABLED:
+        backend = build_cache_backend(
+            settings.SEARCH_CACHE_BACKEND,
+            settings.SEARCH_CACHE_MAX_ENTRIES,
+            settings.REDIS_URL
+        )
+        _cache_instance = SearchResultCache(
+            backend,
+            ttl=settings.SEARCH_CACHE_TTL_SECONDS,
+            stale_ttl=settings.SEARCH_CACHE_STALE_SECONDS
+        )
+    return _cache_instance
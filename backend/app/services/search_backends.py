@@ -0,0 +1,436 @@
+"""Pluggable product search backends chained from cheapest to most expensive."""
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from app.config import get_settings
+from app.models.requests import ExtractedProductRequest
+from app.models.responses import ProductResult
+from app.scrapers.mercadolibre_api import get_api_client
+from app.scrapers.mercadolibre_html import get_html_client
+from app.scrapers.mercadolibre import get_scraper
+from app.services.result_cache import SearchResultCache, get_result_cache
+from app.services.circuit_breakers import (
+    MERCADOLIBRE_API, MERCADOLIBRE_HTML, MERCADOLIBRE_BROWSER, get_breaker
+)
+from app.core.logger import get_logger
+from app.core.errors import ScraperException, CircuitOpenException
+from app.core.circuit_breaker import OPEN, CircuitBreaker
+from app.core.metrics import get_metrics, stage_timer
+from app.core.tracing import get_tracer
+import time
+
+logger = get_logger(__name__)
+settings = get_settings()
+tracer = get_tracer()
+
+BACKEND_SECONDS = get_metrics().histogram(
+    "search_backend_duration_seconds",
+    "Latency of each search backend call, including fetch and parse",
+    ("backend", "outcome")
+)
+CACHE_LOOKUPS = get_metrics().counter(
+    "search_cache_lookups_total",
+    "Result cache lookups by result",
+    ("result",)
+)
+
+
+class SearchBackend(ABC):
+    """A way of turning a structured request into Mercado Libre products."""
+
+    name: str = ""
+    # Circuit breaker guarding this backend's upstream
+    upstream: str = ""
+
+    @abstractmethod
+    async def search(self, request: ExtractedProductRequest) -> List[ProductResult]:
+        """
+        Search products for a structured request.
+
+        Args:
+            request: Structured product request with search parameters
+
+        Returns:
+            List of ProductResult objects
+
+        Raises:
+            ScraperException: If the backend cannot serve the request
+        """
+
+    async def stream(self, request: ExtractedProductRequest) -> AsyncIterator[ProductResult]:
+        """
+        Yield products as soon as the backend has them.
+
+        Backends that cannot parse incrementally yield the full result list
+        once ``search`` returns.
+
+        Args:
+            request: Structured product request with search parameters
+
+        Yields:
+            ProductResult objects
+
+        Raises:
+            ScraperException: If the backend cannot serve the request
+        """
+        for product in await self.search(request):
+            yield product
+
+
+class APISearchBackend(SearchBackend):
+    """Mercado Libre official API over HTTP."""
+
+    name = "api"
+    upstream = MERCADOLIBRE_API
+
+    async def search(self, request: ExtractedProductRequest) -> List[ProductResult]:
+        client = await get_api_client()
+        return await client.search_products(request)
+
+
+class HTMLSearchBackend(SearchBackend):
+    """Listing page fetched over HTTP and parsed without a browser."""
+
+    name = "html"
+    upstream = MERCADOLIBRE_HTML
+
+    async def search(self, request: ExtractedProductRequest) -> List[ProductResult]:
+        client = await get_html_client()
+        return await client.search_products(request)
+
+    async def stream(self, request: ExtractedProductRequest) -> AsyncIterator[ProductResult]:
+        client = await get_html_client()
+        async for product in client.stream_products(request):
+            yield product
+
+
+class PlaywrightSearchBackend(SearchBackend):
+    """Listing page rendered in a pooled Chromium context."""
+
+    name = "playwright"
+    upstream = MERCADOLIBRE_BROWSER
+
+    async def search(self, request: ExtractedProductRequest) -> List[ProductResult]:
+        scraper = await get_scraper()
+        return await scraper.scrape_with_browser(request)
+
+
+SEARCH_BACKENDS = {
+    backend.name: backend
+    for backend in (APISearchBackend, HTMLSearchBackend, PlaywrightSearchBackend)
+}
+
+
+@dataclass
+class BackendStats:
+    """Success, failure and latency tracking for one backend."""
+
+    successes: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    avg_latency_ms: float = 0.0
+    demoted_until: float = 0.0
+    last_error: Optional[str] = None
+
+    def record_success(self, latency_ms: float) -> None:
+        """Record a successful call and fold its latency into the average."""
+        self.successes += 1
+        self.consecutive_failures = 0
+        self.demoted_until = 0.0
+        # Exponentially weighted so the average follows recent behaviour
+        if self.successes == 1:
+            self.avg_latency_ms = latency_ms
+        else:
+            self.avg_latency_ms = 0.8 * self.avg_latency_ms + 0.2 * latency_ms
+
+    def record_failure(self, error: Exception) -> None:
+        """Record a failed call."""
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_error = str(error)
+
+
+class SearchChain:
+    """
+    Ordered chain of search backends with automatic fallback.
+
+    Results are served from the result cache when possible. Otherwise backends
+    are tried in configured order until one succeeds. A backend that
+    fails ``demote_after`` times in a row is demoted: for ``demote_seconds`` it
+    is only tried after every healthy backend has failed. A backend whose
+    circuit breaker is open is skipped without being called; the breakers
+    themselves are fed by the clients, one outcome per upstream request
+    once its governor has admitted it. If every backend fails or is
+    skipped, expired cached results are served when the cache still has
+    them.
+    """
+
+    def __init__(
+        self,
+        backends: List[SearchBackend],
+        demote_after: int = 3,
+        demote_seconds: float = 60.0,
+        cache: Optional[SearchResultCache] = None,
+        breakers: Optional[Dict[str, CircuitBreaker]] = None
+    ):
+        """
+        Initialize chain.
+
+        Args:
+            backends: Backends ordered from cheapest to most expensive
+            demote_after: Consecutive failures before a backend is demoted
+            demote_seconds: How long a demotion lasts
+            cache: Optional result cache consulted before any backend
+            breakers: Optional circuit breakers consulted before each backend, by backend name
+        """
+        if not backends:
+            raise ValueError("SearchChain needs at least one backend")
+        self.backends = backends
+        self.demote_after = demote_after
+        self.demote_seconds = demote_seconds
+        self.cache = cache
+        self.breakers = breakers or {}
+        self.stats: Dict[str, BackendStats] = {b.name: BackendStats() for b in backends}
+
+    def ordered_backends(self) -> List[SearchBackend]:
+        """Return backends in the order they should be tried right now."""
+        now = time.monotonic()
+        healthy = [b for b in self.backends if self.stats[b.name].demoted_until <= now]
+        demoted = [b for b in self.backends if self.stats[b.name].demoted_until > now]
+        return healthy + demoted
+
+    async def search(self, request: ExtractedProductRequest) -> List[ProductResult]:
+        """
+        Search products with the first backend that succeeds.
+
+        Args:
+            request: Structured product request with search parameters
+
+        Returns:
+            List of ProductResult objects
+
+        Raises:
+            ScraperException: If every backend failed
+        """
+        with tracer.span(
+            "search",
+            product_name=request.product_name,
+            num_results=request.num_results
+        ):
+            return await self._search(request)
+
+    async def _search(self, request: ExtractedProductRequest) -> List[ProductResult]:
+        """Serve a search from the cache or the backends; see ``search``."""
+        cached = await self._cached(request)
+        if cached is not None:
+            return cached
+
+        last_error: Optional[Exception] = None
+
+        for backend in self.ordered_backends():
+            refused = self._refused(backend)
+            if refused:
+                last_error = refused
+                continue
+
+            start = time.perf_counter()
+            try:
+                with tracer.span("search.backend", backend=backend.name) as span:
+                    results = await backend.search(request)
+                    span.set_attribute("result_count", len(results))
+            except Exception as e:
+                self._record_failure(backend, e, start)
+                last_error = e
+                continue
+
+            await self._record_success(backend, request, results, start)
+            return results
+
+        stale = await self._stale(request)
+        if stale is not None:
+            return stale
+
+        raise ScraperException(f"All search backends failed, last error: {last_error}")
+
+    async def stream(
+        self,
+        request: ExtractedProductRequest
+    ) -> AsyncIterator[Tuple[str, ProductResult]]:
+        """
+        Yield products as the first working backend produces them.
+
+        Falls back to the next backend only while nothing has been yielded;
+        a backend failing mid-stream ends the stream with an error. The
+        complete result list is stored in the cache afterwards.
+
+        Args:
+            request: Structured product request with search parameters
+
+        Yields:
+            (source, product) pairs, where source is "cache", "stale_cache"
+            or a backend name
+
+        Raises:
+            ScraperException: If every backend failed, or one failed mid-stream
+        """
+        # No span of its own: a span opened in a generator would stay current
+        # in the consumer between yields, so outcomes go on the caller's span
+        cached = await self._cached(request)
+        if cached is not None:
+            for product in cached:
+                yield "cache", product
+            return
+
+        last_error: Optional[Exception] = None
+
+        for backend in self.ordered_backends():
+            refused = self._refused(backend)
+            if refused:
+                last_error = refused
+                continue
+
+            start = time.perf_counter()
+            results: List[ProductResult] = []
+            try:
+                async for product in backend.stream(request):
+                    results.append(product)
+                    yield backend.name, product
+            except Exception as e:
+                self._record_failure(backend, e, start)
+                if results:
+                    raise ScraperException(
+                        f"Search backend '{backend.name}' failed after {len(results)} products: {e}"
+                    )
+                last_error = e
+                continue
+
+            await self._record_success(backend, request, results, start)
+            return
+
+        stale = await self._stale(request)
+        if stale is not None:
+            for product in stale:
+                yield "stale_cache", product
+            return
+
+        raise ScraperException(f"All search backends failed, last error: {last_error}")
+
+    async def _cached(self, request: ExtractedProductRequest) -> Optional[List[ProductResult]]:
+        """Look a request up in the result cache, if there is one."""
+        if not self.cache:
+            return None
+
+        with stage_timer("cache"):
+            cached = await self.cache.get(request)
+        CACHE_LOOKUPS.inc(result="miss" if cached is None else "hit")
+
+        span = tracer.current_span()
+        span.set_attribute("cache_hit", cached is not None)
+        if cached is not None:
+            logger.info(f"Result cache hit: {len(cached)} products")
+            span.set_attribute("result_count", len(cached))
+        return cached
+
+    async def _stale(self, request: ExtractedProductRequest) -> Optional[List[ProductResult]]:
+        """Look a request up in the result cache, accepting expired entries."""
+        if not self.cache:
+            return None
+
+        stale = await self.cache.get(request, allow_stale=True)
+        if stale is not None:
+            CACHE_LOOKUPS.inc(result="stale")
+            logger.warning(f"Every search backend failed, serving {len(stale)} stale cached products")
+            span = tracer.current_span()
+            span.set_attribute("cache_stale", True)
+            span.set_attribute("result_count", len(stale))
+        return stale
+
+    def _refused(self, backend: SearchBackend) -> Optional[CircuitOpenException]:
+        """Check a backend's circuit breaker; the error to report if it is open."""
+        breaker = self.breakers.get(backend.name)
+        if breaker is None or breaker.state != OPEN:
+            return None
+        breaker.rejected += 1
+        logger.info(f"Skipping search backend '{backend.name}', its circuit is open")
+        return CircuitOpenException(breaker.name, breaker.retry_after())
+
+    def _record_failure(self, backend: SearchBackend, error: Exception, start: float) -> None:
+        """Count a backend failure and demote the backend if it keeps failing."""
+        latency = time.perf_counter() - start
+        BACKEND_SECONDS.observe(latency, backend=backend.name, outcome="error")
+        stats = self.stats[backend.name]
+        stats.record_failure(error)
+        if stats.consecutive_failures >= self.demote_after:
+            stats.demoted_until = time.monotonic() + self.demote_seconds
+            logger.warning(
+                f"Search backend '{backend.name}' demoted for {self.demote_seconds}s "
+                f"after {stats.consecutive_failures} consecutive failures"
+            )
+        logger.warning(f"Search backend '{backend.name}' failed: {error}")
+
+    async def _record_success(
+        self,
+        backend: SearchBackend,
+        request: ExtractedProductRequest,
+        results: List[ProductResult],
+        start: float
+    ) -> None:
+        """Record a backend's latency and cache its results."""
+        latency_ms = (time.perf_counter() - start) * 1000
+        BACKEND_SECONDS.observe(latency_ms / 1000, backend=backend.name, outcome="ok")
+        self.stats[backend.name].record_success(latency_ms)
+
+        span = tracer.current_span()
+        span.set_attribute("backend", backend.name)
+        span.set_attribute("result_count", len(results))
+        logger.info(
+            f"Search backend '{backend.name}' returned {len(results)} products "
+            f"in {latency_ms:.2f}ms"
+        )
+        if self.cache and results:
+            await self.cache.set(request, results)
+
+    def get_stats(self) -> Dict[str, dict]:
+        """Return per-backend counters, in configured order."""
+        now = time.monotonic()
+        return {
+            name: {
+                "successes": stats.successes,
+                "failures": stats.failures,
+                "consecutive_failures": stats.consecutive_failures,
+                "avg_latency_ms": round(stats.avg_latency_ms, 2),
+                "demoted": stats.demoted_until > now,
+                "circuit_open": name in self.breakers and self.breakers[name].state == OPEN,
+                "last_error": stats.last_error
+            }
+            for name, stats in self.stats.items()
+        }
+
+
+# Singleton instance for reuse across requests
+_chain_instance: Optional[SearchChain] = None
+
+
+def get_search_chain() -> SearchChain:
+    """
+    Get singleton search chain built from SEARCH_BACKEND_CHAIN.
+
+    Returns:
+        SearchChain instance
+    """
+    global _chain_instance
+    if _chain_instance is None:
+        backends = []
+        for name in settings.search_backend_chain_list:
+            if name not in SEARCH_BACKENDS:
+                logger.warning(f"Unknown search backend '{name}' in SEARCH_BACKEND_CHAIN, skipping")
+                continue
+            backends.append(SEARCH_BACKENDS[name]())
+        _chain_instance = SearchChain(
+            backends,
+            demote_after=settings.SEARCH_BACKEND_DEMOTE_AFTER,
+            demote_seconds=settings.SEARCH_BACKEND_DEMOTE_SECONDS,
+            cache=get_result_cache(),
+            breakers={backend.name: get_breaker(backend.upstream) for backend in backends}
+        )
+    return _chain_instance
@@ -0,0 +1,165 @@
+"""Deterministic Spanish summaries of search results, without calling a model."""
+from typing import List, Optional
+from dataclasses import dataclass
+from app.models.responses import ProductResult
+import statistics
+import zlib
+
+MAX_SUMMARY_LENGTH = 250
+
+
+@dataclass
+class SummaryStats:
+    """Aggregates of a result list used to fill the summary templates."""
+
+    count: int
+    min_price: float
+    median_price: float
+    max_price: float
+    new: int
+    used: int
+    other: int
+    free_shipping: int
+
+    @property
+    def free_shipping_share(self) -> float:
+        """Fraction of results with free shipping."""
+        return self.free_shipping / self.count if self.count else 0.0
+
+
+# Phrasings rotate per query; {extras} carries condition and shipping details
+MANY_TEMPLATES = [
+    "🔍 ¡Encontré {count} opciones de {name}! Van desde {min} hasta {max} y el precio típico ronda {median}. {extras}Te envío los mejores 👇",
+    "🔍 Tengo {count} resultados de {name} entre {min} y {max}, con un precio medio de {median}. {extras}Aquí van los destacados 👇",
+    "🔍 ¡Listo! {count} opciones de {name}: la más barata cuesta {min} y la más cara {max} (mediana {median}). {extras}Mira los enlaces 👇",
+    "🔍 Busqué {name} y encontré {count} opciones desde {min}. La mitad cuesta menos de {median}. {extras}Te comparto las mejores 👇"
+]
+SAME_PRICE_TEMPLATES = [
+    "🔍 ¡Encontré {count} opciones de {name}, todas a {min}! {extras}Te envío los enlaces 👇",
+    "🔍 Tengo {count} resultados de {name} al mismo precio: {min}. {extras}Aquí van 👇"
+]
+SINGLE_TEMPLATES = [
+    "🔍 Encontré 1 opción de {name} por {min}. {extras}Te envío el enlace 👇",
+    "🔍 ¡Hay una opción de {name} a {min}! {extras}Aquí va el enlace 👇"
+]
+
+
+def format_price(price: float) -> str:
+    """Format a COP price with dot thousands separators, e.g. $1.850.000."""
+    return f"${price:,.0f}".replace(",", ".")
+
+
+def compute_summary_stats(results: List[ProductResult]) -> SummaryStats:
+    """
+    Compute price range, condition mix and free-shipping count.
+
+    Args:
+        results: Non-empty list of product results
+
+    Returns:
+        SummaryStats for the list
+    """
+    prices = [result.price for result in results]
+    new = used = 0
+    for result in results:
+        condition = result.condition.lower()
+        if condition.startswith("nuev"):
+            new += 1
+        elif condition.startswith("usad") or condition.startswith("reacond"):
+            used += 1
+
+    return SummaryStats(
+        count=len(results),
+        min_price=min(prices),
+        median_price=statistics.median(prices),
+        max_price=max(prices),
+        new=new,
+        used=used,
+        other=len(results) - new - used,
+        free_shipping=sum(1 for result in results if result.free_shipping)
+    )
+
+
+def describe_extras(stats: SummaryStats) -> str:
+    """
+    Describe the condition mix and free shipping in one or two short sentences.
+
+    Args:
+        stats: Result aggregates
+
+    Returns:
+        Text ending in a space, or an empty string if there is nothing to add
+    """
+    parts = []
+    if stats.count > 1:
+        if stats.new == stats.count:
+            parts.append("Todas son nuevas.")
+        elif stats.used == stats.count:
+            parts.append("Todas son usadas.")
+        elif stats.new and stats.used:
+            parts.append(
+                f"{stats.new} {'nueva' if stats.new == 1 else 'nuevas'} y "
+                f"{stats.used} {'usada' if stats.used == 1 else 'usadas'}."
+            )
+    elif stats.used:
+        parts.append("Es usada.")
+
+    if stats.free_shipping == stats.count:
+        parts.append("Envío gratis en todas." if stats.count > 1 else "Tiene envío gratis.")
+    elif stats.free_shipping:
+        parts.append(f"{stats.free_shipping} con envío gratis.")
+
+    return " ".join(parts) + " " if parts else ""
+
+
+def render_summary(
+    results: List[ProductResult],
+    product_name: str,
+    variant: Optional[int] = None
+) -> str:
+    """
+    Build the WhatsApp summary message for a non-empty result list.
+
+    The phrasing is picked from a rotation keyed on the product name, so the
+    same search always reads the same while different searches vary.
+
+    Args:
+        results: Non-empty list of product results
+        product_name: Product the user searched for
+        variant: Optional explicit phrasing index
+
+    Returns:
+        Summary of at most MAX_SUMMARY_LENGTH characters
+    """
+    stats = compute_summary_stats(results)
+    if stats.count == 1:
+        templates = SINGLE_TEMPLATES
+    elif stats.min_price == stats.max_price:
+        templates = SAME_PRICE_TEMPLATES
+    else:
+        templates = MANY_TEMPLATES
+
+    if variant is None:
+        variant = zlib.crc32(f"{product_name.lower()}|{stats.count}".encode("utf-8"))
+    template = templates[variant % len(templates)]
+
+    values = {
+        "count": stats.count,
+        "name": product_name.strip(),
+        "min": format_price(stats.min_price),
+        "median": format_price(stats.median_price),
+        "max": format_price(stats.max_price),
+        "extras": describe_extras(stats)
+    }
+    message = template.format(**values)
+
+    # Drop the details first, then shorten the product name
+    if len(message) > MAX_SUMMARY_LENGTH:
+        values["extras"] = ""
+        message = template.format(**values)
+    if len(message) > MAX_SUMMARY_LENGTH:
+        overflow = len(message) - MAX_SUMMARY_LENGTH
+        values["name"] = values["name"][:max(10, len(values["name"]) - overflow - 1)].rstrip() + "…"
+        message = template.format(**values)[:MAX_SUMMARY_LENGTH]
+
+    return message.replace("  ", " ")
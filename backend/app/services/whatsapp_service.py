@@ -1,9 +1,11 @@
-import httpx
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
+import asyncio
 from app.config import get_settings
 from app.core.logger import get_logger
-from app.services.openai_service import OpenAIService
-from app.scrapers.mercadolibre import get_scraper
+from app.services.openai_service import get_openai_service
+from app.services.search_backends import get_search_chain
+from app.services.whatsapp_transport import get_whatsapp_transport
+from app.models.requests import ExtractedProductRequest
 from app.models.responses import ProductResult
 
 logger = get_logger(__name__)
@@ -17,8 +19,17 @@ class WhatsAppService:
         """Initialize WhatsApp service."""
         self.api_key = settings.WHATSAPP_API_KEY
         self.phone_number = settings.WHATSAPP_PHONE_NUMBER
-        # Meta WhatsApp Cloud API base URL
-        self.api_url = "https://graph.facebook.com/v18.0"
+        # Shared, pooled connection to the Meta WhatsApp Cloud API
+        self.transport = get_whatsapp_transport()
+
+    def _text_payload(self, to_number: str, message: str) -> dict:
+        """Build a Cloud API text message payload."""
+        return {
+            "messaging_product": "whatsapp",
+            "to": to_number,
+            "type": "text",
+            "text": {"body": message}
+        }
 
     async def send_message(self, to_number: str, message: str) -> bool:
         """
@@ -35,30 +46,59 @@ class WhatsAppService:
             logger.warning("WhatsApp API key not configured, skipping message send")
             return False
 
-        url = f"{self.api_url}/{self.phone_number}/messages"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        payload = {
-            "messaging_product": "whatsapp",
-            "to": to_number,
-            "type": "text",
-            "text": {"body": message}
-        }
+        return await self.transport.send(self._text_payload(to_number, message))
 
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, headers=headers, json=payload, timeout=10.0)
-                response.raise_for_status()
+    def format_product_links(
+        self,
+        products: List[ProductResult],
+        max_links: int = 5
+    ) -> List[str]:
+        """
+        Format one message per product link.
+
+        Args:
+            products: List of ProductResult objects
+            max_links: Maximum number of links to format
+
+        Returns:
+            Message texts, in product order
+        """
+        messages = []
+        for i, product in enumerate(products[:max_links], 1):
+            price_formatted = f"${product.price:,.0f}".replace(",", ".")
+            message = (
+                f"*{i}. {product.title[:80]}*\n"
+                f"💰 Precio: {price_formatted} COP\n"
+                f"📦 Estado: {product.condition}\n"
+            )
+
+            if product.free_shipping:
+                message += "🚚 Envío gratis\n"
 
-                logger.info(f"Message sent successfully to {to_number}")
-                return True
+            message += f"🔗 {product.url}"
+            messages.append(message)
+        return messages
+
+    async def send_messages(self, to_number: str, messages: List[str]) -> bool:
+        """
+        Send several messages one after another, in list order.
+
+        Args:
+            to_number: Recipient phone number
+            messages: Message texts to send
 
-        except httpx.HTTPError as e:
-            logger.error(f"Failed to send WhatsApp message: {e}")
+        Returns:
+            True if every message was sent successfully
+        """
+        if not self.api_key:
+            logger.warning("WhatsApp API key not configured, skipping message send")
             return False
 
+        sent = await self.transport.send_many(
+            [self._text_payload(to_number, msg) for msg in messages]
+        )
+        return all(sent)
+
     async def send_product_links(
         self,
         to_number: str,
@@ -79,93 +119,151 @@ class WhatsAppService:
         if not products:
             return False
 
-        # Format product links
-        messages = []
-        for i, product in enumerate(products[:max_links], 1):
-            price_formatted = f"${product.price:,.0f}".replace(",", ".")
-            message = (
-                f"*{i}. {product.title[:80]}*\n"
-                f"💰 Precio: {price_formatted} COP\n"
-                f"📦 Estado: {product.condition}\n"
-            )
+        # Send each product as a separate message, in order
+        return await self.send_messages(to_number, self.format_product_links(products, max_links))
 
-            if product.free_shipping:
-                message += "🚚 Envío gratis\n"
+    async def search_for_message(
+        self,
+        message: str
+    ) -> Tuple[ExtractedProductRequest, List[ProductResult]]:
+        """
+        Extract a product request from a message and search for it.
 
-            message += f"🔗 {product.url}"
-            messages.append(message)
+        Nothing is sent to the user, so this step can be cancelled and rerun
+        freely, e.g. when the user sends a follow-up message.
+
+        Args:
+            message: Message text
 
-        # Send each product as a separate message
-        success = True
-        for msg in messages:
-            if not await self.send_message(to_number, msg):
-                success = False
+        Returns:
+            Structured request and the products found for it
+        """
+        # Extract structured request
+        structured_request = await get_openai_service().extract_product_request(message)
+        logger.info(f"Extracted request: {structured_request.model_dump()}")
 
-        return success
+        # Search products through the backend chain
+        results = await get_search_chain().search(structured_request)
+        logger.info(f"Found {len(results)} products")
+
+        return structured_request, results
+
+    async def send_search_response(
+        self,
+        to_number: str,
+        message: str,
+        structured_request: ExtractedProductRequest,
+        results: List[ProductResult]
+    ) -> None:
+        """
+        Send the summary and product links for a search, or a no-results message.
+
+        The summary is generated while the links are formatted. With the
+        "summary_first" reply order the links wait up to
+        WHATSAPP_SUMMARY_WAIT_MS for the summary, and are sent only once the
+        API has accepted it, so that it arrives first; with "as_ready" (or
+        once that wait runs out) links are sent right away and the summary
+        follows when it is written.
+
+        Args:
+            to_number: Recipient phone number
+            message: Message text the search was made for
+            structured_request: Request extracted from the message
+            results: Products found
+        """
+        if results:
+            # Write the summary while the links are formatted and sent
+            summary_task = asyncio.create_task(
+                get_openai_service().generate_response_message(
+                    results,
+                    message,
+                    structured_request.model_dump()
+                )
+            )
+            links = self.format_product_links(results, max_links=5)
+
+            async def send_summary() -> bool:
+                return await self.send_message(to_number, await summary_task)
+
+            if settings.WHATSAPP_REPLY_ORDER == "summary_first":
+                # Summary leads, unless writing it takes longer than the wait budget
+                done, _ = await asyncio.wait(
+                    {summary_task},
+                    timeout=settings.WHATSAPP_SUMMARY_WAIT_MS / 1000
+                )
+                if done:
+                    # Links must not start before the summary has been accepted
+                    await self.send_message(to_number, summary_task.result())
+                    await self.send_messages(to_number, links)
+                    return
+                logger.info("Summary not ready in time, sending product links first")
+
+            # Each part goes out as soon as it is ready
+            await asyncio.gather(send_summary(), self.send_messages(to_number, links))
+
+        else:
+            # No results found
+            no_results_msg = (
+                f"❌ No encontré productos para '{structured_request.product_name}'. "
+                f"Intenta con una búsqueda diferente o ajusta los filtros."
+            )
+            await self.send_message(to_number, no_results_msg)
 
     async def process_and_respond(
         self,
         from_number: str,
         message: str,
-        message_id: str
+        message_id: str,
+        raise_errors: bool = False
     ) -> None:
         """
         Process incoming WhatsApp message and respond with product search.
 
         This is the main handler for WhatsApp messages that orchestrates:
         1. Extract product request with OpenAI
-        2. Scrape Mercado Libre
+        2. Search Mercado Libre through the backend chain
         3. Send response message and product links
 
         Args:
             from_number: Sender's phone number
             message: Message text
             message_id: WhatsApp message ID
+            raise_errors: Re-raise failures instead of replying with an error
+                message, so that the caller can retry
+
+        Raises:
+            Exception: Any processing error, only when ``raise_errors`` is set
         """
         logger.info(f"Processing WhatsApp message {message_id} from {from_number}")
 
         try:
-            # Step 1: Extract structured request
-            openai_service = OpenAIService()
-            structured_request = await openai_service.extract_product_request(message)
-
-            logger.info(f"Extracted request: {structured_request.model_dump()}")
-
-            # Step 2: Scrape products
-            scraper = await get_scraper()
-            results = await scraper.scrape_products(structured_request)
-
-            logger.info(f"Found {len(results)} products")
+            # Steps 1-2: Extract structured request and search products
+            structured_request, results = await self.search_for_message(message)
 
             # Step 3: Generate and send response
-            if results:
-                # Send summary message
-                summary = await openai_service.generate_response_message(
-                    results,
-                    message,
-                    structured_request.model_dump()
-                )
-                await self.send_message(from_number, summary)
-
-                # Send product links
-                await self.send_product_links(from_number, results, max_links=5)
-
-            else:
-                # No results found
-                no_results_msg = (
-                    f"❌ No encontré productos para '{structured_request.product_name}'. "
-                    f"Intenta con una búsqueda diferente o ajusta los filtros."
-                )
-                await self.send_message(from_number, no_results_msg)
+            await self.send_search_response(from_number, message, structured_request, results)
 
             logger.info(f"WhatsApp message {message_id} processed successfully")
 
         except Exception as e:
             logger.error(f"Error processing WhatsApp message: {e}", exc_info=True)
+            if raise_errors:
+                raise
 
-            # Send error message to user
-            error_msg = (
-                "❌ Lo siento, hubo un error procesando tu búsqueda. "
-                "Por favor intenta de nuevo en unos momentos."
-            )
-            await self.send_message(from_number, error_msg)
+            await self.send_error_message(from_number)
+
+    async def send_error_message(self, to_number: str) -> bool:
+        """
+        Tell the user their search could not be processed.
+
+        Args:
+            to_number: Recipient phone number
+
+        Returns:
+            True if message was sent successfully
+        """
+        error_msg = (
+            "❌ Lo siento, hubo un error procesando tu búsqueda. "
+            "Por favor intenta de nuevo en unos momentos."
+        )
+        return await self.send_message(to_number, error_msg)
@@ -0,0 +1,167 @@
+"""Long-lived, pooled HTTP transport for the WhatsApp Cloud API."""
+from typing import Dict, List, Optional
+from collections import deque
+import asyncio
+import statistics
+import time
+import httpx
+from app.config import get_settings
+from app.core.http import ConnectionStats, build_http_client
+from app.core.logger import get_logger
+from app.core.metrics import STAGE_SECONDS
+from app.core.tracing import get_tracer
+from app.core.errors import UpstreamThrottledException, CircuitOpenException
+from app.services.governors import WHATSAPP, get_governor
+from app.services.circuit_breakers import get_breaker
+
+logger = get_logger(__name__)
+settings = get_settings()
+tracer = get_tracer()
+
+
+class WhatsAppTransport:
+    """
+    Sends Cloud API message payloads over one shared connection pool.
+
+    HTTP/2 and keep-alive are used when available. The WhatsApp governor
+    paces sends and bounds how many are in flight across all conversations,
+    backing off when Meta throttles, and the WhatsApp circuit breaker fails
+    sends at once while the API is down. Per-send latency is recorded and
+    logged.
+    """
+
+    def __init__(self):
+        """Initialize transport without opening any connection."""
+        self.client: Optional[httpx.AsyncClient] = None
+        self.stats = ConnectionStats()
+        self.governor = get_governor(WHATSAPP)
+        self.breaker = get_breaker(WHATSAPP)
+
+        # Latency tracking
+        self.sends = 0
+        self.failures = 0
+        self._latencies_ms: deque = deque(maxlen=500)
+
+    def start(self) -> httpx.AsyncClient:
+        """
+        Create the pooled HTTP client.
+
+        Returns:
+            Shared httpx.AsyncClient
+        """
+        if self.client is None:
+            self.client = build_http_client(
+                self.stats,
+                max_connections=settings.WHATSAPP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.WHATSAPP_MAX_CONNECTIONS,
+                keepalive_expiry=settings.WHATSAPP_KEEPALIVE_EXPIRY,
+                timeout=settings.WHATSAPP_TIMEOUT,
+                http2=settings.WHATSAPP_HTTP2,
+                base_url=f"{settings.WHATSAPP_API_URL}/{settings.WHATSAPP_PHONE_NUMBER}",
+                headers={
+                    "Authorization": f"Bearer {settings.WHATSAPP_API_KEY}",
+                    "Content-Type": "application/json"
+                }
+            )
+            logger.info("WhatsApp transport initialized")
+        return self.client
+
+    async def close(self) -> None:
+        """Close the connection pool."""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+            logger.info(f"WhatsApp transport closed, stats: {self.get_stats()}")
+
+    async def send(self, payload: dict) -> bool:
+        """
+        Send one message payload.
+
+        Args:
+            payload: Cloud API message body
+
+        Returns:
+            True if the API accepted the message
+        """
+        client = self.client or self.start()
+
+        with tracer.span("whatsapp.send", message_type=payload.get("type")) as span:
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                async with self.breaker.guard() as call:
+                    async with self.governor.request() as permit:
+                        # Latency excludes the wait for admission
+                        call.begin()
+                        start = time.perf_counter()
+                        response = await client.post("/messages", json=payload)
+                        permit.record(response.status_code, response.headers)
+                    response.raise_for_status()
+                outcome = "ok"
+            except (httpx.HTTPError, UpstreamThrottledException, CircuitOpenException) as e:
+                self.failures += 1
+                logger.error(f"Failed to send WhatsApp message: {e}")
+                return False
+            finally:
+                latency_ms = (time.perf_counter() - start) * 1000
+                self._latencies_ms.append(latency_ms)
+                self.sends += 1
+                STAGE_SECONDS.observe(latency_ms / 1000, stage="send", outcome=outcome)
+                span.set_attribute("outcome", outcome)
+
+        logger.info(f"Message sent successfully to {payload.get('to')} in {latency_ms:.2f}ms")
+        return True
+
+    async def send_many(self, payloads: List[dict]) -> List[bool]:
+        """
+        Send several payloads, in list order for each recipient.
+
+        WhatsApp only keeps the order of messages it has already accepted, so
+        a recipient's messages go out one after another. Different recipients
+        are sent concurrently and share the pool and the concurrency bound.
+
+        Args:
+            payloads: Cloud API message bodies, in the order they should go out
+
+        Returns:
+            Per-payload success flags, in the same order
+        """
+        results: List[bool] = [False] * len(payloads)
+        by_recipient: Dict[str, List[int]] = {}
+        for index, payload in enumerate(payloads):
+            by_recipient.setdefault(payload.get("to", ""), []).append(index)
+
+        async def send_in_order(indexes: List[int]) -> None:
+            for index in indexes:
+                results[index] = await self.send(payloads[index])
+
+        await asyncio.gather(*(send_in_order(indexes) for indexes in by_recipient.values()))
+        return results
+
+    def get_stats(self) -> dict:
+        """Return send latency and connection reuse counters."""
+        latencies = sorted(self._latencies_ms)
+        return {
+            "sends": self.sends,
+            "failures": self.failures,
+            "latency_p50_ms": round(statistics.median(latencies), 2) if latencies else 0.0,
+            "latency_p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 2) if latencies else 0.0,
+            "connections": self.stats.as_dict()
+        }
+
+
+# Singleton instance for reuse across requests
+_transport_instance: Optional[WhatsAppTransport] = None
+
+
+def get_whatsapp_transport() -> WhatsAppTransport:
+    """
+    Get singleton WhatsApp transport.
+
+    Returns:
+        WhatsAppTransport instance
+    """
+    global _transport_instance
+    if _transport_instance is None:
+        _transport_instance = WhatsAppTransport()
+    return _transport_instance
@@ -0,0 +1,89 @@
+"""
+Standalone WhatsApp message queue worker.
+
+Run with ``python -m app.worker`` next to web processes started with
+``MESSAGE_QUEUE_RUN_WORKERS=False``, pointing both at the same
+``MESSAGE_QUEUE_PATH``. Web processes then only enqueue and acknowledge
+webhooks while scraping and OpenAI work runs here.
+"""
+from app.config import get_settings
+from app.api.v1.webhooks import register_whatsapp_jobs
+from app.core.logger import setup_logging, get_logger
+from app.core.tracing import build_span_exporter, get_tracer
+from app.scrapers.mercadolibre import get_scraper
+from app.services.message_queue import MessageQueue
+from app.services.openai_client import get_openai_manager
+from app.services.whatsapp_transport import get_whatsapp_transport
+import asyncio
+import signal
+
+settings = get_settings()
+setup_logging("INFO" if not settings.DEBUG else "DEBUG")
+logger = get_logger(__name__)
+
+
+async def run_worker() -> None:
+    """Process queued messages until SIGINT or SIGTERM is received."""
+    # Jobs continue the trace of the webhook that enqueued them
+    tracer = get_tracer()
+    if settings.TRACING_ENABLED:
+        tracer.start(
+            build_span_exporter(
+                settings.TRACING_EXPORTER,
+                jsonl_path=settings.TRACING_JSONL_PATH,
+                otlp_endpoint=settings.TRACING_OTLP_ENDPOINT
+            ),
+            service_name=f"{settings.TRACING_SERVICE_NAME}-worker",
+            sample_rate=settings.TRACING_SAMPLE_RATE,
+            slow_ms=settings.TRACING_SLOW_MS,
+            flush_interval=settings.TRACING_FLUSH_INTERVAL
+        )
+
+    openai_manager = get_openai_manager()
+    openai_manager.start()
+    whatsapp_transport = get_whatsapp_transport()
+    whatsapp_transport.start()
+
+    try:
+        scraper = await get_scraper()
+        await scraper.initialize()
+    except Exception as e:
+        logger.warning(f"Failed to initialize browser on startup: {e}")
+
+    # Workers always run here, regardless of MESSAGE_QUEUE_RUN_WORKERS
+    queue = MessageQueue(
+        path=settings.MESSAGE_QUEUE_PATH,
+        workers=settings.MESSAGE_QUEUE_WORKERS,
+        max_pending=settings.MESSAGE_QUEUE_MAX_PENDING,
+        max_attempts=settings.MESSAGE_QUEUE_MAX_ATTEMPTS,
+        backoff_base=settings.MESSAGE_QUEUE_BACKOFF_BASE,
+        backoff_max=settings.MESSAGE_QUEUE_BACKOFF_MAX,
+        poll_interval=settings.MESSAGE_QUEUE_POLL_INTERVAL,
+        job_timeout=settings.MESSAGE_QUEUE_JOB_TIMEOUT,
+        lease_seconds=settings.MESSAGE_QUEUE_LEASE_SECONDS
+    )
+    register_whatsapp_jobs(queue)
+    await queue.start()
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    logger.info("Message queue worker running")
+    await stop.wait()
+
+    logger.info("Shutting down message queue worker")
+    await queue.close()
+    try:
+        scraper = await get_scraper()
+        await scraper.close()
+    except Exception as e:
+        logger.error(f"Error closing browser: {e}")
+    await openai_manager.close()
+    await whatsapp_transport.close()
+    await tracer.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_worker())
@@ -0,0 +1,62 @@
+"""
+Micro-benchmark: bulk vs per-card product extraction in the Playwright scraper.
+
+Loads a synthetic listing into a real Chromium page and times both extraction
+paths on the same DOM. Run from the backend directory:
+
+    python -m benchmarks.bench_extraction --cards 50 --rounds 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from playwright.async_api import async_playwright
+from app.scrapers.mercadolibre import MercadoLibreScraper
+from benchmarks.fixtures import build_listing_html
+
+SELECTOR = MercadoLibreScraper.RESULT_SELECTORS[0]
+
+
+async def time_path(extract, page, limit: int, rounds: int) -> list:
+    """Run an extraction coroutine several times and return durations in ms."""
+    durations = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        results = (await extract(page, SELECTOR, limit)).products
+        durations.append((time.perf_counter() - start) * 1000)
+    assert len(results) == limit, f"expected {limit} products, got {len(results)}"
+    return durations
+
+
+def report(name: str, durations: list) -> None:
+    """Print summary statistics for one extraction path."""
+    print(
+        f"{name:<10} median={statistics.median(durations):8.2f}ms "
+        f"min={min(durations):8.2f}ms max={max(durations):8.2f}ms"
+    )
+
+
+async def main(cards: int, rounds: int):
+    scraper = MercadoLibreScraper()
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+        await page.set_content(build_listing_html(cards))
+
+        per_card = await time_path(scraper._extract_products_per_card, page, cards, rounds)
+        bulk = await time_path(scraper._extract_products_bulk, page, cards, rounds)
+
+        print(f"Extracting {cards} cards, {rounds} rounds")
+        report("per-card", per_card)
+        report("bulk", bulk)
+        print(f"speedup    {statistics.median(per_card) / statistics.median(bulk):.1f}x")
+
+        await browser.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cards", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.cards, args.rounds))
@@ -0,0 +1,99 @@
+"""
+Benchmark: browser-free HTML parsing vs the Playwright DOM path.
+
+Parses fixture listing pages with ``parse_listing_page`` and, unless
+``--no-browser`` is given, loads the same HTML into Chromium and runs the bulk
+DOM extraction on it. Run from the backend directory:
+
+    python -m benchmarks.bench_parsing --rounds 20
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from pathlib import Path
+from app.scrapers.html_parser import parse_listing_page
+from app.scrapers.mercadolibre import MercadoLibreScraper
+from benchmarks.fixtures import build_listing_html, NO_RESULTS_PAGE
+
+SAVED_PAGE = Path(__file__).resolve().parent.parent / "mercadolibre_page.html"
+
+
+def load_fixtures() -> dict:
+    """Return fixture pages keyed by name."""
+    fixtures = {
+        "synthetic-10": build_listing_html(10),
+        "synthetic-50": build_listing_html(50),
+        "synthetic-200": build_listing_html(200),
+        "no-results": NO_RESULTS_PAGE
+    }
+    if SAVED_PAGE.exists():
+        fixtures["saved-page"] = SAVED_PAGE.read_text(encoding="utf-8")
+    return fixtures
+
+
+def bench_parser(html: str, rounds: int) -> tuple:
+    """Time the HTML parser; returns (durations in ms, products found)."""
+    durations = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        page = parse_listing_page(html)
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations, len(page.products)
+
+
+async def bench_dom(browser, html: str, rounds: int) -> tuple:
+    """Time set_content plus bulk DOM extraction; returns (durations in ms, products found)."""
+    scraper = MercadoLibreScraper()
+    page = await browser.new_page()
+    durations = []
+    results = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await page.set_content(html)
+        if await page.query_selector(MercadoLibreScraper.RESULT_SELECTORS[0]):
+            results = (await scraper._extract_products_bulk(
+                page, MercadoLibreScraper.RESULT_SELECTORS[0], 1000
+            )).products
+        durations.append((time.perf_counter() - start) * 1000)
+    await page.close()
+    return durations, len(results)
+
+
+async def main(rounds: int, use_browser: bool):
+    fixtures = load_fixtures()
+
+    browser = None
+    playwright = None
+    if use_browser:
+        from playwright.async_api import async_playwright
+        playwright = await async_playwright().start()
+        browser = await playwright.chromium.launch(headless=True)
+
+    print(f"{'fixture':<15} {'bytes':>8} {'products':>9} {'parser ms':>10} {'dom ms':>10} {'speedup':>8}")
+    for name, html in fixtures.items():
+        parser_ms, found = bench_parser(html, rounds)
+        parser_median = statistics.median(parser_ms)
+
+        dom_cell, speedup_cell = "-", "-"
+        if browser:
+            dom_ms, dom_found = await bench_dom(browser, html, rounds)
+            dom_median = statistics.median(dom_ms)
+            dom_cell = f"{dom_median:.2f}"
+            speedup_cell = f"{dom_median / parser_median:.1f}x"
+            if dom_found != found:
+                print(f"  warning: {name} parser found {found}, DOM found {dom_found}")
+
+        print(f"{name:<15} {len(html):>8} {found:>9} {parser_median:>10.2f} {dom_cell:>10} {speedup_cell:>8}")
+
+    if browser:
+        await browser.close()
+        await playwright.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--no-browser", action="store_true", help="Only benchmark the HTML parser")
+    args = parser.parse_args()
+    asyncio.run(main(args.rounds, not args.no_browser))
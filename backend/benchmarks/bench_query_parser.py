@@ -0,0 +1,134 @@
+"""
+Benchmark: rule-based query parser vs OpenAI extraction on a labelled corpus.
+
+Reports how many queries the parser resolves on its own at the configured
+confidence threshold, how accurate those resolutions are, and per-query
+latency. With ``--llm`` the same corpus is sent to the model for comparison
+(needs a real OPENAI_API_KEY). Run from the backend directory:
+
+    python -m benchmarks.bench_query_parser [--llm]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from app.config import get_settings
+from app.services.query_parser import parse_query
+
+# (query, expected extraction); only fields present in the dict are checked
+CORPUS = [
+    ("Busco iPhone 15 menos de 2 millones", {"product_name": "iPhone 15", "max_price": 2_000_000, "condition": "any", "num_results": 10}),
+    ("Dame 5 laptops para programar nuevas", {"product_name": "laptops para programar", "max_price": None, "condition": "new", "num_results": 5}),
+    ("PlayStation 5 usada máximo 1.5 millones", {"product_name": "PlayStation 5", "max_price": 1_500_000, "condition": "used", "num_results": 10}),
+    ("necesito un monitor 4k de segunda mano hasta 800 mil", {"product_name": "monitor 4k", "max_price": 800_000, "condition": "used", "num_results": 10}),
+    ("tenis nike talla 42 hasta $350.000", {"product_name": "tenis nike talla 42", "max_price": 350_000, "condition": "any", "num_results": 10}),
+    ("muéstrame 3 opciones de silla gamer", {"product_name": "silla gamer", "max_price": None, "condition": "any", "num_results": 3}),
+    ("Samsung Galaxy S24 Ultra por menos de 4 millones y medio", {"product_name": "Samsung Galaxy S24 Ultra", "max_price": 4_500_000, "condition": "any", "num_results": 10}),
+    ("nevera de 1 millón 500 mil", {"product_name": "nevera", "max_price": 1_500_000, "condition": "any", "num_results": 10}),
+    ("portátil 500k", {"product_name": "portátil", "max_price": 500_000, "condition": "any", "num_results": 10}),
+    ("Busco un carro", {"product_name": "carro", "max_price": None, "condition": "any", "num_results": 10}),
+    ("bicicleta de montaña usada", {"product_name": "bicicleta de montaña", "max_price": None, "condition": "used", "num_results": 10}),
+    ("quiero ver 4 resultados de bicicleta todoterreno", {"product_name": "bicicleta todoterreno", "max_price": None, "condition": "any", "num_results": 4}),
+    ("Hola! busco audífonos sony wh-1000xm5 nuevos", {"product_name": "audífonos sony wh-1000xm5", "max_price": None, "condition": "new", "num_results": 10}),
+    ("batería de 10000 mAh", {"product_name": "batería de 10000 mAh", "max_price": None, "condition": "any", "num_results": 10}),
+    ("dame 10 celulares xiaomi hasta 900 mil", {"product_name": "celulares xiaomi", "max_price": 900_000, "condition": "any", "num_results": 10}),
+    ("Xbox Series X nueva máximo 2 millones", {"product_name": "Xbox Series X", "max_price": 2_000_000, "condition": "new", "num_results": 10}),
+    ("Estoy buscando una lavadora LG de 18 kilos", {"product_name": "lavadora LG de 18 kilos", "max_price": None, "condition": "any", "num_results": 10}),
+    ("mesa de comedor 6 puestos menos de un millón", {"product_name": "mesa de comedor 6 puestos", "max_price": 1_000_000, "condition": "any", "num_results": 10}),
+    ("Dame 3 iPad Air usados", {"product_name": "iPad Air", "max_price": None, "condition": "used", "num_results": 3}),
+    ("televisor 55 pulgadas hasta 2.5 millones", {"product_name": "televisor 55 pulgadas", "max_price": 2_500_000, "condition": "any", "num_results": 10}),
+    ("silla ergonómica presupuesto de 700 mil", {"product_name": "silla ergonómica", "max_price": 700_000, "condition": "any", "num_results": 10}),
+    ("cámara canon eos r50 nueva o usada", {"product_name": "cámara canon eos r50", "max_price": None, "condition": "any", "num_results": 10}),
+    ("Top 10 celulares", {"product_name": "celulares", "max_price": None, "condition": "any", "num_results": 10}),
+    ("decoracion año nuevo", {"product_name": "decoracion año nuevo", "max_price": None, "condition": "any", "num_results": 10}),
+    ("mouse de 50.000", {"product_name": "mouse", "max_price": 50_000, "condition": "any", "num_results": 10}),
+    # Queries the parser should hand to the model
+    ("cuál es el mejor celular para fotos por menos de 2 millones?", None),
+    ("audífonos bluetooth baratos", None),
+    ("algo para regalarle a mi mamá que le gusta cocinar, no muy caro", None),
+    ("iphone 13 o 14, el que sea más barato", None),
+    ("pack de 10 productos de limpieza", None),
+    ("celular menos de 800", None),
+]
+
+
+def field_matches(expected: dict, actual: dict) -> bool:
+    """Compare the labelled fields of an extraction."""
+    for name, value in expected.items():
+        got = actual.get(name)
+        if name == "product_name":
+            if (got or "").strip().lower() != value.lower():
+                return False
+        elif name == "max_price":
+            if (got or None) != (float(value) if value else None):
+                return False
+        elif got != value:
+            return False
+    return True
+
+
+def bench_parser(threshold: float, rounds: int) -> None:
+    """Run the rule-based parser over the corpus and print a report."""
+    latencies = []
+    resolved = correct = deferred_ok = 0
+    mistakes = []
+
+    for query, expected in CORPUS:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            parsed = parse_query(query)
+        latencies.append((time.perf_counter() - start) / rounds * 1_000_000)
+
+        confident = parsed.request is not None and parsed.confidence >= threshold
+        if not confident:
+            if expected is None:
+                deferred_ok += 1
+            continue
+
+        resolved += 1
+        actual = parsed.request.model_dump(mode="json")
+        if expected is not None and field_matches(expected, actual):
+            correct += 1
+        else:
+            mistakes.append((query, actual))
+
+    total = len(CORPUS)
+    should_defer = sum(1 for _, e in CORPUS if e is None)
+    print(f"Rule-based parser (threshold {threshold})")
+    print(f"  resolved locally : {resolved}/{total} ({resolved / total:.0%})")
+    print(f"  accuracy         : {correct}/{resolved} ({correct / max(resolved, 1):.0%}) of resolved")
+    print(f"  deferred to LLM  : {deferred_ok}/{should_defer} of the queries that needed it")
+    print(f"  latency          : median {statistics.median(latencies):.1f}µs, max {max(latencies):.1f}µs")
+    for query, actual in mistakes:
+        print(f"  mismatch: {query!r} -> {actual}")
+
+
+async def bench_llm() -> None:
+    """Send the labelled corpus to the model and print a report."""
+    from app.services.openai_service import OpenAIService
+
+    service = OpenAIService()
+    latencies = []
+    correct = labelled = 0
+    for query, expected in CORPUS:
+        start = time.perf_counter()
+        extracted = await service._extract_with_llm(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if expected is not None:
+            labelled += 1
+            correct += field_matches(expected, extracted.model_dump(mode="json"))
+
+    print("OpenAI extraction")
+    print(f"  accuracy : {correct}/{labelled} ({correct / labelled:.0%}) of labelled queries")
+    print(f"  latency  : median {statistics.median(latencies):.0f}ms, max {max(latencies):.0f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=200, help="Parser repetitions per query")
+    parser.add_argument("--llm", action="store_true", help="Also benchmark the OpenAI path")
+    args = parser.parse_args()
+
+    bench_parser(get_settings().QUERY_PARSER_MIN_CONFIDENCE, args.rounds)
+    if args.llm:
+        asyncio.run(bench_llm())
@@ -0,0 +1,88 @@
+"""Synthetic Mercado Libre listing pages used by the benchmarks."""
+import random
+
+CONDITIONS = ["Nuevo", "Usado", "Reacondicionado"]
+CITIES = ["Bogotá D.C.", "Medellín", "Cali", "Barranquilla", "Bucaramanga"]
+
+CARD_TEMPLATE = """
+<li class="ui-search-layout__item">
+  <div class="ui-search-result__wrapper">
+    <div class="ui-search-result__image">
+      <a class="ui-search-link" href="https://articulo.mercadolibre.com.co/MCO-{item_id}-{slug}">
+        <img class="ui-search-result-image__element" src="https://http2.mlstatic.com/D_NQ_NP_{item_id}-MCO.webp" alt="{title}">
+      </a>
+    </div>
+    <div class="ui-search-result__content">
+      <a class="ui-search-result__content ui-search-link" href="https://articulo.mercadolibre.com.co/MCO-{item_id}-{slug}">
+        <h2 class="ui-search-item__title">{title}</h2>
+      </a>
+      <span class="ui-search-item__group__element--condition">{condition}</span>
+      <div class="ui-search-price">
+        <span class="andes-money-amount">
+          <span class="andes-money-amount__currency-symbol">$</span>
+          <span class="andes-money-amount__fraction">{price}</span>
+        </span>
+      </div>
+      {shipping}
+      <span class="ui-search-item__location-label">{city}</span>
+    </div>
+  </div>
+</li>
+"""
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="es-CO">
+<head><meta charset="utf-8"><title>{query} | MercadoLibre</title></head>
+<body>
+<main id="root-app">
+  <section class="ui-search-results">
+    <ol class="ui-search-layout ui-search-layout--stack">
+{cards}
+    </ol>
+  </section>
+</main>
+</body>
+</html>
+"""
+
+NO_RESULTS_PAGE = """<!DOCTYPE html>
+<html lang="es-CO">
+<body>
+<main id="root-app">
+  <div class="ui-search-rescue">
+    <h3 class="ui-search-rescue__title">No hay publicaciones que coincidan con tu búsqueda.</h3>
+  </div>
+</main>
+</body>
+</html>
+"""
+
+
+def build_listing_html(num_cards: int = 50, query: str = "iPhone 15", seed: int = 42) -> str:
+    """
+    Build a listing page with the card markup the scrapers understand.
+
+    Args:
+        num_cards: Number of product cards on the page
+        query: Query used in titles
+        seed: Random seed so repeated runs produce the same page
+
+    Returns:
+        HTML document as a string
+    """
+    rng = random.Random(seed)
+    cards = []
+    for i in range(num_cards):
+        title = f"{query} {rng.choice(['128 GB', '256 GB', '512 GB'])} Modelo {i + 1}"
+        price = rng.randrange(800_000, 6_000_000, 1_000)
+        free = rng.random() < 0.5
+        cards.append(CARD_TEMPLATE.format(
+            item_id=1_000_000_000 + i,
+            slug=title.lower().replace(" ", "-"),
+            title=title,
+            condition=rng.choice(CONDITIONS),
+            price=f"{price:,}".replace(",", "."),
+            shipping='<p class="ui-search-item__shipping">Envío gratis</p>' if free else "",
+            city=rng.choice(CITIES)
+        ))
+    return PAGE_TEMPLATE.format(query=query, cards="".join(cards))
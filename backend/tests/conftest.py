@@ -0,0 +1,6 @@
+"""Shared test setup."""
+import os
+
+# Settings require credentials at import time; tests never reach the real APIs
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("WHATSAPP_TOKEN", "test")
@@ -0,0 +1,96 @@
+"""Tests for per-sender message debouncing and batch handling."""
+import asyncio
+from app.services.coalescer import MessageCoalescer
+
+WINDOW = 0.05
+
+
+def coalescer(prepare_delay: float = 0.0, fail: bool = False, max_wait: float = 1.0):
+    """Coalescer with fake callbacks; returns it with the prepared and delivered texts."""
+    prepared, delivered = [], []
+
+    async def prepare(sender: str, text: str):
+        prepared.append(text)
+        await asyncio.sleep(prepare_delay)
+        if fail:
+            raise RuntimeError("search failed")
+        return text.upper()
+
+    async def deliver(sender: str, text: str, result) -> None:
+        delivered.append((sender, result))
+
+    return MessageCoalescer(prepare, deliver, window=WINDOW, max_wait=max_wait), prepared, delivered
+
+
+async def submit_later(merger: MessageCoalescer, delay: float, sender: str, message: str):
+    await asyncio.sleep(delay)
+    await merger.submit(sender, message)
+
+
+def test_messages_within_window_are_answered_together():
+    merger, prepared, delivered = coalescer()
+
+    async def run():
+        await asyncio.gather(
+            merger.submit("573001", "celular"),
+            submit_later(merger, WINDOW / 2, "573001", "samsung"),
+            merger.submit("573002", "nevera")
+        )
+
+    asyncio.run(run())
+
+    assert sorted(delivered) == [("573001", "CELULAR SAMSUNG"), ("573002", "NEVERA")]
+    assert merger.batches == 2
+    assert merger.merged == 1
+
+
+def test_messages_after_window_start_a_new_batch():
+    merger, _, delivered = coalescer()
+
+    async def run():
+        await asyncio.gather(
+            merger.submit("573001", "celular"),
+            submit_later(merger, WINDOW * 3, "573001", "nevera")
+        )
+
+    asyncio.run(run())
+
+    assert delivered == [("573001", "CELULAR"), ("573001", "NEVERA")]
+
+
+def test_message_during_search_supersedes_it():
+    merger, prepared, delivered = coalescer(prepare_delay=WINDOW * 2)
+
+    async def run():
+        await asyncio.gather(
+            merger.submit("573001", "celular"),
+            # Lands while the first search is running
+            submit_later(merger, WINDOW * 2, "573001", "samsung")
+        )
+
+    asyncio.run(run())
+
+    assert prepared == ["celular", "celular samsung"]
+    assert delivered == [("573001", "CELULAR SAMSUNG")]
+    assert merger.superseded == 1
+
+
+def test_failed_batch_raises_only_for_its_first_message():
+    merger, _, delivered = coalescer(fail=True)
+
+    async def run():
+        return await asyncio.gather(
+            merger.submit("573001", "celular"),
+            submit_later(merger, WINDOW / 2, "573001", "samsung"),
+            return_exceptions=True
+        )
+
+    first, merged = asyncio.run(run())
+
+    assert isinstance(first, RuntimeError)
+    assert merged is None
+    assert delivered == []
+
+
+def test_merge_drops_repeated_messages():
+    assert MessageCoalescer.merge(["celular ", "celular", "", "samsung"]) == "celular samsung"
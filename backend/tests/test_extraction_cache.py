@@ -0,0 +1,53 @@
+"""Tests for the exact and near-duplicate extraction cache."""
+import pytest
+from app.models.requests import ExtractedProductRequest
+from app.services.extraction_cache import ExtractionCache
+
+
+def extraction(product_name: str) -> ExtractedProductRequest:
+    return ExtractedProductRequest(product_name=product_name, num_results=10)
+
+
+def cache(ttl: float = 60.0, max_entries: int = 100) -> ExtractionCache:
+    return ExtractionCache(max_entries=max_entries, ttl=ttl, similarity_threshold=0.85)
+
+
+def test_exact_hit_ignores_case_accents_and_punctuation():
+    extractions = cache()
+    extractions.set("Audífonos Sony", extraction("audifonos sony"))
+
+    assert extractions.get("audifonos sony!").product_name == "audifonos sony"
+    assert extractions.exact_hits == 1
+
+
+def test_filler_words_still_hit():
+    extractions = cache()
+    extractions.set("hola busco audifonos sony inalambricos", extraction("audifonos sony"))
+
+    assert extractions.get("busco audifonos sony inalambricos").product_name == "audifonos sony"
+    assert extractions.similar_hits == 1
+
+
+@pytest.mark.parametrize("cached,query", [
+    ("busco audifonos sony", "busco audifonos sonos"),
+    ("audifonos sony", "audifonos sonos"),
+    ("bicicleta todoterreno para niño", "bicicleta todoterreno para niña"),
+    ("iphone 15 usado", "iphone 15 nuevo"),
+])
+def test_different_products_never_hit(cached, query):
+    extractions = cache()
+    extractions.set(cached, extraction(cached))
+
+    assert extractions.get(query) is None
+    assert extractions.misses == 1
+
+
+def test_dead_index_entry_is_pruned_and_next_candidate_used():
+    extractions = cache(max_entries=2)
+    extractions.set("quiero audifonos sony inalambricos bluetooth por favor", extraction("alive"))
+    extractions.set("busco audifonos sony inalambricos bluetooth por favor", extraction("dead"))
+    # Best candidate, gone from the exact layer but still indexed
+    extractions._exact.delete_nowait("busco audifonos sony inalambricos bluetooth por favor")
+
+    assert extractions.get("audifonos sony inalambricos bluetooth por favor").product_name == "alive"
+    assert "busco audifonos sony inalambricos bluetooth por favor" not in extractions._index
@@ -0,0 +1,166 @@
+"""Tests for job claiming, leases, retries and failures in the message queue."""
+import asyncio
+import time
+from app.services.message_queue import (
+    MessageQueue, PRIORITY_HIGH, PRIORITY_LOW, mark_job_committed
+)
+
+
+def queue(**overrides) -> MessageQueue:
+    options = dict(
+        path=":memory:",
+        workers=0,
+        max_pending=100,
+        max_attempts=3,
+        backoff_base=1.0,
+        backoff_max=60.0,
+        poll_interval=0.01,
+        job_timeout=1.0,
+        lease_seconds=30.0
+    )
+    options.update(overrides)
+    return MessageQueue(**options)
+
+
+def row(jobs: MessageQueue, job_id: int) -> dict:
+    rows = jobs._fetchall("SELECT * FROM jobs WHERE id = ?", (job_id,))
+    return dict(rows[0]) if rows else None
+
+
+def test_claim_takes_highest_priority_and_leases_it():
+    async def run():
+        jobs = queue()
+        await jobs.enqueue("echo", {"n": 1}, priority=PRIORITY_LOW)
+        high = await jobs.enqueue("echo", {"n": 2}, priority=PRIORITY_HIGH)
+        return jobs, high, jobs._claim()
+
+    jobs, high, claimed = asyncio.run(run())
+
+    assert claimed["id"] == high
+    assert claimed["attempts"] == 1
+    stored = row(jobs, high)
+    assert stored["status"] == "running"
+    assert stored["owner"] == jobs.owner
+    assert stored["lease_until"] > time.time()
+
+
+def test_expired_lease_is_requeued():
+    async def run():
+        jobs = queue()
+        job_id = await jobs.enqueue("echo", {})
+        jobs._claim()
+        await jobs._execute("UPDATE jobs SET lease_until = ? WHERE id = ?", (time.time() - 1, job_id))
+        await jobs._requeue_expired()
+        return jobs, job_id
+
+    jobs, job_id = asyncio.run(run())
+
+    stored = row(jobs, job_id)
+    assert stored["status"] == "pending"
+    assert stored["owner"] is None
+    assert jobs.recovered == 1
+
+
+def test_failure_is_retried_with_backoff():
+    async def failing(**payload):
+        raise RuntimeError("boom")
+
+    async def run():
+        jobs = queue(backoff_base=2.0)
+        jobs.register("echo", failing)
+        job_id = await jobs.enqueue("echo", {})
+        before = time.time()
+        await jobs._run(jobs._claim())
+        return jobs, job_id, before
+
+    jobs, job_id, before = asyncio.run(run())
+
+    stored = row(jobs, job_id)
+    assert stored["status"] == "pending"
+    assert stored["available_at"] >= before + 2.0
+    assert stored["last_error"] == "boom"
+    assert jobs.retried == 1
+
+
+def test_last_attempt_fails_and_notifies():
+    notified = []
+
+    async def failing(**payload):
+        raise RuntimeError("boom")
+
+    async def on_failure(**payload):
+        notified.append(payload)
+
+    async def run():
+        jobs = queue(max_attempts=1)
+        jobs.register("echo", failing, on_failure=on_failure)
+        job_id = await jobs.enqueue("echo", {"n": 1})
+        await jobs._run(jobs._claim())
+        return jobs, job_id
+
+    jobs, job_id = asyncio.run(run())
+
+    assert row(jobs, job_id)["status"] == "failed"
+    assert notified == [{"n": 1}]
+
+
+def test_committed_job_is_not_retried():
+    sent = []
+
+    async def replying(**payload):
+        await mark_job_committed()
+        sent.append(payload["n"])
+        raise RuntimeError("second message failed")
+
+    async def run():
+        jobs = queue()
+        jobs.register("echo", replying)
+        job_id = await jobs.enqueue("echo", {"n": 1})
+        await jobs._run(jobs._claim())
+        return jobs, job_id
+
+    jobs, job_id = asyncio.run(run())
+
+    stored = row(jobs, job_id)
+    assert stored["status"] == "failed"
+    assert stored["committed_at"] is not None
+    assert sent == [1]
+
+
+def test_committed_job_with_expired_lease_is_not_requeued():
+    async def run():
+        jobs = queue()
+        job_id = await jobs.enqueue("echo", {})
+        jobs._claim()
+        await jobs._execute(
+            "UPDATE jobs SET lease_until = ?, committed_at = ? WHERE id = ?",
+            (time.time() - 1, time.time(), job_id)
+        )
+        await jobs._requeue_expired()
+        return jobs, job_id
+
+    jobs, job_id = asyncio.run(run())
+
+    assert row(jobs, job_id)["status"] == "failed"
+
+
+def test_outcome_of_job_taken_over_by_another_owner_is_discarded():
+    async def done(**payload):
+        pass
+
+    async def run():
+        jobs = queue()
+        jobs.register("echo", done)
+        job_id = await jobs.enqueue("echo", {})
+        job = jobs._claim()
+        # Lease expired and another process claimed it meanwhile
+        await jobs._execute("UPDATE jobs SET owner = 'other' WHERE id = ?", (job_id,))
+        await jobs._run(job)
+        return jobs, job_id
+
+    jobs, job_id = asyncio.run(run())
+
+    stored = row(jobs, job_id)
+    assert stored["status"] == "running"
+    assert stored["owner"] == "other"
+    assert jobs.completed == 0
@@ -0,0 +1,106 @@
+"""Tests for concurrent result page collection."""
+import asyncio
+import pytest
+from app.models.responses import ProductResult
+from app.scrapers.pagination import ResultPage, collect_pages
+
+PAGE_SIZE = 48
+
+
+def product(n: int, price: float = 100_000) -> ProductResult:
+    return ProductResult(
+        title=f"Producto {n}",
+        price=price,
+        condition="Nuevo",
+        url=f"https://articulo.mercadolibre.com.co/MCO-{n}"
+    )
+
+
+def listing(pages: dict, failing: tuple = ()):
+    """Fake fetcher over {page index: (raw count, products)}; records offsets asked for."""
+    requested = []
+
+    async def fetch_page(offset: int) -> ResultPage:
+        requested.append(offset)
+        index = offset // PAGE_SIZE
+        if index in failing:
+            raise RuntimeError(f"page {index} failed")
+        raw_count, products = pages.get(index, (0, []))
+        return ResultPage(products, raw_count)
+
+    return fetch_page, requested
+
+
+def collect(fetch_page, wanted: int, accept=None):
+    return asyncio.run(collect_pages(
+        fetch_page,
+        wanted=wanted,
+        page_size=PAGE_SIZE,
+        max_pages=5,
+        fanout=3,
+        item_key=lambda p: str(p.url),
+        accept=accept
+    ))
+
+
+def test_small_request_fetches_one_page():
+    fetch_page, requested = listing({0: (48, [product(i) for i in range(48)])})
+
+    products = collect(fetch_page, wanted=5)
+
+    assert [p.title for p in products] == [f"Producto {i}" for i in range(5)]
+    assert requested == [0]
+
+
+def test_unparseable_cards_do_not_end_pagination():
+    # One card per full page fails to parse
+    pages = {i: (48, [product(i * 48 + n) for n in range(47)]) for i in range(5)}
+    fetch_page, requested = listing(pages)
+
+    products = collect(fetch_page, wanted=100)
+
+    assert len(products) == 100
+    assert sorted(requested) == [0, 48, 96]
+
+
+def test_short_raw_page_ends_pagination():
+    pages = {
+        0: (48, [product(n) for n in range(48)]),
+        1: (10, [product(48 + n) for n in range(10)])
+    }
+    fetch_page, requested = listing(pages)
+
+    products = collect(fetch_page, wanted=60)
+
+    assert len(products) == 58
+    assert sorted(requested) == [0, 48]
+
+
+def test_duplicates_and_rejected_products_are_skipped():
+    pages = {
+        0: (48, [product(n, price=50_000 if n % 2 else 900_000) for n in range(48)]),
+        1: (48, [product(n, price=50_000) for n in range(40, 88)])
+    }
+    fetch_page, _ = listing(pages)
+
+    products = collect(fetch_page, wanted=40, accept=lambda p: p.price <= 100_000)
+
+    keys = [str(p.url) for p in products]
+    assert len(keys) == len(set(keys)) == 40
+    assert all(p.price <= 100_000 for p in products)
+
+
+def test_failed_later_page_keeps_earlier_results():
+    pages = {0: (48, [product(n) for n in range(48)])}
+    fetch_page, _ = listing(pages, failing=(1,))
+
+    products = collect(fetch_page, wanted=100)
+
+    assert len(products) == 48
+
+
+def test_failed_first_page_raises():
+    fetch_page, _ = listing({}, failing=(0,))
+
+    with pytest.raises(RuntimeError):
+        collect(fetch_page, wanted=5)
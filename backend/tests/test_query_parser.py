@@ -0,0 +1,81 @@
+"""Tests for the rule-based query parser."""
+import pytest
+from app.services.query_parser import parse_query
+
+MIN_CONFIDENCE = 0.8
+
+
+@pytest.mark.parametrize("query,product_name,max_price", [
+    ("nevera 2 millones", "nevera", 2_000_000),
+    ("sarten 80 mil", "sarten", 80_000),
+    ("camiseta 200 mil", "camiseta", 200_000),
+    ("licuadora 300 mil", "licuadora", 300_000),
+    ("nevera de 1 millón 500 mil", "nevera", 1_500_000),
+    ("celular hasta 1.5M", "celular", 1_500_000),
+    ("celular $2M", "celular", 2_000_000),
+])
+def test_price_without_word_damage(query, product_name, max_price):
+    parsed = parse_query(query)
+
+    assert parsed.confidence >= MIN_CONFIDENCE
+    assert parsed.request.product_name == product_name
+    assert parsed.request.max_price == max_price
+
+
+@pytest.mark.parametrize("query", [
+    "tenis talla 42 m",
+    "bici rin 29 M",
+])
+def test_bare_m_is_left_to_the_model(query):
+    parsed = parse_query(query)
+
+    assert parsed.confidence < MIN_CONFIDENCE
+    assert "ambiguous_million" in parsed.rules
+
+
+@pytest.mark.parametrize("query,product_name,num_results", [
+    ("Top 10 celulares", "celulares", 10),
+    ("Hola, 3 opciones de silla gamer", "silla gamer", 3),
+    ("Busco un carro", "carro", 10),
+])
+def test_leading_count(query, product_name, num_results):
+    parsed = parse_query(query)
+
+    assert parsed.confidence >= MIN_CONFIDENCE
+    assert parsed.request.product_name == product_name
+    assert parsed.request.num_results == num_results
+
+
+def test_count_inside_name_is_left_to_the_model():
+    parsed = parse_query("pack de 10 productos de limpieza")
+
+    assert parsed.confidence < MIN_CONFIDENCE
+    assert "ambiguous_count" in parsed.rules
+
+
+def test_ano_nuevo_is_not_a_condition():
+    parsed = parse_query("decoracion año nuevo")
+
+    assert parsed.request.product_name == "decoracion año nuevo"
+    assert parsed.request.condition.value == "any"
+
+
+def test_condition_outside_trailing_qualifier_is_left_to_the_model():
+    parsed = parse_query("iphone nuevo para regalar")
+
+    assert parsed.confidence < MIN_CONFIDENCE
+
+
+def test_small_explicit_price_is_left_to_the_model():
+    parsed = parse_query("celular menos de 800")
+
+    assert parsed.confidence < MIN_CONFIDENCE
+    assert "small_price" in parsed.rules
+
+
+def test_dotted_thousands_after_de_is_a_price():
+    parsed = parse_query("mouse de 50.000")
+
+    assert parsed.confidence >= MIN_CONFIDENCE
+    assert parsed.request.product_name == "mouse"
+    assert parsed.request.max_price == 50_000
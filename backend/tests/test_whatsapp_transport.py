@@ -0,0 +1,36 @@
+"""Tests for WhatsApp message dispatch order."""
+import asyncio
+import json
+import httpx
+from app.services.whatsapp_transport import WhatsAppTransport
+
+
+def test_each_recipient_gets_messages_in_order():
+    accepted = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        # Earlier messages answer slower, so concurrent sends would reorder them
+        await asyncio.sleep(0.02 / int(body["text"]["body"]))
+        accepted.append((body["to"], body["text"]["body"]))
+        return httpx.Response(200, json={})
+
+    async def run():
+        transport = WhatsAppTransport()
+        transport.client = httpx.AsyncClient(
+            base_url="https://graph.test", transport=httpx.MockTransport(handler)
+        )
+        payloads = [
+            {"to": to, "type": "text", "text": {"body": str(n)}}
+            for n in (1, 2, 3) for to in ("573001", "573002")
+        ]
+        try:
+            return await transport.send_many(payloads)
+        finally:
+            await transport.close()
+
+    sent = asyncio.run(run())
+
+    assert all(sent)
+    for to in ("573001", "573002"):
+        assert [body for recipient, body in accepted if recipient == to] == ["1", "2", "3"]